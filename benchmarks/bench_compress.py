@@ -0,0 +1,60 @@
+"""
+Benchmark gzip-compressed libvmaf logs (see easyvmaf.logs.compress_log())
+against plain ones: storage and bytes read, compression time, and parse
+time overhead of the transparent decompression.
+
+    python benchmarks/bench_compress.py                      # the video_samples logs
+    python benchmarks/bench_compress.py -log distorted_vmaf.json -level 1
+
+Parse time is the best of `-repeat` runs of pool_log() over every metric,
+the streaming pass the CLI and VmafResult.means make.
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+from easyvmaf import logs
+from easyvmaf.logs import GZIP_EXT, compress_log, log_format, pool_log
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'video_samples')
+
+
+def timed(func, *args, repeat=1):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-log', nargs='+', default=sorted(glob.glob(os.path.join(SAMPLES, '*_vmaf.*'))),
+                        help='libvmaf logs to measure (default: the video_samples logs)')
+    parser.add_argument('-level', type=int, default=logs.GZIP_LEVEL,
+                        help=f'gzip compression level (default: {logs.GZIP_LEVEL})')
+    parser.add_argument('-repeat', type=int, default=100, help='Parse runs per log (default: 100)')
+    args = parser.parse_args()
+    logs.GZIP_LEVEL = args.level
+
+    print(f"{'log':<34} {'size(KB)':>9} {'gz(KB)':>8} {'ratio':>6} {'gzip(ms)':>9} "
+          f"{'parse(ms)':>10} {'parse gz(ms)':>13} {'overhead':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for path in args.log:
+            fmt = log_format(path)
+            gz = os.path.join(directory, os.path.basename(path) + GZIP_EXT)
+            gzip_time = timed(compress_log, gz, path)
+            size, gz_size = os.path.getsize(path), os.path.getsize(gz)
+            plain = timed(pool_log, path, fmt, repeat=args.repeat)
+            compressed = timed(pool_log, gz, fmt, repeat=args.repeat)
+            print(f"{os.path.basename(path)[:34]:<34} {size / 1024:>9.1f} {gz_size / 1024:>8.1f} "
+                  f"{size / gz_size:>5.1f}x {gzip_time * 1e3:>9.1f} {plain * 1e3:>10.1f} "
+                  f"{compressed * 1e3:>13.1f} {(compressed / plain - 1) * 100:>8.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the size and reload time of the per-frame outputs of easyVmaf:
+the json, xml and csv libvmaf logs against the npz output, which is
+converted from the json log (see easyvmaf.logs.save_npz()).
+
+    python benchmarks/bench_formats.py                       # synthetic 2h @ 25fps logs
+    python benchmarks/bench_formats.py -frames 432000 -metrics 30
+    python benchmarks/bench_formats.py -log distorted_vmaf.json
+
+Reload is what the CLI aggregation does with an output: load_scores() of the
+three HD model scores, then pool_scores(). npz columns are memory-mapped, so
+its reload only reads the columns it pools. Run it twice to compare with a
+warm page cache; the synthetic logs are written to a temporary directory.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_parse import HD_NAMES, write_logs
+
+from easyvmaf.logs import load_scores, log_format, pool_scores, save_npz
+
+
+def reload(path, fmt, names):
+    return pool_scores(load_scores(path, fmt, names))
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-log', help='Existing json libvmaf log to measure instead of synthetic ones')
+    parser.add_argument('-names', nargs='+', default=HD_NAMES, help='Metrics to reload')
+    parser.add_argument('-frames', type=int, default=180000,
+                        help='Frames of the synthetic logs (default: 180000, 2h @ 25fps)')
+    parser.add_argument('-metrics', type=int, default=20,
+                        help='Extra features per frame of the synthetic logs (default: 20)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.log:
+            paths = {log_format(args.log): args.log}
+        else:
+            print(f"Writing {args.frames} frames x {args.metrics + len(HD_NAMES)} metrics logs...")
+            paths = write_logs(directory, args.frames, args.metrics, ['json', 'xml', 'csv'])
+        source = paths.get('json') or next(iter(paths.values()))
+        npz = os.path.join(directory, 'log.npz')
+        _, convert_time = timed(save_npz, npz, source, log_format(source), repeat=1)
+        paths['npz'] = npz
+        print(f"npz conversion of {os.path.basename(source)}: {convert_time:.2f}s")
+
+        print(f"{'format':<8} {'size(MB)':>10} {'reload(s)':>10}")
+        baseline = None
+        for fmt, path in paths.items():
+            size = os.path.getsize(path) / 2 ** 20
+            pooled, reload_time = timed(reload, path, fmt, args.names)
+            if baseline is None:
+                baseline = pooled
+            match = all(abs(pooled[n]['mean'] - baseline[n]['mean']) < 1e-6 for n in args.names)
+            print(f"{fmt:<8} {size:>10.1f} {reload_time:>10.3f}"
+                  f"   means {'match' if match else 'DIFFER'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark the peak memory and time of pooling a libvmaf log: loading the
+whole log (json.load / ET.parse / lists of floats, as easyVmaf did before)
+against the streaming readers of easyvmaf.logs.
+
+    python benchmarks/bench_parse.py                         # synthetic 2h @ 25fps logs
+    python benchmarks/bench_parse.py -frames 432000 -metrics 30
+    python benchmarks/bench_parse.py -log distorted_vmaf.xml -names vmaf_hd vmaf_hd_neg
+
+Synthetic logs are written to a temporary directory, one per format, with
+`-metrics` features per frame besides the three HD model scores. Peak memory
+is measured with tracemalloc, so it counts Python allocations only and the
+timings carry its overhead.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from easyvmaf.logs import log_format, pool_log
+
+HD_NAMES = ['vmaf_hd', 'vmaf_hd_neg', 'vmaf_hd_phone']
+
+
+def write_logs(directory, frames, metrics, formats):
+    """Write a synthetic libvmaf log per format, frame by frame."""
+    names = [f'feature_{i}' for i in range(metrics)] + HD_NAMES
+    rng = random.Random(0)
+    rows = ({name: round(rng.uniform(0, 100), 6) for name in names} for _ in range(frames))
+    paths = {fmt: os.path.join(directory, f'log.{fmt}') for fmt in formats}
+    files = {fmt: open(path, 'w', newline='') for fmt, path in paths.items()}
+    try:
+        if 'json' in files:
+            files['json'].write('{\n  "version": "3.0.0",\n  "fps": 10.0,\n  "frames": [')
+        if 'xml' in files:
+            files['xml'].write('<VMAF version="3.0.0">\n  <frames>\n')
+        writer = None
+        if 'csv' in files:
+            writer = csv.writer(files['csv'])
+            writer.writerow(['Frame'] + names)
+        for i, row in enumerate(rows):
+            if 'json' in files:
+                files['json'].write((',' if i else '') + '\n    ' +
+                                    json.dumps({'frameNum': i, 'metrics': row}))
+            if 'xml' in files:
+                attrs = ' '.join(f'{k}="{v:.6f}"' for k, v in row.items())
+                files['xml'].write(f'    <frame frameNum="{i}" {attrs} />\n')
+            if writer:
+                writer.writerow([i] + list(row.values()))
+        if 'json' in files:
+            files['json'].write('\n  ],\n  "pooled_metrics": {}\n}\n')
+        if 'xml' in files:
+            files['xml'].write('  </frames>\n</VMAF>\n')
+    finally:
+        for f in files.values():
+            f.close()
+    return paths
+
+
+def pool_loaded(path, fmt, names):
+    """The former approach: parse the whole log, keep per-frame lists, then pool."""
+    scores = {name: [] for name in names}
+    if fmt == 'csv':
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                for name in names:
+                    scores[name].append(float(row[name]))
+    elif fmt == 'xml':
+        for frame in ET.parse(path).getroot().findall('frames/frame'):
+            for name in names:
+                scores[name].append(float(frame.attrib[name]))
+    else:
+        with open(path) as f:
+            for frame in json.load(f)['frames']:
+                for name in names:
+                    scores[name].append(frame['metrics'][name])
+    return {name: statistics.mean(values) for name, values in scores.items()}
+
+
+def pool_streamed(path, fmt, names):
+    return {name: stats.mean for name, stats in pool_log(path, fmt, names).items()}
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-log', help='Existing libvmaf log to measure instead of synthetic ones')
+    parser.add_argument('-names', nargs='+', default=HD_NAMES, help='Metrics to pool')
+    parser.add_argument('-frames', type=int, default=180000,
+                        help='Frames of the synthetic logs (default: 180000, 2h @ 25fps)')
+    parser.add_argument('-metrics', type=int, default=20,
+                        help='Extra features per frame of the synthetic logs (default: 20)')
+    parser.add_argument('-formats', nargs='+', default=['json', 'xml', 'csv'],
+                        choices=['json', 'xml', 'csv'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.log:
+            paths = {log_format(args.log): args.log}
+        else:
+            print(f"Writing {args.frames} frames x {args.metrics + len(HD_NAMES)} metrics logs...")
+            paths = write_logs(directory, args.frames, args.metrics, args.formats)
+
+        print(f"{'format':<8} {'size(MB)':>10} {'reader':<10} {'peak(MB)':>10} {'time(s)':>9}")
+        for fmt, path in paths.items():
+            size = os.path.getsize(path) / 2 ** 20
+            loaded, loaded_peak, loaded_time = measure(pool_loaded, path, fmt, args.names)
+            streamed, streamed_peak, streamed_time = measure(pool_streamed, path, fmt, args.names)
+            print(f"{fmt:<8} {size:>10.1f} {'load':<10} {loaded_peak / 2 ** 20:>10.1f} {loaded_time:>9.2f}")
+            print(f"{'':<8} {'':>10} {'stream':<10} {streamed_peak / 2 ** 20:>10.1f} {streamed_time:>9.2f}"
+                  f"   {loaded_peak / streamed_peak:.0f}x less memory, means "
+                  f"{'match' if all(abs(loaded[n] - streamed[n]) < 1e-6 for n in args.names) else 'DIFFER'}")
+
+
+if __name__ == '__main__':
+    main()
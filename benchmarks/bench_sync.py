@@ -0,0 +1,72 @@
+"""
+Benchmark the syncOffset() engines against each other on a real pair of files.
+
+    python benchmarks/bench_sync.py -d distorted.mp4 -r reference.mp4 -sw 3
+    python benchmarks/bench_sync.py -d dist.mp4 -r ref.mp4 -sw 3 -methods psnr vectorized
+    python benchmarks/bench_sync.py -d dist.mp4 -r ref.mp4 -sw 3 -proxy 480
+
+Every method runs on a fresh vmaf instance (probing is excluded from the
+timings) and its result and wall time are printed, followed by the speedup
+of each run relative to the first one. With -proxy, every method is also
+run on the luma-only proxy and its speedup over the full resolution run
+is reported as well.
+"""
+import argparse
+import logging
+import sys
+import time
+
+from easyvmaf.vmaf import vmaf, SYNC_METHODS
+
+
+def run(method, args, proxy=None):
+    # ffmpeg must stay at the info level: the psnr engines read the "average:" line it logs
+    myVmaf = vmaf(args.d, args.r, output_fmt='json', model=args.model,
+                  threads=args.threads, loglevel='info')
+    t0 = time.perf_counter()
+    offset, psnr = myVmaf.syncOffset(args.sw, args.ss, args.reverse, method=method,
+                                     proxy=proxy)
+    return offset, psnr, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-d', required=True, help='Distorted video')
+    parser.add_argument('-r', required=True, help='Reference video')
+    parser.add_argument('-sw', type=float, default=3, help='Sync window in seconds (default: 3)')
+    parser.add_argument('-ss', type=float, default=0, help='Sync start time in seconds (default: 0)')
+    parser.add_argument('-reverse', action='store_true')
+    parser.add_argument('-model', default='HD')
+    parser.add_argument('-threads', type=int, default=0)
+    parser.add_argument('-methods', nargs='+', default=['psnr', 'vectorized', 'hierarchical'],
+                        choices=SYNC_METHODS)
+    parser.add_argument('-proxy', type=int, default=0,
+                        help='Also run every method on a luma-only proxy of this height')
+    args = parser.parse_args()
+
+    # Only the Python logging is silenced, the ffmpeg output is captured by easyvmaf
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    rows = []
+    for method in args.methods:
+        rows.append((method,) + run(method, args))
+        if args.proxy:
+            rows.append((f'{method}@{args.proxy}p',) + run(method, args, args.proxy))
+
+    baseline = rows[0][3]
+    print(f"{'method':<20} {'offset(s)':>12} {'psnr[dB]':>12} {'time(s)':>10} {'speedup':>8}")
+    for label, offset, psnr, elapsed in rows:
+        psnr = 'n/a' if psnr is None else f'{psnr:.6f}'
+        print(f"{label:<20} {offset:>12.6f} {psnr:>12} {elapsed:>10.2f} "
+              f"{baseline / elapsed:>7.1f}x")
+
+    if args.proxy:
+        print()
+        for full, proxied in zip(rows[::2], rows[1::2]):
+            print(f"{full[0]}: proxy {args.proxy}p is {full[3] / proxied[3]:.1f}x faster, "
+                  f"offset {'matches' if abs(full[1] - proxied[1]) < 1e-6 else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the head and from the tail of a file by file_fingerprint()
+_FINGERPRINT_SAMPLE = 1024 * 1024
+
+
+def default_cache_dir():
+    """$EASYVMAF_CACHE_DIR, else $XDG_CACHE_HOME/easyvmaf, else ~/.cache/easyvmaf."""
+    path = os.environ.get('EASYVMAF_CACHE_DIR')
+    if not path:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(base, 'easyvmaf')
+    return path
+
+
+def file_fingerprint(path):
+    """
+    Cheap content fingerprint of a media file: sha256 of its size, its first
+    MiB and its last MiB. Independent of the path and mtime, so a copied or
+    re-mounted file keeps its fingerprint, while a re-encode changes it.
+    """
+    digest = hashlib.sha256()
+    size = os.path.getsize(path)
+    digest.update(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(_FINGERPRINT_SAMPLE))
+        if size > _FINGERPRINT_SAMPLE:
+            f.seek(max(_FINGERPRINT_SAMPLE, size - _FINGERPRINT_SAMPLE))
+            digest.update(f.read(_FINGERPRINT_SAMPLE))
+    return digest.hexdigest()
+
+
+class _SqliteCache:
+    '''
+    Base class for the on-disk caches: one SQLite table per cache, keyed by
+    a text key, with an insertion timestamp used for eviction by age
+    (max_age, seconds) and by size (max_entries, oldest first).
+
+    Safe to share between processes: every operation opens its own
+    connection with a busy timeout, and the database runs in WAL mode.
+    '''
+    _table = None
+    _columns = None   # "name TYPE, ..." value columns, besides key and created
+
+    def __init__(self, cache_dir=None, max_age=30 * 24 * 3600, max_entries=10000):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.path = os.path.join(self.cache_dir, 'cache.sqlite')
+        self.max_age = max_age
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._db() as db:
+            db.execute(f'CREATE TABLE IF NOT EXISTS {self._table} '
+                       f'(key TEXT PRIMARY KEY, {self._columns}, created REAL NOT NULL)')
+            db.execute(f'CREATE INDEX IF NOT EXISTS {self._table}_created '
+                       f'ON {self._table} (created)')
+
+    @contextmanager
+    def _db(self):
+        """Short-lived connection: committed and closed on exit."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _get(self, key, columns):
+        with self._db() as db:
+            row = db.execute(
+                f'SELECT {columns} FROM {self._table} WHERE key = ? AND created >= ?',
+                (key, time.time() - self.max_age)).fetchone()
+        logger.debug("%s %s: %s", self._table, 'hit' if row else 'miss', key)
+        return row
+
+    def _put(self, key, values):
+        names = ', '.join(values)
+        marks = ', '.join('?' * (len(values) + 2))
+        with self._db() as db:
+            db.execute(f'INSERT OR REPLACE INTO {self._table} (key, {names}, created) '
+                       f'VALUES ({marks})', (key, *values.values(), time.time()))
+        self.evict()
+
+    def evict(self):
+        """Drop entries older than max_age, then the oldest ones beyond max_entries."""
+        with self._db() as db:
+            db.execute(f'DELETE FROM {self._table} WHERE created < ?',
+                       (time.time() - self.max_age,))
+            db.execute(f'DELETE FROM {self._table} WHERE key IN '
+                       f'(SELECT key FROM {self._table} ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                       (self.max_entries,))
+
+    def clear(self):
+        with self._db() as db:
+            db.execute(f'DELETE FROM {self._table}')
+
+    def __len__(self):
+        with self._db() as db:
+            return db.execute(f'SELECT COUNT(*) FROM {self._table}').fetchone()[0]
+
+
+class SyncCache(_SqliteCache):
+    '''
+    Persistent cache of syncOffset() results.
+
+    Entries are keyed by the content fingerprint of both inputs and by every
+    parameter that can change the outcome (see SyncCache.key()), so re-running
+    a pair with a different subsample, output format or feature set is a hit,
+    while a different sync window, model or method is not.
+    '''
+    _table = 'sync'
+    _columns = 'offset REAL NOT NULL, psnr REAL'
+
+    @staticmethod
+    def key(mainSrc, refSrc, **params):
+        """Build the cache key of a main/ref pair for the given sync parameters."""
+        payload = {
+            'main': file_fingerprint(mainSrc),
+            'ref': file_fingerprint(refSrc),
+            'params': params,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """Cached (offset, psnr) for `key`, or None."""
+        return self._get(key, 'offset, psnr')
+
+    def put(self, key, offset, psnr):
+        self._put(key, {'offset': offset, 'psnr': psnr})
+
+
+class ProbeCache(_SqliteCache):
+    '''
+    Persistent cache of ffprobe results (see FFprobe.getInfo()), so that
+    probing the same file again skips ffprobe completely.
+
+    Entries are keyed by the absolute path, size, mtime and inode of the
+    file, which any rewrite or replacement of the file changes. With
+    fingerprint=True a content fingerprint (see file_fingerprint()) is added
+    to the key, for filesystems with unreliable mtimes.
+    '''
+    _table = 'probe'
+    _columns = 'info TEXT NOT NULL'
+
+    def __init__(self, cache_dir=None, max_age=30 * 24 * 3600, max_entries=10000, fingerprint=False):
+        super().__init__(cache_dir, max_age, max_entries)
+        self.fingerprint = fingerprint
+
+    def key(self, path, **params):
+        """Build the cache key of a file for the given probe parameters."""
+        st = os.stat(path)
+        payload = {
+            'path': os.path.abspath(path),
+            'size': st.st_size,
+            'mtime': st.st_mtime_ns,
+            'inode': st.st_ino,
+            'params': params,
+        }
+        if self.fingerprint:
+            payload['content'] = file_fingerprint(path)
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """Cached ffprobe dict for `key`, or None."""
+        row = self._get(key, 'info')
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, info):
+        self._put(key, {'info': json.dumps(info)})
@@ -23,25 +23,35 @@ SOFTWARE.
 """
 
 import argparse
-import csv
 import glob
 import json
 import logging
 import os.path
+import subprocess
 import sys
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from signal import signal, SIGINT
-from statistics import mean, harmonic_mean
 
-from .ffmpeg import check_ffmpeg, HD_MODEL_NAME, HD_NEG_MODEL_NAME, HD_PHONE_MODEL_NAME, _4K_MODEL_NAME, HD_PHONE_MODEL_VERSION
-from .vmaf import vmaf, UnsupportedFramerateError
+from .ffmpeg import check_ffmpeg, RawDecodeCache, HD_MODEL_NAME, HD_NEG_MODEL_NAME, HD_PHONE_MODEL_NAME, _4K_MODEL_NAME, HD_PHONE_MODEL_VERSION
+from .vmaf import vmaf, video, UnsupportedFramerateError, SYNC_METHODS
+from .cache import SyncCache, ProbeCache
+from .warehouse import ResultStore, default_store_path
+from .logs import pool_scores, OUTPUT_FORMATS
+from .result import model_names
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Distorted files synced at once by -sync_only: each holds its own decoded frames and
+# sliding_mse() working set (up to 256 MiB) besides the shared reference window
+BATCH_SYNC_JOBS = 2
+
 
 def _build_result(distorted, reference, offset, psnr, model,
                   vmaf_scores=None, vmaf_output_file=None,
-                  cambi_heatmap_path=None):
+                  cambi_heatmap_path=None, sync_method=None, anchors=None,
+                  segments=None, pooled=None, frame_index=None):
     """
     Build the structured result dict for one distorted/reference pair.
 
@@ -55,6 +65,17 @@ def _build_result(distorted, reference, offset, psnr, model,
                             for --sync_only runs
         vmaf_output_file:   path to VMAF output file, or None
         cambi_heatmap_path: path to CAMBI heatmap output, or None
+        sync_method:        sync method actually used ('psnr', 'timecode',
+                            'pts', ...), or None when no sync was run
+        anchors:            list of {time, offset, psnr} measured by
+                            syncAnchors(), or None
+        segments:           list of {start, duration, offset, ...} VMAF
+                            segments from syncAnchors(), or None
+        pooled:             dict of metric_name → {mean, harmonic_mean, min,
+                            p1, p5, p10, std} from easyvmaf.logs.pool_scores(),
+                            or None
+        frame_index:        path to the frame index of the VMAF output file
+                            (see easyvmaf.frameindex), or None
 
     Returns:
         dict ready for json.dumps()
@@ -65,19 +86,151 @@ def _build_result(distorted, reference, offset, psnr, model,
         'sync': {
             'offset': round(offset, 6) if offset is not None else 0.0,
             'psnr':   round(psnr, 6)   if psnr   is not None else None,
+            'method': sync_method,
         },
     }
+    if anchors is not None:
+        result['sync']['anchors'] = [
+            {k: (round(v, 6) if v is not None else None) for k, v in anchor.items()}
+            for anchor in anchors
+        ]
+    if segments is not None:
+        result['segments'] = [
+            {k: (round(v, 6) if isinstance(v, float) else v) for k, v in segment.items()}
+            for segment in segments
+        ]
+        for segment in result['segments']:
+            if 'vmaf' in segment:
+                segment['vmaf'] = {k: round(v, 6) for k, v in segment['vmaf'].items()}
     if vmaf_scores is not None:
         vmaf_block = {'model': model}
         vmaf_block.update({k: round(v, 6) for k, v in vmaf_scores.items()})
+        if pooled is not None:
+            # NaN (no frames) is not valid JSON
+            vmaf_block['pooled'] = {
+                name: {k: (round(v, 6) if v == v else None) for k, v in stats.items()}
+                for name, stats in pooled.items()
+            }
         if vmaf_output_file:
             vmaf_block['output_file'] = vmaf_output_file
+        if frame_index:
+            vmaf_block['frame_index'] = frame_index
         if cambi_heatmap_path:
             vmaf_block['cambi_heatmap_path'] = cambi_heatmap_path
         result['vmaf'] = vmaf_block
     return result
 
 
+def _probe_inputs(mainFiles, reference, loglevel='info', probe_cache=None, threads=0, idet=False):
+    """
+    Probe the reference once and every distorted file concurrently, before any
+    sync or VMAF work. A distorted file that cannot be probed is reported on
+    stderr and left out.
+
+    Returns:
+        (reference video, list of distorted videos in mainFiles order)
+    """
+    def probe(src):
+        try:
+            return video(src, loglevel, probe_cache, idet)
+        except (subprocess.CalledProcessError, ValueError, KeyError, IndexError) as e:
+            print(f"[easyVmaf] ERROR: cannot probe {src}: {e}", file=sys.stderr, flush=True)
+            return None
+
+    refVideo = video(reference, loglevel, probe_cache, idet)
+    max_workers = max(1, min(len(mainFiles), threads or os.cpu_count()))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        mainVideos = [v for v in executor.map(probe, mainFiles) if v is not None]
+    return refVideo, mainVideos
+
+
+def _run_params(vmaf_args, sync_args, anchors=0):
+    """Parameters of a run recorded by -store: the JSON-able vmaf and sync arguments, without the caches."""
+    params = {k: v for k, v in dict(vmaf_args, **sync_args).items()
+              if v is None or isinstance(v, (bool, int, float, str))}
+    params['anchors'] = anchors
+    return params
+
+
+def _sync_rendition(main, reference, vmaf_args, sync_args, anchors=0):
+    """Sync one distorted file (path or video) against the reference: returns (vmaf, offset, psnr)."""
+    myVmaf = vmaf(main, reference, **vmaf_args)
+    offset, psnr = myVmaf.syncOffset(**sync_args)
+    if anchors > 1:
+        myVmaf.syncAnchors(anchors, sync_args['syncWindow'], proxy=sync_args.get('proxy'))
+    return myVmaf, offset, psnr
+
+
+def _batch_sync(mainFiles, reference, vmaf_args, sync_args, anchors=0, use_json=False, store=None,
+                jobs=BATCH_SYNC_JOBS):
+    """
+    -sync_only: sync every distorted file (paths or probed videos) against the
+    reference, `jobs` at a time, and print one result per file (one JSON line
+    with -json) as soon as it is ready. With a store (see easyvmaf.warehouse),
+    every result is also recorded in it.
+
+    With several files, the reference window is decoded only once and shared by
+    all of them (see RawDecodeCache): the 'psnr' and 'hierarchical' methods, which
+    run one comparison per offset, are replaced by the equivalent 'vectorized' one,
+    unless early stop criteria are given, which only those methods apply.
+
+    Returns:
+        process exit code: 1 if any file failed, else 0
+    """
+    batch = len(mainFiles) > 1
+    refSrc = getattr(reference, 'videoSrc', reference)
+    if batch:
+        early_stop = sync_args.get('stop_psnr') is not None or sync_args.get('stop_margin') is not None
+        if sync_args['method'] in ('psnr', 'hierarchical') and early_stop:
+            logger.warning("Batch sync: keeping the %s method for -sync_stop_psnr/-sync_stop_margin, "
+                           "the reference window is decoded for every file", sync_args['method'])
+        else:
+            sync_args = dict(sync_args, rawCache=RawDecodeCache())
+            if sync_args['method'] in ('psnr', 'hierarchical'):
+                logger.warning("Batch sync: using the vectorized method instead of %s, "
+                               "to decode the reference window once", sync_args['method'])
+                sync_args['method'] = 'vectorized'
+
+    params = _run_params(vmaf_args, sync_args, anchors)
+    failed = 0
+    max_workers = max(1, min(len(mainFiles), jobs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_sync_rendition, main, reference, vmaf_args, sync_args, anchors): main
+            for main in mainFiles
+        }
+        for future in as_completed(futures):
+            main = getattr(futures[future], 'videoSrc', futures[future])
+            try:
+                myVmaf, offset, psnr = future.result()
+            except (UnsupportedFramerateError, ValueError, subprocess.CalledProcessError) as e:
+                print(f"[easyVmaf] ERROR: {main}: {e}", file=sys.stderr, flush=True)
+                failed += 1
+                continue
+            if use_json or store is not None:
+                result = _build_result(
+                    distorted=main,
+                    reference=refSrc,
+                    offset=offset,
+                    psnr=psnr,
+                    model=vmaf_args['model'],
+                    sync_method=myVmaf.syncMethod,
+                    anchors=myVmaf.anchors,
+                    segments=myVmaf.segments,
+                )
+                if store is not None:
+                    store.add(result, params, myVmaf.timings)
+            if use_json:
+                print(json.dumps(result), flush=True)
+            else:
+                prefix = f"{main}: " if batch else ""
+                print(f"{prefix}offset: {offset} | psnr: {psnr}", flush=True)
+                for segment in myVmaf.segments or []:
+                    print(f"{prefix}segment: {segment['start']:.3f}s + {segment['duration']:.3f}s"
+                          f" | offset: {segment['offset']}", flush=True)
+    return 1 if failed else 0
+
+
 def handler(signal_received, frame):
     print('SIGINT or CTRL-C detected. Exiting gracefully')
     sys.exit(0)
@@ -103,6 +256,34 @@ def get_args():
                         help='Sync Window: window size in seconds of a subsample of the Reference video. The sync lookup will be done between the first frames of the Distorted input and this Subsample of the Reference. (default=0. No sync).')
     parser.add_argument('-ss', dest='ss', type=float, default=0,
                         help="Sync Start Time. Time in seconds from the beginning of the Reference video to which the Sync Window will be applied from. (default=0).")
+    parser.add_argument('-sync_method', dest='sync_method', type=str, default='psnr', choices=SYNC_METHODS,
+                        help="Sync engine. psnr: one ffmpeg psnr run per candidate offset. vectorized: decode the sync window once and score every offset in NumPy (faster, more memory). hierarchical: coarse-to-fine search, scores a strided subset of offsets then refines around the best ones. audio: FFT cross-correlation of the audio tracks, no video decoding (see -sync_confirm). fingerprint: match tiny per-frame thumbnails, for windows of several minutes (see -sync_confirm). timestamp: read the offset from timecodes or MPEG-TS PTS without decoding, falls back to psnr when they are missing or inconsistent. (Default: psnr).")
+    parser.add_argument('-sync_stride', dest='sync_stride', type=int, default=0,
+                        help="Coarse stride in frames for -sync_method hierarchical. (Default: 0, auto: ~sqrt of the frames in the sync window, at most 8).")
+    parser.add_argument('-sync_confirm', action='store_true', default=False,
+                        help="With -sync_method audio, fingerprint or timestamp: confirm the offset found with a single video psnr computation, which is also the reported sync psnr. (Default: false).")
+    parser.add_argument('-sync_proxy', dest='sync_proxy', type=int, default=0,
+                        help="Sync on a luma-only proxy of <sync_proxy> lines (e.g. 480) with a fast scaler and a cheap deinterlacer instead of the VMAF model resolution. The reported sync psnr is then the proxy luma psnr. (Default: 0, disabled).")
+    parser.add_argument('-sync_stop_psnr', dest='sync_stop_psnr', type=float, default=0,
+                        help="With -sync_method psnr or hierarchical: stop the sync search as soon as an offset reaches <sync_stop_psnr> dB (e.g. 50; an identical match, inf, always does). Pending offsets are skipped and running ffmpeg workers killed. (Default: 0, disabled).")
+    parser.add_argument('-sync_stop_margin', dest='sync_stop_margin', type=float, default=0,
+                        help="With -sync_method psnr or hierarchical: stop the sync search as soon as the best offset beats the runner-up by <sync_stop_margin> dB, once a few offsets are scored. (Default: 0, disabled).")
+    parser.add_argument('-anchors', dest='anchors', type=int, default=0,
+                        help="Drift detection: after the sync, re-measure the offset at <anchors> points spread over the whole file, and compute VMAF per segment of constant offset, pooled into one report. Anchors are measured on a 240-line luma proxy unless -sync_proxy is set, as many at once as fit in about 1 GiB. Requires -sw. (Default: 0, disabled).")
+    parser.add_argument('-jobs', dest='jobs', type=int, default=BATCH_SYNC_JOBS,
+                        help="With -sync_only and several distorted files: files synced at once. Each one holds its own decoded frames in memory. (Default: 2).")
+    parser.add_argument('-no_cache', action='store_true', default=False,
+                        help="Bypass the persistent caches of sync offsets and probe metadata: always recompute, and do not store the results. (Default: false).")
+    parser.add_argument('-cache_dir', dest='cache_dir', type=str, default=None,
+                        help="Directory of the persistent caches. (Default: $EASYVMAF_CACHE_DIR, else ~/.cache/easyvmaf).")
+    parser.add_argument('-cache_ttl', dest='cache_ttl', type=float, default=30,
+                        help="Days after which a cache entry expires. (Default: 30).")
+    parser.add_argument('-cache_size', dest='cache_size', type=int, default=10000,
+                        help="Entries kept in each cache, the oldest are evicted first. (Default: 10000).")
+    parser.add_argument('-probe_fingerprint', action='store_true', default=False,
+                        help="Also key the probe cache on a content fingerprint (first and last MiB) of each file, for filesystems with unreliable mtimes. (Default: false).")
+    parser.add_argument('-idet', action='store_true', default=False,
+                        help="Detect interlaced inputs with the idet filter on the decoded pictures of a few intervals spread across each file, instead of the interlaced flag of their frames. Slower, but reliable on wrongly flagged content. (Default: false).")
     parser.add_argument('-fps', dest='fps', type=float, default=0,
                         help='Video Frame Rate: force frame rate conversion to <fps> value. Autodeinterlace is disabled when setting this')
     parser.add_argument('-subsample', dest='n', type=int, default=1,
@@ -120,7 +301,14 @@ def get_args():
         '-endsync', help='Activate end sync. This ends the computation when the shortest video ends. (Default: false).', action='store_true')
 
     parser.add_argument('-output_fmt', dest='output_fmt', type=str, default='json',
-                        help='Output vmaf file format. Options: json, xml or csv (Default: json)')
+                        help='Output vmaf file format. Options: json, xml, csv or npz. npz: per-frame scores as uncompressed NumPy columns, converted from the libvmaf log as it is written, compact and quick to reload. (Default: json)')
+
+    parser.add_argument('-frame_index', action='store_true', default=False,
+                        help="Also convert each VMAF output file into a memory-mapped frame index, <output file>.frames, for frame and time range queries of finished runs (see easyvmaf.frameindex). (Default: false).")
+    parser.add_argument('-compress_log', action='store_true', default=False,
+                        help="Write the VMAF output file gzip-compressed as libvmaf writes it, <distorted>_vmaf.<output_fmt>.gz. Compressed logs are read transparently. Not with -output_fmt npz. (Default: false).")
+    parser.add_argument('-log_pipe', action='store_true', default=False,
+                        help="Read the libvmaf log through a pipe instead of writing <distorted>_vmaf.<output_fmt> next to the distorted file, e.g. on read-only or network mounts. No log file is kept. (Default: false).")
 
     parser.add_argument(
         '-cambi_heatmap', help='Activate cambi heatmap. (Default: false).', action='store_true')
@@ -134,6 +322,8 @@ def get_args():
         action='store_true',
         default=False
     )
+    parser.add_argument('-store', dest='store', type=str, nargs='?', const=default_store_path(), default=None,
+                        help="Record every result (inputs, parameters, pooled scores, sync data and timings) in a SQLite results store, queried with easyvmaf-results. (Default: disabled; with no path: $EASYVMAF_RESULTS_DB, else ~/.local/share/easyvmaf/results.sqlite).")
     parser.add_argument(
         '-gpu',
         help='Use GPU-accelerated VMAF computation via libvmaf_cuda. '
@@ -169,6 +359,20 @@ def main():
     ''' to avoid error negative numbers are not allowed'''
     syncWin = abs(cmdParser.sw)
     ss = abs(cmdParser.ss)
+    sync_method = cmdParser.sync_method
+    sync_stride = abs(cmdParser.sync_stride) or None
+    sync_proxy = abs(cmdParser.sync_proxy) or None
+    sync_confirm = cmdParser.sync_confirm
+    sync_stop_psnr = abs(cmdParser.sync_stop_psnr) or None
+    sync_stop_margin = abs(cmdParser.sync_stop_margin) or None
+    anchors = abs(cmdParser.anchors)
+    sync_cache = probe_cache = None
+    if not cmdParser.no_cache:
+        cache_args = dict(cache_dir=cmdParser.cache_dir, max_age=abs(cmdParser.cache_ttl) * 24 * 3600,
+                          max_entries=abs(cmdParser.cache_size))
+        sync_cache = SyncCache(**cache_args)
+        probe_cache = ProbeCache(fingerprint=cmdParser.probe_fingerprint, **cache_args)
+    idet = cmdParser.idet
     fps = abs(cmdParser.fps)
     n_subsample = abs(cmdParser.n)
     reverse = cmdParser.reverse
@@ -179,8 +383,15 @@ def main():
     print_progress = cmdParser.progress
     end_sync = cmdParser.endsync
     cambi_heatmap = cmdParser.cambi_heatmap
+    log_pipe = cmdParser.log_pipe
+    frame_index = cmdParser.frame_index
+    compress_log = cmdParser.compress_log
+    if frame_index and log_pipe:
+        logger.warning("-frame_index needs a VMAF output file, ignoring it with -log_pipe")
+        frame_index = False
     sync_only = cmdParser.sync_only
     use_json = cmdParser.json
+    store = ResultStore(os.path.expanduser(cmdParser.store)) if cmdParser.store else None
     gpu_mode = cmdParser.gpu
 
     # Setting verbosity
@@ -239,10 +450,17 @@ def main():
             sys.exit(1)
         logger.info("GPU mode enabled — using libvmaf_cuda filter.")
 
+    if anchors and syncWin == 0:
+        logger.warning("-anchors needs an automatic sync (-sw), ignoring it")
+        anchors = 0
+
     # check output format
-    if not output_fmt in ["json", "xml", "csv"]:
+    if not output_fmt in OUTPUT_FORMATS:
         logger.warning("output_fmt '%s' not supported, using json", output_fmt)
         output_fmt = "json"
+    if compress_log and (output_fmt == 'npz' or log_pipe):
+        logger.warning("-compress_log applies to json, xml and csv output files, ignoring it")
+        compress_log = False
 
     '''
     Distorted video path could be loaded as patterns i.e., "myFolder/video-sample-*.mp4"
@@ -260,28 +478,39 @@ def main():
               main_pattern, file=sys.stderr)
         sys.exit(1)
 
-    for main in mainFiles:
+    # Probe everything up front: the reference once, the distorted files concurrently
+    try:
+        refVideo, mainVideos = _probe_inputs(mainFiles, reference, loglevel, probe_cache, threads, idet)
+    except (subprocess.CalledProcessError, ValueError, KeyError, IndexError) as e:
+        print(f"[easyVmaf] ERROR: cannot probe {reference}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not mainVideos:
+        sys.exit(1)
+
+    vmaf_args = dict(loglevel=loglevel, subsample=n_subsample, model=model, output_fmt=output_fmt,
+                     threads=threads, print_progress=print_progress, end_sync=end_sync,
+                     manual_fps=fps, cambi_heatmap=cambi_heatmap, gpu_mode=gpu_mode,
+                     probe_cache=probe_cache, log_pipe=log_pipe,
+                     compress_log=compress_log)
+    sync_args = dict(syncWindow=syncWin, start=ss, reverse=reverse, method=sync_method,
+                     stride=sync_stride, proxy=sync_proxy, confirm=sync_confirm, cache=sync_cache,
+                     stop_psnr=sync_stop_psnr, stop_margin=sync_stop_margin)
+
+    if cmdParser.sync_only and syncWin > 0:
+        sys.exit(_batch_sync(mainVideos, refVideo, vmaf_args, sync_args, anchors, use_json, store,
+                             abs(cmdParser.jobs)))
+
+    for mainVideo in mainVideos:
+        main = mainVideo.videoSrc
         '''check if syncWin was set. If true offset is computed automatically, otherwise manual values are used  '''
 
+        segments = None
         try:
-            myVmaf = vmaf(main, reference, loglevel=loglevel, subsample=n_subsample, model=model,
-                          output_fmt=output_fmt, threads=threads, print_progress=print_progress, end_sync=end_sync, manual_fps=fps, cambi_heatmap=cambi_heatmap, gpu_mode=gpu_mode)
             if syncWin > 0:
-                offset, psnr = myVmaf.syncOffset(syncWin, ss, reverse)
-                if cmdParser.sync_only:
-                    if use_json:
-                        result = _build_result(
-                            distorted=main,
-                            reference=reference,
-                            offset=offset,
-                            psnr=psnr,
-                            model=model,
-                        )
-                        print(json.dumps(result))
-                    else:
-                        print(f"offset: {offset} | psnr: {psnr}", flush=True)
-                    sys.exit(0)
+                myVmaf, offset, psnr = _sync_rendition(mainVideo, refVideo, vmaf_args, sync_args, anchors)
+                segments = myVmaf.segments
             else:
+                myVmaf = vmaf(mainVideo, refVideo, **vmaf_args)
                 offset = ss
                 psnr = None
                 if reverse:
@@ -289,61 +518,44 @@ def main():
                 else:
                     myVmaf.offset = offset
 
-            vmafProcess = myVmaf.getVmaf()
+            if segments:
+                results = myVmaf.getVmafSegments()
+            else:
+                results = [myVmaf.getVmaf()]
         except (UnsupportedFramerateError, ValueError) as e:
             print(f"[easyVmaf] ERROR: {e}", file=sys.stderr)
             sys.exit(1)
-        vmafpath = myVmaf.ffmpegQos.vmafpath
-        vmafScore = []
-        vmafNegScore = []
-        vmafPhoneScore = []
-
-        if output_fmt == 'csv':
-            with open(vmafpath, mode='r', newline='') as csvFile:
-                csvReader = csv.DictReader(csvFile)
-                for row in csvReader:
-                    if model == 'HD':
-                        vmafScore.append(float(row[HD_MODEL_NAME]))
-                        vmafNegScore.append(float(row[HD_NEG_MODEL_NAME]))
-                        vmafPhoneScore.append(float(row[HD_PHONE_MODEL_NAME]))
-                    if model == '4K':
-                        vmafScore.append(float(row[_4K_MODEL_NAME]))
-
-        elif output_fmt == 'xml':
-            tree = ET.parse(vmafpath)
-            root = tree.getroot()
-            for frame in root.findall('frames/frame'):
-                if model == 'HD':
-                    vmafScore.append(float(frame.attrib[HD_MODEL_NAME]))
-                    vmafNegScore.append(float(frame.attrib[HD_NEG_MODEL_NAME]))
-                    vmafPhoneScore.append(float(frame.attrib[HD_PHONE_MODEL_NAME]))
-                if model == '4K':
-                    vmafScore.append(float(frame.attrib[_4K_MODEL_NAME]))
-        else:
-            with open(vmafpath) as jsonFile:
-                jsonData = json.load(jsonFile)
-                for frame in jsonData['frames']:
-                    if model == 'HD':
-                        vmafScore.append(frame["metrics"][HD_MODEL_NAME])
-                        vmafNegScore.append(
-                            frame["metrics"][HD_NEG_MODEL_NAME])
-                        vmafPhoneScore.append(
-                            frame["metrics"][HD_PHONE_MODEL_NAME])
-                    if model == '4K':
-                        vmafScore.append(frame["metrics"][_4K_MODEL_NAME])
+        failed = [result for result in results if not result.ok]
+        if failed:
+            print(f"[easyVmaf] ERROR: VMAF computation failed for {main} "
+                  f"(ffmpeg exit status {failed[0].returncode})", file=sys.stderr)
+            sys.exit(1)
 
-        if use_json:
-            vmaf_scores = {}
-            if model == 'HD':
-                vmaf_scores = {
-                    HD_MODEL_NAME:       mean(vmafScore),
-                    HD_NEG_MODEL_NAME:   mean(vmafNegScore),
-                    HD_PHONE_MODEL_NAME: mean(vmafPhoneScore),
-                }
-            elif model == '4K':
-                vmaf_scores = {
-                    _4K_MODEL_NAME: mean(vmafScore),
-                }
+        pooled = None
+        indexPath = None
+        if segments:
+            # Pool the frames of every segment, as if they came from a single run
+            for segment, result in zip(segments, results):
+                segment['frames'] = result.frames
+                segment['vmaf'] = result.means
+                if frame_index:
+                    segment['frame_index'] = result.frameIndex().path
+            frameScores = {name: np.concatenate([result.scores[name] for result in results])
+                           for name in results[0].scores}
+            pooled = pool_scores(frameScores)
+            vmaf_scores = {name: pooled[name]['mean'] for name in model_names(model)}
+            vmafpath = None
+        else:
+            vmafResult = results[0]
+            vmafpath = vmafResult.log_path
+            # The text output only needs the means, which are streamed without loading the frames
+            if use_json or store is not None:
+                pooled = vmafResult.pooled
+            vmaf_scores = vmafResult.means
+            if frame_index:
+                indexPath = vmafResult.frameIndex().path
+
+        if use_json or store is not None:
             result = _build_result(
                 distorted=main,
                 reference=reference,
@@ -351,12 +563,26 @@ def main():
                 psnr=psnr,
                 model=model,
                 vmaf_scores=vmaf_scores,
-                vmaf_output_file=myVmaf.ffmpegQos.vmafpath,
+                vmaf_output_file=vmafpath,
                 cambi_heatmap_path=(
                     myVmaf.ffmpegQos.vmaf_cambi_heatmap_path
                     if cambi_heatmap else None
                 ),
+                sync_method=myVmaf.syncMethod,
+                anchors=myVmaf.anchors,
+                segments=segments,
+                pooled=pooled,
+                frame_index=indexPath,
             )
+            if store is not None:
+                # The parse and pool times of the log(s) are kept by the results
+                timings = dict(myVmaf.timings)
+                for vmafResult in results:
+                    for stage in ('parse', 'pool'):
+                        if stage in vmafResult.timings:
+                            timings[stage] = timings.get(stage, 0) + vmafResult.timings[stage]
+                store.add(result, _run_params(vmaf_args, sync_args, anchors), timings)
+        if use_json:
             print(json.dumps(result))
         else:
             print("\n \n \n \n \n ")
@@ -366,19 +592,28 @@ def main():
             print("VMAF computed", flush=True)
             print("=======================================", flush=True)
             print("offset: ", offset, " | psnr: ", psnr)
+            for segment in segments or []:
+                print(f"segment: {segment['start']:.3f}s + {segment['duration']:.3f}s"
+                      f" | offset: {segment['offset']} | frames: {segment['frames']}")
             if model == 'HD':
-                print("VMAF HD: ", mean(vmafScore))
-                print("VMAF Neg: ", mean(vmafNegScore))
-                print("VMAF Phone: ", mean(vmafPhoneScore))
+                print("VMAF HD: ", vmaf_scores[HD_MODEL_NAME])
+                print("VMAF Neg: ", vmaf_scores[HD_NEG_MODEL_NAME])
+                print("VMAF Phone: ", vmaf_scores[HD_PHONE_MODEL_NAME])
             if model == '4K':
-                print("VMAF 4K: ", mean(vmafScore))
-            print("VMAF output file path: ", myVmaf.ffmpegQos.vmafpath)
+                print("VMAF 4K: ", vmaf_scores[_4K_MODEL_NAME])
+            if segments:
+                for segment in segments:
+                    if segment['output_file']:
+                        print("VMAF output file path: ", segment['output_file'])
+            elif vmafpath:
+                print("VMAF output file path: ", vmafpath)
+            if indexPath:
+                print("Frame index path: ", indexPath)
             if cambi_heatmap:
                 print("CAMBI Heatmap output path: ",
                     myVmaf.ffmpegQos.vmaf_cambi_heatmap_path)
 
             print("\n \n \n \n \n ")
 
-
 if __name__ == '__main__':
     main()
@@ -24,11 +24,16 @@ SOFTWARE.
 
 
 from . import config
+import asyncio
 import re
 import subprocess
 import json
 import logging
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from ffmpeg_progress_yield import FfmpegProgress
 
 logger = logging.getLogger(__name__)
@@ -70,7 +75,9 @@ class FFprobe:
     Inputs:
         - videoSrc: path to video
     Outputs:
+        - getInfo()
         - getStreamInfo()
+        - getAudioStreamInfo()
         - getFramesInfo()
         - getPacketsInfo()
     '''
@@ -80,6 +87,7 @@ class FFprobe:
         self.videoSrc = videoSrc
         self.loglevel = loglevel
         self.streamInfo = None
+        self.formatInfo = None
         self.framesInfo = None
         self.packetsInfo = None
         self._cmd = None
@@ -91,31 +99,124 @@ class FFprobe:
         return [FFprobe._executable, '-hide_banner', '-loglevel', ffprobe_loglevel,
                 '-print_format', 'json']
 
-    def _commitStreamSelection(self):
-        return ['-select_streams', 'v']
+    def _commitStreamSelection(self, streams='v'):
+        return ['-select_streams', streams]
 
-    def _commitInput(self):
-        return ['-i', self.videoSrc, '-read_intervals', '%+5']
+    def _commitInput(self, intervals='%+5'):
+        return ['-i', self.videoSrc, '-read_intervals', intervals]
 
-    def _commit(self, opt):
+    def _commit(self, opt, streams='v', intervals='%+5'):
+        opts = opt if isinstance(opt, list) else [opt]
         self._cmd = (
             self._commitBase() +
-            [opt] +
-            self._commitStreamSelection() +
-            self._commitInput()
+            opts +
+            self._commitStreamSelection(streams) +
+            self._commitInput(intervals)
         )
 
     def _run(self):
         logger.debug("FFprobe cmd: %s", self._cmd)
         return json.loads(subprocess.check_output(self._cmd, shell=False))
 
+    async def _runAsync(self):
+        logger.debug("FFprobe cmd: %s", self._cmd)
+        return json.loads((await run_async(self._cmd, stderr=None)).stdout)
+
+    def _cacheKey(self, cache):
+        # The probe cmd is part of the key: a change of options misses the old entries
+        return cache.key(self.videoSrc, cmd=self._cmd[self._cmd.index('-print_format'):])
+
+    def _runCached(self, cache=None):
+        """_run() through an optional easyvmaf.cache.ProbeCache"""
+        if cache is None:
+            return self._run()
+        key = self._cacheKey(cache)
+        info = cache.get(key)
+        if info is None:
+            info = self._run()
+            cache.put(key, info)
+        return info
+
+    async def _runCachedAsync(self, cache=None):
+        """_runCached() with ffprobe awaited: only the local SQLite lookups block"""
+        if cache is None:
+            return await self._runAsync()
+        key = self._cacheKey(cache)
+        info = cache.get(key)
+        if info is None:
+            info = await self._runAsync()
+            cache.put(key, info)
+        return info
+
+    def _commitInfo(self, frames):
+        self._commit(['-show_streams', '-show_format'] + (['-show_frames'] if frames else []))
+
+    def _setInfo(self, info, frames):
+        info.setdefault('frames', [])
+        self.streamInfo = info['streams'][0]
+        self.formatInfo = info['format']
+        self.framesInfo = info['frames'] if frames else None
+        return info
+
+    def _commitInterlaceSample(self, intervals, start):
+        self._commit(['-show_entries', 'frame=interlaced_frame,top_field_first,pkt_size'],
+                     intervals=','.join(f'{start + t:.3f}%+{length:.3f}' for t, length in intervals))
+
     ''' public methods '''
 
+    def getInfo(self, frames=True, cache=None):
+        """
+        Streams, format and (optionally) the frame sample of the first seconds
+        of the video, in a single ffprobe run and demux pass. With an
+        easyvmaf.cache.ProbeCache, a file probed before is not probed again.
+
+        Returns:
+            the ffprobe dict, with 'streams', 'format' and 'frames' keys.
+            The video stream, format and frames are also stored in
+            streamInfo, formatInfo and framesInfo.
+        """
+        self._commitInfo(frames)
+        return self._setInfo(self._runCached(cache), frames)
+
+    async def getInfoAsync(self, frames=True, cache=None):
+        """asyncio counterpart of getInfo(): ffprobe is awaited, not waited for in a thread."""
+        self._commitInfo(frames)
+        return self._setInfo(await self._runCachedAsync(cache), frames)
+
+    def getInterlaceSample(self, intervals, start=0, cache=None):
+        """
+        Interlace flags of the frames of several short intervals spread across
+        the video (see sample_intervals()), read in a single ffprobe run that
+        seeks from one interval to the next instead of decoding the whole prefix.
+
+        Returns:
+            the frames list, each frame with 'interlaced_frame',
+            'top_field_first' and 'pkt_size'. Also stored in framesInfo.
+
+        The intervals are relative to the start of the video; `start` is its
+        start_time, since -read_intervals takes absolute timestamps.
+        """
+        self._commitInterlaceSample(intervals, start)
+        self.framesInfo = self._runCached(cache).get('frames', [])
+        return self.framesInfo
+
+    async def getInterlaceSampleAsync(self, intervals, start=0, cache=None):
+        """asyncio counterpart of getInterlaceSample()."""
+        self._commitInterlaceSample(intervals, start)
+        self.framesInfo = (await self._runCachedAsync(cache)).get('frames', [])
+        return self.framesInfo
+
     def getStreamInfo(self):
         self._commit('-show_streams')
         self.streamInfo = self._run()['streams'][0]
         return self.streamInfo
 
+    def getAudioStreamInfo(self):
+        """First audio stream of the input, or None if it has no audio."""
+        self._commit('-show_streams', streams='a')
+        streams = self._run().get('streams', [])
+        return streams[0] if streams else None
+
     def getFramesInfo(self):
         self._commit('-show_frames')
         self.framesInfo = self._run()['frames']
@@ -132,6 +233,132 @@ class FFprobe:
         return self.packetsInfo
 
 
+class RawDecodeCache:
+    '''
+    In-memory cache of raw decodes (see FFmpegQos.getRawFrames() and
+    getAudioSamples()), keyed by the exact ffmpeg command line: the same
+    command decodes the same bytes. Renditions synced against the same
+    reference window thus share a single decode of it.
+
+    Thread-safe: concurrent requests for the same command wait for one run.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def run(self, cmd, runner):
+        """runner(cmd), unless the same cmd already ran (or is running)"""
+        key = tuple(cmd)
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            try:
+                future.set_result(runner(cmd))
+            except BaseException as e:
+                future.set_exception(e)
+        else:
+            logger.debug("Shared decode: %s", cmd)
+        return future.result()
+
+    def __len__(self):
+        return len(self._results)
+
+
+class LogPipe:
+    '''
+    Hands a libvmaf log to Python without writing it next to the inputs:
+    `path` is a FIFO in a private temporary directory, to pass as the
+    log_path of libvmaf, which a thread reads with `reader` while ffmpeg
+    writes it. Where os.mkfifo() is not available (Windows), `path` is a
+    plain file of that directory, read once ffmpeg is done.
+
+    Use it as a context manager around the ffmpeg run: leaving it waits
+    for the reader and removes the directory. From a coroutine, await
+    closeAsync() instead, which waits without blocking the event loop.
+
+        with LogPipe('.json', reader) as pipe:
+            qos.getVmaf(log_path=pipe.path, ...)
+        scores = pipe.value()
+
+    Inputs:
+        - suffix: extension of the log ('.json', '.xml' or '.csv')
+        - reader: callable(binary file object) -> value, f.read by default
+    Outputs:
+        - path, fifo
+        - value(): what reader returned, or the exception it raised
+    '''
+
+    def __init__(self, suffix='.json', reader=None):
+        self.reader = reader or (lambda f: f.read())
+        self.fifo = hasattr(os, 'mkfifo')
+        self._dir = tempfile.mkdtemp(prefix='easyvmaf-')
+        self.path = os.path.join(self._dir, 'vmaf' + suffix)
+        self._thread = None
+        self._value = None
+        self._error = None
+        self._read_done = False
+
+    def __enter__(self):
+        if self.fifo:
+            os.mkfifo(self.path, 0o600)
+            self._thread = threading.Thread(target=self._read, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                self._value = self.reader(f)
+        except Exception as e:
+            self._error = e
+        self._read_done = True
+
+    def close(self):
+        """wait for the reader (ffmpeg must be done) and remove the temporary directory"""
+        try:
+            if self._thread is not None:
+                while self._thread.is_alive():
+                    self._release()
+                    self._thread.join(0.1)
+            elif not self._read_done and os.path.exists(self.path):
+                self._read()
+        finally:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    async def closeAsync(self):
+        """
+        asyncio counterpart of close(): the wait runs in the default executor.
+        Cancelling the awaiting task does not interrupt it, so the reader is
+        still joined and the directory removed.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.shield(loop.run_in_executor(None, self.close))
+
+    def _release(self):
+        """
+        Open and close the write end of the FIFO, so that a reader still
+        waiting for ffmpeg to open it (e.g. ffmpeg failed before writing the
+        log) gets an end of file instead of blocking forever.
+        """
+        try:
+            os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+        except OSError:
+            # No reader on the FIFO: it has not opened it yet, or is done
+            pass
+
+    def value(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
 class FFmpegQos:
     '''
     Class to interact with FFmpeg QoS Filters: PSNR and VMAF.
@@ -139,17 +366,18 @@ class FFmpegQos:
     '''
     _executable = os.environ.get('FFMPEG', config.ffmpeg)
 
-    def __init__(self,  main, ref, loglevel="info", gpu_mode=False):
+    def __init__(self,  main, ref, loglevel="info", gpu_mode=False, fast_deint=False):
         self.loglevel = loglevel
         self._cmd = None
-        self.main = inputFFmpeg(main, input_id=0, gpu_mode=gpu_mode)
-        self.ref  = inputFFmpeg(ref,  input_id=1, gpu_mode=gpu_mode)
+        self.main = inputFFmpeg(main, input_id=0, gpu_mode=gpu_mode, fast_deint=fast_deint)
+        self.ref  = inputFFmpeg(ref,  input_id=1, gpu_mode=gpu_mode, fast_deint=fast_deint)
         self.psnrFilter = []
         self.vmafFilter = []
         self.invertedSrc = False
         self.vmafpath = None
         self.vmaf_cambi_heatmap_path = None
         self.gpu_mode = gpu_mode
+        self._process = None
 
     @staticmethod
     def _escape_filter_value(value: str) -> str:
@@ -196,8 +424,10 @@ class FFmpegQos:
         )
 
     def _commitInputs(self):
-        """build the cmd for the inputs files"""
-        return ['-i', self.main.videoSrc, '-i', self.ref.videoSrc, '-map', '0:v', '-map', '1:v']
+        """build the cmd for the inputs files, each preceded by its input options (e.g. -ss/-t)"""
+        return (self.main.extraOptions + ['-i', self.main.videoSrc] +
+                self.ref.extraOptions + ['-i', self.ref.videoSrc] +
+                ['-map', '0:v', '-map', '1:v'])
 
     def _commitOutputs(self):
         return ['-f', 'null', '-']
@@ -238,29 +468,43 @@ class FFmpegQos:
             parts.append('\\\\:'.join(tokens))
         return '|'.join(parts)
 
-    def getPsnr(self, stats_file=False):
+    def getPsnr(self, stats_file=False, abort=None):
         """
         It adds PSNR filter to lavfi chain and run the ffmpeg cmd.
-        The output is returned and saved as stats_file_psnr.log
+        The average PSNR is returned, as read from the ffmpeg output: no
+        file is written unless stats_file is True, which saves the per-frame
+        stats as <main>_psnr.log (or stats_file, if it is a path).
+
+        abort is an optional threading.Event: if it is set by the time ffmpeg
+        is started, the run is killed at once, as kill() from another thread
+        may have come before the process existed.
         """
         main = self.main.lastOutputID
         ref = self.ref.lastOutputID
         if stats_file == True:
             stats_file = os.path.splitext(self.main.videoSrc)[0] + '_psnr.log'
-        else:
-            stats_file = 'stats_file_psnr.log'
 
-        self.psnrFilter = [f'[{main}][{ref}]psnr=stats_file={self._escape_filter_value(stats_file)}']
+        if stats_file:
+            self.psnrFilter = [f'[{main}][{ref}]psnr=stats_file={self._escape_filter_value(stats_file)}']
+        else:
+            self.psnrFilter = [f'[{main}][{ref}]psnr']
         self._commit()
 
         logger.debug("FFmpeg PSNR cmd: %s", self._cmd)
-        stdout = subprocess.check_output(
-            self._cmd, stderr=subprocess.STDOUT, shell=False).decode('utf-8')
-        stdout = stdout.split(" ")
+        # Popen rather than check_output, so that kill() can stop the run from another thread
+        self._process = subprocess.Popen(
+            self._cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False)
+        if abort is not None and abort.is_set():
+            self._process.kill()
+        stdout, _ = self._process.communicate()
+        if self._process.returncode != 0:
+            raise subprocess.CalledProcessError(self._process.returncode, self._cmd, stdout)
+        stdout = stdout.decode('utf-8').split(" ")
         psnr = [s for s in stdout if "average" in s][0].split(":")[1]
         return float(psnr)
 
-    def getVmaf(self, log_path=None, model='HD', subsample=1, output_fmt='json', threads=0, print_progress=False, end_sync=False, features=None, cambi_heatmap=False, gpu=False):
+    def _commitVmaf(self, log_path=None, model='HD', subsample=1, output_fmt='json', threads=0, end_sync=False, features=None, cambi_heatmap=False, gpu=False):
+        """build the libvmaf filter and the ffmpeg cmd of getVmaf()"""
         if output_fmt == 'xml':
             log_fmt = "xml"
             if log_path == None:
@@ -328,11 +572,22 @@ class FFmpegQos:
         self._commit()
         logger.debug("FFmpeg VMAF cmd: %s", self._cmd)
 
-        if print_progress:
+    def getVmaf(self, log_path=None, model='HD', subsample=1, output_fmt='json', threads=0, print_progress=False, end_sync=False, features=None, cambi_heatmap=False, gpu=False, on_progress=None):
+        """
+        Run libvmaf. With print_progress, or with an on_progress(percent)
+        callback, the run goes through FfmpegProgress and its progress is
+        logged, or passed to on_progress, as ffmpeg reports it.
+        """
+        self._commitVmaf(log_path, model, subsample, output_fmt, threads, end_sync, features,
+                         cambi_heatmap, gpu)
+
+        if print_progress or on_progress:
             process = FfmpegProgress(self._cmd)
             for progress in process.run_command_with_progress():
-                logger.info("progress = %s%% - %s", progress,
-                            "\n".join(str(process.stderr).splitlines()[-9:-8]))
+                if on_progress:
+                    on_progress(progress)
+                if print_progress:
+                    logger.info("progress = %s%%", progress)
 
         else:
             process = subprocess.Popen(
@@ -341,6 +596,89 @@ class FFmpegQos:
 
         return process
 
+    async def getVmafAsync(self, log_path=None, model='HD', subsample=1, output_fmt='json', threads=0, end_sync=False, features=None, cambi_heatmap=False, gpu=False):
+        """
+        asyncio counterpart of getVmaf(): the same ffmpeg cmd, awaited instead
+        of blocking a thread. Cancelling the awaiting task kills ffmpeg. No
+        progress is reported.
+
+        Returns:
+            subprocess.CompletedProcess of the ffmpeg run
+
+        Raises:
+            subprocess.CalledProcessError: if ffmpeg fails
+        """
+        self._commitVmaf(log_path, model, subsample, output_fmt, threads, end_sync, features,
+                         cambi_heatmap, gpu)
+        return await run_async(self._cmd, stderr=None)
+
+    def _commitRawInput(self, stream, pix_fmt):
+        """build the cmd to decode one input, through its own filter chain, into a y4m pipe"""
+        # The input is decoded on its own, so it is always input 0 of this cmd
+        filters = [f.replace(f'[{stream.id}:v]', '[0:v]', 1) for f in stream.filtersList]
+        cmd = self._commitBase() + stream.extraOptions + ['-i', stream.videoSrc]
+        if filters:
+            cmd += ['-filter_complex', ';'.join(filters), '-map', f'[{stream.lastOutputID}]']
+        else:
+            cmd += ['-map', '0:v:0']
+        return cmd + ['-an', '-pix_fmt', pix_fmt, '-f', 'yuv4mpegpipe', '-']
+
+    def _runRaw(self, cmd):
+        logger.debug("FFmpeg raw cmd: %s", cmd)
+        return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              shell=False, check=True).stdout
+
+    def _runRawShared(self, cmd, cache=None):
+        """_runRaw() through an optional RawDecodeCache"""
+        if cache is None:
+            return self._runRaw(cmd)
+        return cache.run(cmd, self._runRaw)
+
+    def getRawFrames(self, pix_fmt='yuv420p', cache=None):
+        """
+        Decode main and ref through their filter chains and return the
+        frames as yuv4mpegpipe byte strings: (main_y4m, ref_y4m).
+
+        Each input is decoded exactly once, by its own ffmpeg process, and
+        both processes run concurrently. No QoS filter is involved, the
+        comparison is left to the caller (see easyvmaf.sync).
+
+        With a RawDecodeCache, the ref decode is shared with every other
+        FFmpegQos that decodes the very same ref window and chain.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            main_y4m = executor.submit(self._runRaw, self._commitRawInput(self.main, pix_fmt))
+            ref_y4m = executor.submit(self._runRawShared, self._commitRawInput(self.ref, pix_fmt), cache)
+            return main_y4m.result(), ref_y4m.result()
+
+    def _commitPcmInput(self, stream, sample_rate):
+        """build the cmd to decode the first audio stream of one input to mono f32le PCM"""
+        # aresample=async pads a late audio start with silence, so that sample 0
+        # lines up with the start of the input (or its -ss seek point)
+        return (self._commitBase() + stream.extraOptions + ['-i', stream.videoSrc] +
+                ['-map', '0:a:0', '-vn', '-af', 'aresample=async=1:first_pts=0',
+                 '-ac', '1', '-ar', str(sample_rate), '-f', 'f32le', '-'])
+
+    def getAudioSamples(self, sample_rate=8000, cache=None):
+        """
+        Decode the first audio stream of main and ref, downmixed to mono at
+        `sample_rate`, honouring each input's seek (see inputFFmpeg.setSeek()).
+        As for getRawFrames(), a RawDecodeCache shares the ref decode.
+
+        Returns:
+            (main_pcm, ref_pcm) as native float32 little-endian byte strings
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            main_pcm = executor.submit(self._runRaw, self._commitPcmInput(self.main, sample_rate))
+            ref_pcm = executor.submit(self._runRawShared, self._commitPcmInput(self.ref, sample_rate), cache)
+            return main_pcm.result(), ref_pcm.result()
+
+    def kill(self):
+        """Kill the ffmpeg process started by getPsnr(), if it is still running."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
     def clearFilters(self):
         self.psnrFilter = []
         self.vmafFilter = []
@@ -363,11 +701,17 @@ class inputFFmpeg:
     - setDeintFrameFilter()
     - setDeintFieldFilter()
     - setTrimFilter()
+    - setSeek()
     - setFpsFilter()
+    - setFormatFilter()
     - clearFilters()
+
+    With fast_deint=True the deinterlace filters drop to plain field
+    extraction (field / separatefields) instead of yadif. Much cheaper,
+    and good enough when the frames are downscaled afterwards anyway.
     '''
 
-    def __init__(self, videoSrc, input_id, gpu_mode=False):
+    def __init__(self, videoSrc, input_id, gpu_mode=False, fast_deint=False):
         self.name = f'input{input_id}_'
         self.id = input_id
         self.videoSrc = videoSrc
@@ -375,6 +719,7 @@ class inputFFmpeg:
         self.extraOptions = []
         self.lastOutputID = f'{str(self.id)}:v'
         self.gpu_mode = gpu_mode
+        self.fast_deint = fast_deint
         self._hwupload_done = False   # tracks whether hwupload has been inserted
 
     def _setFilter(self, filter):
@@ -443,8 +788,11 @@ class inputFFmpeg:
         """
         yadifOpt = '0:-1:0'
         inputID, outputID = self._newInOutForFilter()
-        yadifFilter = f'[{inputID}]yadif={yadifOpt}[{outputID}]'
-        self._setFilter(yadifFilter)
+        if self.fast_deint:
+            deintFilter = f'[{inputID}]field=type=top[{outputID}]'
+        else:
+            deintFilter = f'[{inputID}]yadif={yadifOpt}[{outputID}]'
+        self._setFilter(deintFilter)
         self._updateOutputId(outputID)
 
     def setDeintFieldFilter(self):
@@ -453,8 +801,11 @@ class inputFFmpeg:
         """
         yadifOpt = '1:-1:0'
         inputID, outputID = self._newInOutForFilter()
-        yadifFilter = f'[{inputID}]yadif={yadifOpt}[{outputID}]'
-        self._setFilter(yadifFilter)
+        if self.fast_deint:
+            deintFilter = f'[{inputID}]separatefields[{outputID}]'
+        else:
+            deintFilter = f'[{inputID}]yadif={yadifOpt}[{outputID}]'
+        self._setFilter(deintFilter)
         self._updateOutputId(outputID)
 
     def setTrimFilter(self, start, duration):
@@ -464,18 +815,149 @@ class inputFFmpeg:
         self._updateOutputId(outputID)
         return
 
+    def setSeek(self, start, duration=None):
+        """
+        Input-side equivalent of setTrimFilter(): emits -ss/-t in front of
+        this input's -i. FFmpeg seeks to the keyframe preceding `start` and
+        then drops the decoded frames up to `start` exactly (accurate_seek),
+        so frames before the last keyframe are never decoded or filtered.
+        Timestamps restart at 0, like trim + setpts=PTS-STARTPTS.
+        """
+        self.extraOptions = []
+        if start > 0:
+            self.extraOptions += ['-ss', str(start)]
+        if duration is not None:
+            self.extraOptions += ['-t', str(duration)]
+
     def setFpsFilter(self, fps):
         inputID, outputID = self._newInOutForFilter()
         fpsFilter = f'[{inputID}]fps=fps={fps}[{outputID}]'
         self._setFilter(fpsFilter)
         self._updateOutputId(outputID)
 
+    def setFormatFilter(self, pix_fmt):
+        """Convert the pixel format, e.g. 'gray' to keep the luma plane only."""
+        inputID, outputID = self._newInOutForFilter()
+        formatFilter = f'[{inputID}]format={pix_fmt}[{outputID}]'
+        self._setFilter(formatFilter)
+        self._updateOutputId(outputID)
+
     def clearFilters(self):
         self.filtersList = []
+        self.extraOptions = []
         self.lastOutputID = f'{str(self.id)}:v'
         self._hwupload_done = False   # reset so hwupload can be re-inserted
 
 
+def sample_intervals(duration, samples=5, length=1.0):
+    """
+    `samples` intervals of `length` seconds, as (start, length) pairs relative
+    to the start of a video of `duration` seconds, centered in `samples` equal
+    parts of it: neither the first nor the last seconds (slates, credits)
+    decide alone. A video too short to hold them is sampled as a whole.
+    """
+    if duration <= samples * length:
+        return [(0.0, max(duration, length))]
+    return [(round(duration * (i + 0.5) / samples - length / 2, 3), length)
+            for i in range(samples)]
+
+
+_IDET_RE = re.compile(r'Multi frame detection:\s*TFF:\s*(\d+)\s*BFF:\s*(\d+)\s*'
+                      r'Progressive:\s*(\d+)\s*Undetermined:\s*(\d+)')
+
+
+def parse_idet(stderr):
+    """
+    Frame counts of the 'Multi frame detection' summary that the idet filter
+    logs on exit, summed over every idet instance in `stderr`.
+
+    Returns:
+        {'tff': int, 'bff': int, 'progressive': int, 'undetermined': int}
+    """
+    counts = dict.fromkeys(('tff', 'bff', 'progressive', 'undetermined'), 0)
+    for match in _IDET_RE.finditer(stderr):
+        for name, value in zip(counts, match.groups()):
+            counts[name] += int(value)
+    return counts
+
+
+def _idet_cmd(videoSrc, intervals):
+    cmd = [FFmpegQos._executable, '-hide_banner', '-nostats', '-loglevel', 'info']
+    for start, length in intervals:
+        cmd += ['-ss', f'{start:.3f}', '-t', f'{length:.3f}', '-i', videoSrc]
+    inputs = ''.join(f'[{i}:v:0]' for i in range(len(intervals)))
+    cmd += ['-filter_complex', f'{inputs}concat=n={len(intervals)}:v=1:a=0,idet',
+            '-an', '-f', 'null', '-']
+    logger.debug("FFmpeg idet cmd: %s", cmd)
+    return cmd
+
+
+def _idet_cached(videoSrc, intervals, cache):
+    """(cache key, cached idet counts or None)"""
+    if cache is None:
+        return None, None
+    key = cache.key(videoSrc, detector='idet', intervals=[list(i) for i in intervals])
+    return key, cache.get(key)
+
+
+def idet_sample(videoSrc, intervals, cache=None):
+    """
+    Run the idet filter on several short intervals of a video (see
+    sample_intervals()) in one ffmpeg process: every interval is a seeked
+    input of its own, and the decoded intervals are concatenated into a
+    single idet instance. With an easyvmaf.cache.ProbeCache, a file analysed
+    before is not decoded again.
+
+    Returns:
+        the idet frame counts, see parse_idet()
+    """
+    key, counts = _idet_cached(videoSrc, intervals, cache)
+    if counts is None:
+        process = subprocess.run(_idet_cmd(videoSrc, intervals), stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE, shell=False, check=True, text=True)
+        counts = parse_idet(process.stderr)
+        if cache is not None:
+            cache.put(key, counts)
+    return counts
+
+
+async def idet_sample_async(videoSrc, intervals, cache=None):
+    """asyncio counterpart of idet_sample()."""
+    key, counts = _idet_cached(videoSrc, intervals, cache)
+    if counts is None:
+        process = await run_async(_idet_cmd(videoSrc, intervals), stdout=subprocess.DEVNULL)
+        counts = parse_idet(process.stderr.decode('utf-8', 'replace'))
+        if cache is not None:
+            cache.put(key, counts)
+    return counts
+
+
+async def run_async(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True):
+    """
+    asyncio counterpart of subprocess.run(): no thread is held while the
+    command runs, so one event loop can drive hundreds of ffmpeg/ffprobe
+    processes. Cancelling the awaiting task kills the process, and reaps it,
+    before the cancellation propagates.
+
+    Returns:
+        subprocess.CompletedProcess, with stdout/stderr as bytes (or None)
+
+    Raises:
+        subprocess.CalledProcessError: if check and the command fails
+    """
+    process = await asyncio.create_subprocess_exec(*cmd, stdout=stdout, stderr=stderr)
+    try:
+        out, err = await process.communicate()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        raise
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, out, err)
+    return subprocess.CompletedProcess(cmd, process.returncode, out, err)
+
+
 def check_ffmpeg() -> dict:
     """
     Detect FFmpeg version and libvmaf built-in model availability.
@@ -0,0 +1,260 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+import logging
+import math
+import os
+import struct
+import sys
+from array import array
+from itertools import chain
+
+import numpy as np
+
+from .logs import LogFormatError, iter_frames, pool_scores
+
+logger = logging.getLogger(__name__)
+
+# Extension of the index written next to a libvmaf log, see index_path()
+INDEX_EXT = '.frames'
+
+_MAGIC = b'EVMAFIDX'
+_VERSION = 1
+# Data starts on a multiple of this many bytes
+_ALIGN = 64
+# Rows written to the index at a time by build_index()
+_BATCH_ROWS = 4096
+
+
+class FrameIndexError(ValueError):
+    """Raised when a frame index cannot be read, or queried by time without a frame rate."""
+    pass
+
+
+def index_path(log_path):
+    """Path of the frame index of a libvmaf log: <log_path>.frames"""
+    return os.fspath(log_path) + INDEX_EXT
+
+
+def _header(names, frames, fps, start, size=None):
+    """Magic, header length and JSON header, padded with spaces to `size` bytes (or to _ALIGN)."""
+    text = json.dumps({'version': _VERSION, 'names': names, 'frames': frames,
+                       'fps': fps, 'start': start}).encode('utf-8')
+    if size is None:
+        # Room for the final frame count, whatever the placeholder written first
+        size = -(-(len(_MAGIC) + 4 + len(text) + 32) // _ALIGN) * _ALIGN
+    length = size - len(_MAGIC) - 4
+    if len(text) > length:
+        raise FrameIndexError("Frame index header does not fit its reserved size")
+    return _MAGIC + struct.pack('<I', length) + text.ljust(length)
+
+
+def build_index(log_path, path=None, fmt=None, names=None, fps=None, start=0.0):
+    """
+    Convert a libvmaf log into a frame index (see FrameIndex) in one
+    streaming pass: the log is never held in memory, and rows are written
+    a batch at a time. The index is written to a temporary file and then
+    renamed, so readers never see a partial one.
+
+    Args:
+        log_path: path to the libvmaf log
+        path:     path of the index, index_path(log_path) when None
+        fmt:      'json', 'xml' or 'csv', guessed from the extension when None
+        names:    metrics to keep, every metric of the log when None
+        fps:      frame rate of the scored frames, needed by time queries
+        start:    time of frame 0 in seconds, e.g. the seek of MAIN
+
+    Returns:
+        the FrameIndex, opened
+    """
+    path = path or index_path(log_path)
+    frames = iter_frames(log_path, fmt)
+    first = next(frames, None)
+    kept = []
+    if first is not None:
+        kept = list(first[1]) if names is None else [name for name in names if name in first[1]]
+    size = len(_header(kept, 0, fps, start))
+    frameNums = array('q')
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(b'\0' * size)
+            batch = array('d')
+
+            def flush():
+                if sys.byteorder != 'little':
+                    batch.byteswap()
+                batch.tofile(f)
+                del batch[:]
+
+            for i, (frameNum, metrics) in enumerate(chain([] if first is None else [first], frames)):
+                try:
+                    batch.extend([metrics[name] for name in kept])
+                except KeyError as e:
+                    raise LogFormatError(f"No {e.args[0]} score for frame {frameNum} "
+                                         f"in libvmaf log {log_path}")
+                frameNums.append(i if frameNum is None else frameNum)
+                if len(batch) >= _BATCH_ROWS * len(kept):
+                    flush()
+            flush()
+            if sys.byteorder != 'little':
+                frameNums.byteswap()
+            frameNums.tofile(f)
+            f.seek(0)
+            f.write(_header(kept, len(frameNums), fps, start, size))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    logger.debug("Frame index of %s: %s (%s frames x %s metrics)", log_path, path,
+                 len(frameNums), len(kept))
+    return FrameIndex(path)
+
+
+def open_index(log_path, fmt=None, names=None, fps=None, start=0.0):
+    """
+    FrameIndex of a libvmaf log: its index_path() if it is there and newer
+    than the log, else a new one built with build_index().
+    """
+    path = index_path(log_path)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(log_path):
+            return FrameIndex(path)
+    except (OSError, FrameIndexError) as e:
+        logger.debug("Rebuilding frame index %s: %s", path, e)
+    return build_index(log_path, path, fmt, names, fps, start)
+
+
+def _seconds(value):
+    """Seconds of a time given as a number or as 'HH:MM:SS(.fff)' / 'MM:SS(.fff)'."""
+    if isinstance(value, str):
+        seconds = 0.0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    return float(value)
+
+
+class FrameIndex:
+    '''
+    Random-access store of the per-frame scores of a libvmaf log, built once
+    by build_index() and memory-mapped afterwards: a query only reads the
+    pages of the frames it asks for, not the rest of the file.
+
+    File layout (little-endian):
+        - 'EVMAFIDX', uint32 header length, JSON header {version, names,
+          frames, fps, start}, padded to a multiple of 64 bytes
+        - frames x metrics float64 matrix, one fixed-width row per frame
+        - frames int64 frameNum table (sorted), for frame and time lookups
+
+    Frame ranges are half-open, [first, last) in frameNum; a time range
+    [start, end) holds the frames whose time, start + frameNum / fps, is in
+    it. Times are seconds or 'HH:MM:SS(.fff)' strings.
+
+    Inputs:
+        - path: path to the index
+    Outputs:
+        - names, fps, start, frames, frameNums
+        - frameRange() / timeRange(): dict of metric name -> np.ndarray view
+        - pool() / poolTime(): easyvmaf.logs.pool_scores() of a window
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise FrameIndexError(f"Not a frame index: {path}")
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+        if header.get('version') != _VERSION:
+            raise FrameIndexError(f"Unsupported frame index version {header.get('version')}: {path}")
+        self.names = header['names']
+        self.fps = header['fps']
+        self.start = header['start']
+        self.frames = frames = header['frames']
+        offset = len(_MAGIC) + 4 + length
+        if frames and self.names:
+            self._matrix = np.memmap(path, dtype='<f8', mode='r', offset=offset,
+                                     shape=(frames, len(self.names)))
+        else:
+            self._matrix = np.empty((frames, len(self.names)))
+        if frames:
+            self.frameNums = np.memmap(path, dtype='<i8', mode='r',
+                                       offset=offset + frames * len(self.names) * 8, shape=(frames,))
+        else:
+            self.frameNums = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return self.frames
+
+    def _rows(self, first=None, last=None):
+        lo = 0 if first is None else int(np.searchsorted(self.frameNums, first, 'left'))
+        hi = len(self) if last is None else int(np.searchsorted(self.frameNums, last, 'left'))
+        return slice(lo, max(lo, hi))
+
+    def _frames(self, start, end):
+        """[first, last) frameNums of the [start, end) time range"""
+        if not self.fps:
+            raise FrameIndexError(f"No frame rate in frame index {self.path}: query it by frame")
+        def frame(t):
+            return None if t is None else math.ceil((_seconds(t) - self.start) * self.fps - 1e-6)
+        return frame(start), frame(end)
+
+    def frameRange(self, first=None, last=None, names=None):
+        """
+        Scores of the frames in [first, last), as read-only views into the
+        mapped file (copy them to keep them past close()).
+        """
+        rows = self._rows(first, last)
+        scores = {}
+        for name in names or self.names:
+            if name not in self.names:
+                raise FrameIndexError(f"No {name} scores in frame index {self.path}")
+            scores[name] = self._matrix[rows, self.names.index(name)]
+        return scores
+
+    def timeRange(self, start=None, end=None, names=None):
+        """frameRange() of the frames in the [start, end) time range"""
+        return self.frameRange(*self._frames(start, end), names=names)
+
+    def pool(self, first=None, last=None, names=None):
+        """Pooled stats of the frames in [first, last), see easyvmaf.logs.pool_scores()"""
+        return pool_scores(self.frameRange(first, last, names))
+
+    def poolTime(self, start=None, end=None, names=None):
+        """Pooled stats of the frames in the [start, end) time range"""
+        return pool_scores(self.timeRange(start, end, names))
+
+    def close(self):
+        self._matrix = self.frameNums = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return (f'FrameIndex(path={self.path!r}, frames={self.frames}, '
+                f'metrics={len(self.names)}, fps={self.fps})')
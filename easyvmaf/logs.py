@@ -0,0 +1,521 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+import math
+import os
+import re
+import struct
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# libvmaf log formats, as the output_fmt of easyvmaf
+LOG_FORMATS = ('json', 'xml', 'csv')
+
+# Output formats of easyvmaf: the libvmaf logs, and npz, converted from a json log (see save_npz())
+OUTPUT_FORMATS = LOG_FORMATS + ('npz',)
+
+# Extension of gzip-compressed logs (see compress_log()), read transparently by every reader
+GZIP_EXT = '.gz'
+GZIP_LEVEL = 6
+_GZIP_MAGIC = b'\x1f\x8b'
+
+# Column of the frame numbers in npz outputs
+NPZ_FRAME_KEY = 'frameNum'
+
+# Percentiles reported by pool_scores()
+POOL_PERCENTILES = (1, 5, 10)
+
+# Bytes read at a time by iter_json_frames()
+_JSON_CHUNK = 64 * 1024
+_JSON_FRAMES_RE = re.compile(r'"frames"\s*:\s*\[')
+_JSON_SEPARATORS = ' \t\r\n,'
+
+
+class LogFormatError(ValueError):
+    """Raised when a libvmaf log cannot be parsed."""
+    pass
+
+
+class RunningStats:
+    '''
+    Pooled statistics of a stream of per-frame scores in constant memory:
+    count, mean, min, max, standard deviation (Welford's algorithm) and
+    harmonic mean.
+
+    The harmonic mean is libvmaf's one, n / sum(1 / (x + 1)) - 1, which
+    stays defined for scores of 0.
+
+    Inputs:
+        - values: optional iterable of scores to start with
+    Outputs:
+        - add() / update() / merge()
+        - count, mean, min, max, variance, std, harmonic_mean
+        - to_dict()
+    '''
+    __slots__ = ('count', 'mean', 'min', 'max', '_m2', '_inverse_sum')
+
+    def __init__(self, values=()):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+        self._inverse_sum = 0.0
+        self.update(values)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self._inverse_sum += 1.0 / (value + 1.0)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """Pool the frames of `other` into these stats, as if they had been added one by one."""
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self._inverse_sum += other._inverse_sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        """Population variance, as libvmaf reports it."""
+        return self._m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def harmonic_mean(self):
+        return self.count / self._inverse_sum - 1.0 if self.count else math.nan
+
+    def to_dict(self):
+        return {
+            'frames': self.count,
+            'mean': self.mean,
+            'harmonic_mean': self.harmonic_mean,
+            'min': self.min,
+            'max': self.max,
+            'std': self.std,
+        }
+
+    def __repr__(self):
+        return (f'RunningStats(count={self.count}, mean={self.mean}, min={self.min}, '
+                f'max={self.max}, std={self.std})')
+
+
+def log_format(path):
+    """
+    Log format (see OUTPUT_FORMATS) from the extension of `path` (or of the
+    name of an open file), past a GZIP_EXT, json by default.
+    """
+    name = _name(path)
+    if name.lower().endswith(GZIP_EXT):
+        name = name[:-len(GZIP_EXT)]
+    ext = os.path.splitext(name)[1].lstrip('.').lower()
+    return ext if ext in OUTPUT_FORMATS else 'json'
+
+
+def _name(source):
+    """path of a log given as a path or as an open file"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return str(getattr(source, 'name', '<stream>'))
+
+
+@contextmanager
+def _open_binary(source):
+    """
+    A log given as a path, or as an open file (e.g. the read end of a
+    LogPipe), to read from. A path is decompressed on the fly when it holds
+    gzip data, whatever its extension. Open files are read from where they
+    are and left open.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    with open(source, 'rb') as f:
+        if f.peek(len(_GZIP_MAGIC))[:len(_GZIP_MAGIC)] == _GZIP_MAGIC:
+            with gzip.GzipFile(fileobj=f) as g:
+                yield g
+        else:
+            yield f
+
+
+@contextmanager
+def _open_text(source, newline=None):
+    """_open_binary() of a log, as a text file."""
+    with _open_binary(source) as f:
+        if not isinstance(f.read(0), bytes):
+            yield f
+            return
+        text = io.TextIOWrapper(f, encoding='utf-8', newline=newline)
+        try:
+            yield text
+        finally:
+            text.detach()
+
+
+def iter_json_frames(path):
+    """
+    Yield (frameNum, metrics) for every frame of a libvmaf JSON log, one
+    frame at a time: the file is read in chunks and each frame object is
+    decoded on its own, so neither the file nor the frames list is ever
+    held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with _open_text(path) as f:
+        buffer = ''
+        # Skip the header up to the start of the frames array
+        while True:
+            chunk = f.read(_JSON_CHUNK)
+            buffer += chunk
+            match = _JSON_FRAMES_RE.search(buffer)
+            if match:
+                pos = match.end()
+                break
+            if not chunk:
+                raise LogFormatError(f"No frames array in libvmaf log {_name(path)}")
+            buffer = buffer[-32:]
+
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in _JSON_SEPARATORS:
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                if pos >= len(buffer):
+                    raise ValueError
+                frame, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Frame cut by the end of the buffer: read on, unless there is nothing left
+                if eof:
+                    raise LogFormatError(f"Truncated frames array in libvmaf log {_name(path)}")
+                chunk = f.read(_JSON_CHUNK)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            yield frame.get('frameNum'), frame['metrics']
+
+
+def iter_xml_frames(path):
+    """
+    Yield (frameNum, metrics) for every frame of a libvmaf XML log with
+    ET.iterparse(): every <frame> element is dropped from the tree once
+    read, so memory does not grow with the number of frames.
+    """
+    parent = None
+    with _open_binary(path) as f:
+        try:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == 'frames':
+                        parent = elem
+                    continue
+                if elem.tag != 'frame':
+                    continue
+                attrib = elem.attrib
+                frameNum = int(attrib['frameNum']) if 'frameNum' in attrib else None
+                metrics = {name: float(value) for name, value in attrib.items() if name != 'frameNum'}
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+                yield frameNum, metrics
+        except ET.ParseError as e:
+            raise LogFormatError(f"Invalid libvmaf log {_name(path)}: {e}") from e
+
+
+def iter_csv_frames(path):
+    """
+    Yield (frameNum, metrics) for every row of a libvmaf CSV log with
+    csv.DictReader, which already reads one row at a time. Empty cells and
+    the unnamed column of a trailing comma are left out.
+    """
+    with _open_text(path, newline='') as csvFile:
+        for i, row in enumerate(csv.DictReader(csvFile)):
+            frame = row.pop('Frame', None)
+            metrics = {name: float(value) for name, value in row.items() if name and value}
+            yield (int(frame) if frame else i), metrics
+
+
+def iter_npz_frames(path):
+    """Yield (frameNum, metrics) for every frame of an npz output (see save_npz())."""
+    scores = load_npz(path)
+    frameNums = load_npz(path, [NPZ_FRAME_KEY]).get(NPZ_FRAME_KEY)
+    names = list(scores)
+    for i, row in enumerate(zip(*scores.values()) if names else ()):
+        yield (int(frameNums[i]) if frameNums is not None else i), dict(zip(names, map(float, row)))
+
+
+_READERS = {'json': iter_json_frames, 'xml': iter_xml_frames, 'csv': iter_csv_frames,
+            'npz': iter_npz_frames}
+
+
+def iter_frames(path, fmt=None):
+    """
+    Yield (frameNum, metrics) for every frame of a libvmaf log, in order,
+    where metrics is a dict of metric name -> score. `path` is a path or an
+    open file, gzip-compressed or not. `fmt` is 'json', 'xml', 'csv' or
+    'npz', guessed from the extension when None.
+    """
+    try:
+        yield from _READERS[fmt or log_format(path)](path)
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        raise LogFormatError(f"Invalid compressed libvmaf log {_name(path)}: {e}") from e
+
+
+def pool_log(path, fmt=None, names=None):
+    """
+    Pool the per-frame scores of a libvmaf log in one streaming pass.
+
+    Args:
+        path:  path to the libvmaf log, or an open file of it
+        fmt:   'json', 'xml' or 'csv', guessed from the extension when None
+        names: metrics to pool, every metric of the log when None
+
+    Returns:
+        dict of metric name -> RunningStats
+    """
+    stats = {name: RunningStats() for name in names} if names is not None else {}
+    for frameNum, metrics in iter_frames(path, fmt):
+        if names is None:
+            for name, value in metrics.items():
+                stats.setdefault(name, RunningStats()).add(value)
+            continue
+        for name in names:
+            try:
+                stats[name].add(metrics[name])
+            except KeyError:
+                raise LogFormatError(f"No {name} score for frame {frameNum} in libvmaf log {_name(path)}")
+    return stats
+
+
+def load_scores(path, fmt=None, names=None):
+    """
+    Per-frame scores of a libvmaf log as contiguous float64 NumPy arrays,
+    one per metric, filled in one streaming pass: 8 bytes per frame and
+    metric, and no per-frame Python object is kept.
+
+    Args:
+        path:  path to the libvmaf log, or an open file of it
+        fmt:   'json', 'xml' or 'csv', guessed from the extension when None
+        names: metrics to load, every metric of the log when None. Metrics
+               the log does not have (from its first frame) are left out.
+
+    Returns:
+        dict of metric name -> 1-D np.ndarray, in frame order. The arrays of
+        an npz output are mapped from the file rather than read, see
+        load_npz().
+    """
+    if (fmt or log_format(path)) == 'npz':
+        return load_npz(path, names)
+    return collect_scores(iter_frames(path, fmt), names, f'libvmaf log {_name(path)}')
+
+
+def collect_scores(frames, names=None, source='libvmaf log'):
+    """
+    load_scores() of any iterable of (frameNum, metrics), e.g. the frames
+    of vmaf.iterVmaf(). `source` names them in error messages.
+    """
+    columns = None
+    for frameNum, metrics in frames:
+        if columns is None:
+            kept = list(metrics) if names is None else [name for name in names if name in metrics]
+            columns = {name: array('d') for name in kept}
+        for name, column in columns.items():
+            try:
+                column.append(metrics[name])
+            except KeyError:
+                raise LogFormatError(f"No {name} score for frame {frameNum} in {source}")
+    return {name: np.frombuffer(column, dtype=np.float64) for name, column in (columns or {}).items()}
+
+
+def compress_log(path, source):
+    """
+    Write a libvmaf log (a path or an open file, e.g. the read end of a
+    LogPipe) gzip-compressed to path, chunk by chunk as it is read. The file
+    is written to a temporary file and then renamed, so it is never seen
+    partial.
+
+    Returns:
+        path
+
+    Raises:
+        LogFormatError: if the log is empty (e.g. libvmaf failed)
+    """
+    tmp = path + '.tmp'
+    try:
+        with _open_binary(source) as f, gzip.open(tmp, 'wb', compresslevel=GZIP_LEVEL) as g:
+            size = 0
+            while True:
+                chunk = f.read(_JSON_CHUNK)
+                if not chunk:
+                    break
+                g.write(chunk)
+                size += len(chunk)
+        if not size:
+            raise LogFormatError(f"Empty libvmaf log {_name(source)}")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def save_npz(path, source, fmt=None):
+    """
+    Convert a libvmaf log (a path or an open file, e.g. the read end of a
+    LogPipe) into an uncompressed .npz in one streaming pass: a float64
+    column per metric and an int64 NPZ_FRAME_KEY column. The npz is written
+    to a temporary file and then renamed, so it is never seen partial.
+
+    Returns:
+        path
+    """
+    frameNums = array('q')
+
+    def frames():
+        for frameNum, metrics in iter_frames(source, fmt):
+            frameNums.append(len(frameNums) if frameNum is None else frameNum)
+            yield frameNum, metrics
+
+    scores = collect_scores(frames(), None, f'libvmaf log {_name(source)}')
+    scores[NPZ_FRAME_KEY] = np.frombuffer(frameNums, dtype=np.int64)
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez(f, **scores)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def load_npz(path, names=None):
+    """
+    Columns of an npz output (see save_npz()) without reading them: np.savez
+    stores every column uncompressed in the zip, so each is memory-mapped
+    where it lies in the file, as a read-only array. Compressed members are
+    read instead.
+
+    Args:
+        path:  path to the .npz
+        names: columns to load, every metric when None (not NPZ_FRAME_KEY).
+               Columns the file does not have are left out.
+
+    Returns:
+        dict of column name -> 1-D np.ndarray, in the order of names, else of the file
+    """
+    columns = {}
+    try:
+        with zipfile.ZipFile(path) as z, open(path, 'rb') as f:
+            for info in z.infolist():
+                name = info.filename[:-len('.npy')]
+                # Every score column by default, never the frame numbers
+                skip = (name == NPZ_FRAME_KEY) if names is None else (name not in names)
+                if skip:
+                    continue
+                if info.compress_type != zipfile.ZIP_STORED:
+                    with z.open(info) as member:
+                        columns[name] = np.load(member)
+                    continue
+                # Data of a member: after its local file header (30 bytes + file name + extra field)
+                f.seek(info.header_offset + 26)
+                nameLength, extraLength = struct.unpack('<HH', f.read(4))
+                f.seek(info.header_offset + 30 + nameLength + extraLength)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+                if not np.prod(shape):
+                    columns[name] = np.empty(shape, dtype=dtype)
+                    continue
+                columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                          order='F' if fortran else 'C')
+    except (zipfile.BadZipFile, ValueError, struct.error) as e:
+        raise LogFormatError(f"Invalid npz output {_name(path)}: {e}") from e
+    order = names if names is not None else list(columns)
+    return {name: columns[name] for name in order if name in columns}
+
+
+def pool_scores(scores, percentiles=POOL_PERCENTILES):
+    """
+    Pool per-frame score arrays (see load_scores()) with one vectorized
+    pass over a frames x metrics matrix.
+
+    Returns:
+        dict of metric name -> {'mean', 'harmonic_mean', 'min', 'p<N>' for
+        each of `percentiles`, 'std'}, as Python floats. The harmonic mean is
+        libvmaf's one, see RunningStats; the std is the population one.
+    """
+    names = list(scores)
+    if not names:
+        return {}
+    matrix = np.column_stack([np.asarray(scores[name], dtype=np.float64) for name in names])
+    if not len(matrix):
+        return {name: dict.fromkeys(['mean', 'harmonic_mean', 'min'] +
+                                    [f'p{p}' for p in percentiles] + ['std'], math.nan)
+                for name in names}
+    pooled = {
+        'mean': matrix.mean(axis=0),
+        'harmonic_mean': len(matrix) / np.sum(1.0 / (matrix + 1.0), axis=0) - 1.0,
+        'min': matrix.min(axis=0),
+    }
+    for p, values in zip(percentiles, np.percentile(matrix, percentiles, axis=0)):
+        pooled[f'p{p}'] = values
+    pooled['std'] = matrix.std(axis=0)
+    return {name: {stat: float(values[i]) for stat, values in pooled.items()}
+            for i, name in enumerate(names)}
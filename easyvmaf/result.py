@@ -0,0 +1,198 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+from .ffmpeg import HD_MODEL_NAME, HD_NEG_MODEL_NAME, HD_PHONE_MODEL_NAME, _4K_MODEL_NAME
+from .frameindex import open_index
+from .logs import (collect_scores, iter_frames, load_npz, pool_log, pool_scores, RunningStats,
+                   LogFormatError)
+
+logger = logging.getLogger(__name__)
+
+# Features requested by easyVmaf (see vmaf._build_feature_string()) loaded besides the model scores
+POOLED_FEATURES = ('psnr_y', 'psnr_cb', 'psnr_cr', 'cambi')
+
+
+def model_names(model):
+    """Names of the scores libvmaf logs for an easyVmaf model ('HD' or '4K')."""
+    if model == 'HD':
+        return [HD_MODEL_NAME, HD_NEG_MODEL_NAME, HD_PHONE_MODEL_NAME]
+    return [_4K_MODEL_NAME]
+
+
+def model_scores(frames, model, source='libvmaf log'):
+    """
+    Per-frame scores of (frameNum, metrics) frames: the model scores and the
+    POOLED_FEATURES they have, see easyvmaf.logs.collect_scores().
+
+    Raises:
+        LogFormatError: if the frames have no scores of the model
+    """
+    names = model_names(model)
+    return _checked(collect_scores(frames, names + list(POOLED_FEATURES), source), names, source)
+
+
+def _checked(scores, names, source):
+    missing = [name for name in names if name not in scores]
+    if missing:
+        raise LogFormatError(f"No {', '.join(missing)} scores in {source}")
+    return scores
+
+
+def load_model_scores(path, output_fmt, model):
+    """
+    model_scores() of a libvmaf log, given as a path or an open file, or of
+    an npz output, whose columns are mapped rather than read (see
+    easyvmaf.logs.load_npz()).
+    """
+    source = f"libvmaf log {getattr(path, 'name', path)}"
+    if output_fmt == 'npz':
+        names = model_names(model)
+        return _checked(load_npz(path, names + list(POOLED_FEATURES)), names, source)
+    return model_scores(iter_frames(path, output_fmt), model, source)
+
+
+@dataclass
+class VmafFrame:
+    """
+    One frame of vmaf.iterVmaf(): its index among the frames scored so far,
+    the chunk it was computed in, its scores, and the running pooled stats
+    of every metric up to it. `stats` is the same dict for every frame,
+    updated as frames come: copy it to keep a snapshot.
+    """
+    frameNum: int
+    chunk: int
+    metrics: Dict[str, float]
+    stats: Dict[str, RunningStats]
+
+
+class VmafResult:
+    '''
+    Result of one VMAF run (see vmaf.getVmaf()): where its libvmaf log is,
+    how it was computed and how it ended. The log is only parsed when the
+    scores are first needed, and only once.
+
+    Inputs:
+        - log_path: path to the libvmaf log, None if it was not written to
+          a file (see vmaf(log_pipe=True))
+        - output_fmt: 'json', 'xml', 'csv' or 'npz'
+        - model: 'HD' or '4K'
+        - offset: sync offset applied, in seconds
+        - returncode: exit status of ffmpeg
+        - timings: dict of stage -> seconds ('probe', 'sync', 'vmaf', ...)
+        - cambi_heatmap_path: path of the CAMBI heatmaps, if computed
+        - process: the Popen/FfmpegProgress/CompletedProcess of the run
+        - scores: per-frame scores already read from the log (e.g. through
+          an easyvmaf.ffmpeg.LogPipe), used instead of parsing log_path
+        - fps: frame rate of the scored frames (see vmaf.frameRate())
+        - start: time of the first scored frame in MAIN, in seconds
+    Outputs:
+        - means: mean of every model score, streamed from the log without
+          building any frame list (or taken from scores, if already loaded)
+        - scores: per-frame NumPy arrays of the model scores and of the
+          POOLED_FEATURES the log has (see easyvmaf.logs.load_scores())
+        - pooled: pooled stats of scores (see easyvmaf.logs.pool_scores())
+        - frameIndex(): memory-mapped index of the log, for frame and time
+          range queries (see easyvmaf.frameindex)
+        - frames, ok
+    '''
+
+    def __init__(self, log_path, output_fmt='json', model='HD', offset=0, returncode=0,
+                 timings=None, cambi_heatmap_path=None, process=None, scores=None, fps=None,
+                 start=0.0):
+        self.log_path = log_path
+        self.output_fmt = output_fmt
+        self.model = model
+        self.offset = offset
+        self.returncode = returncode
+        self.timings = dict(timings or {})
+        self.cambi_heatmap_path = cambi_heatmap_path
+        self.process = process
+        self.fps = fps
+        self.start = start
+        self._means = None
+        self._scores = scores
+        self._pooled = None
+
+    @property
+    def names(self):
+        return model_names(self.model)
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def _timed(self, stage, func, *args):
+        t0 = time.perf_counter()
+        value = func(*args)
+        self.timings[stage] = self.timings.get(stage, 0) + time.perf_counter() - t0
+        return value
+
+    @property
+    def means(self):
+        if self._means is None:
+            # An npz output is mapped: its columns are as cheap as streaming
+            if self._scores is None and self.log_path is not None and self.output_fmt != 'npz':
+                stats = self._timed('parse', pool_log, self.log_path, self.output_fmt, self.names)
+                self._means = {name: s.mean for name, s in stats.items()}
+            else:
+                self._means = {name: float(self.scores[name].mean()) for name in self.names}
+        return self._means
+
+    @property
+    def scores(self):
+        if self._scores is None:
+            self._scores = self._timed('parse', self._loadScores)
+        return self._scores
+
+    def _loadScores(self):
+        if self.log_path is None:
+            raise LogFormatError(f"No libvmaf log to read (ffmpeg exit status {self.returncode})")
+        return load_model_scores(self.log_path, self.output_fmt, self.model)
+
+    @property
+    def pooled(self):
+        if self._pooled is None:
+            self._pooled = self._timed('pool', pool_scores, self.scores)
+        return self._pooled
+
+    @property
+    def frames(self):
+        return len(self.scores[self.names[0]])
+
+    def frameIndex(self):
+        """
+        easyvmaf.frameindex.FrameIndex of the log: its <log>.frames sidecar,
+        built on first use and reused while it is newer than the log.
+        """
+        if self.log_path is None:
+            raise LogFormatError("No libvmaf log file to index")
+        return open_index(self.log_path, self.output_fmt, fps=self.fps, start=self.start)
+
+    def __repr__(self):
+        return (f'VmafResult(log_path={self.log_path!r}, model={self.model!r}, '
+                f'offset={self.offset}, returncode={self.returncode})')
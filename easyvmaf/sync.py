@@ -0,0 +1,373 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import logging
+import math
+import re
+from fractions import Fraction
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the float64 working set of one sliding_mse() chunk
+_CHUNK_BYTES = 256 * 1024 * 1024
+
+# Largest default coarse stride, in frames. The PSNR of neighbouring offsets
+# only stands out from the rest of the window within a few frames of the
+# true match, so a coarser grid can step over it entirely.
+_MAX_DEFAULT_STRIDE = 8
+
+# MPEG-TS timestamps are 33-bit counters of a 90 kHz clock: they wrap every ~26.5 hours
+PTS_WRAP_SECONDS = Fraction(2 ** 33, 90000)
+# SMPTE timecodes wrap at midnight
+TIMECODE_WRAP_SECONDS = 24 * 3600
+
+_TIMECODE_RE = re.compile(r'^(\d{1,2}):(\d{2}):(\d{2})([:;.,])(\d{2,3})$')
+
+# Results needed before the margin-over-runner-up early stop rule may fire
+_MIN_MARGIN_RESULTS = 4
+
+# y4m chroma tag → (horizontal, vertical) chroma subsampling, None = no chroma
+_Y4M_CHROMA = {
+    b'420jpeg':  (2, 2),
+    b'420mpeg2': (2, 2),
+    b'420paldv': (2, 2),
+    b'420':      (2, 2),
+    b'422':      (2, 1),
+    b'444':      (1, 1),
+    b'mono':     None,
+}
+
+
+def read_y4m(data):
+    """
+    Parse a yuv4mpegpipe byte string as produced by FFmpegQos.getRawFrames().
+
+    Only 8-bit streams are supported. The frames are returned as a
+    zero-copy (n_frames, frame_bytes) uint8 view over `data`, each row
+    holding the Y, U and V planes back to back.
+
+    Returns:
+        (frames, width, height, fps) — fps as a Fraction
+
+    Raises:
+        ValueError: if `data` is not a well-formed 8-bit y4m stream
+    """
+    header_end = data.find(b'\n')
+    if not data.startswith(b'YUV4MPEG2 ') or header_end < 0:
+        raise ValueError("Not a yuv4mpegpipe stream")
+
+    width = height = None
+    fps = Fraction(0)
+    chroma = (2, 2)
+    for token in data[10:header_end].split(b' '):
+        tag, value = token[:1], token[1:]
+        if tag == b'W':
+            width = int(value)
+        elif tag == b'H':
+            height = int(value)
+        elif tag == b'F':
+            num, den = value.split(b':')
+            fps = Fraction(int(num), int(den))
+        elif tag == b'C':
+            if value not in _Y4M_CHROMA:
+                raise ValueError(f"Unsupported y4m colorspace: {value.decode()}")
+            chroma = _Y4M_CHROMA[value]
+    if width is None or height is None:
+        raise ValueError("y4m header is missing W/H")
+
+    frame_bytes = width * height
+    if chroma is not None:
+        cw, ch = chroma
+        frame_bytes += 2 * (-(-width // cw)) * (-(-height // ch))
+
+    # FFmpeg writes a bare 'FRAME\n' tag in front of every frame
+    tag = b'FRAME\n'
+    stride = len(tag) + frame_bytes
+    payload = memoryview(data)[header_end + 1:]
+    n_frames = len(payload) // stride
+    if len(payload) != n_frames * stride:
+        raise ValueError("Truncated or unsupported y4m stream")
+
+    frames = np.frombuffer(payload, dtype=np.uint8).reshape(n_frames, stride)
+    if n_frames and not (frames[:, :len(tag)] == np.frombuffer(tag, np.uint8)).all():
+        raise ValueError("Unsupported y4m frame header")
+    return frames[:, len(tag):], width, height, fps
+
+
+def sliding_mse(main, ref, chunk_bytes=_CHUNK_BYTES):
+    """
+    Mean squared error of `main` against every start position of `ref`.
+
+    `main` is an (M, P) array of M frames and `ref` an (R, P) array of R
+    frames. For each k in range(R) the first n = min(M, R - k) frames of
+    `main` are compared with ref[k:k + n], which mirrors what a per-offset
+    FFmpeg psnr run does near the end of the reference window.
+
+    All candidates are scored from a single cross-correlation matrix
+    (main @ ref.T) using sum((a - b)^2) = sum(a^2) + sum(b^2) - 2*sum(a*b).
+    The product is accumulated in float64 over pixel chunks, which is exact
+    for 8-bit integer frames, so a perfect match yields an MSE of exactly 0.
+
+    Returns:
+        float64 array of length R
+    """
+    main = np.asarray(main)
+    ref = np.asarray(ref)
+    if main.ndim != 2 or ref.ndim != 2 or main.shape[1] != ref.shape[1]:
+        raise ValueError(
+            f"Frame size mismatch: main {main.shape} vs ref {ref.shape}")
+    n_main, n_pixels = main.shape
+    n_ref = ref.shape[0]
+    if n_main == 0 or n_ref == 0:
+        raise ValueError("sliding_mse() needs at least one frame on each side")
+
+    cross = np.zeros((n_main, n_ref))
+    sq_main = np.zeros(n_main)
+    sq_ref = np.zeros(n_ref)
+    cols = max(1, chunk_bytes // ((n_main + n_ref) * 8))
+    for s in range(0, n_pixels, cols):
+        a = main[:, s:s + cols].astype(np.float64)
+        b = ref[:, s:s + cols].astype(np.float64)
+        cross += a @ b.T
+        sq_main += np.einsum('ij,ij->i', a, a)
+        sq_ref += np.einsum('ij,ij->i', b, b)
+
+    # diag[k] = sum_j cross[j, k + j], truncated at the end of ref
+    diag = np.zeros(n_ref)
+    for j in range(min(n_main, n_ref)):
+        diag[:n_ref - j] += cross[j, j:]
+
+    k = np.arange(n_ref)
+    n = np.minimum(n_main, n_ref - k)
+    cum_main = np.concatenate(([0.0], np.cumsum(sq_main)))
+    cum_ref = np.concatenate(([0.0], np.cumsum(sq_ref)))
+    sse = cum_main[n] + (cum_ref[k + n] - cum_ref[k]) - 2 * diag
+    return np.maximum(sse, 0.0) / (n * n_pixels)
+
+
+def sliding_mse_bytes(n_main, n_ref, n_pixels, chunk_bytes=_CHUNK_BYTES):
+    """Peak working memory of sliding_mse() in bytes, besides its input frames."""
+    return min(chunk_bytes, (n_main + n_ref) * 8 * n_pixels) + n_main * n_ref * 8
+
+
+def mse_to_psnr(mse, max_value=255.0):
+    """Convert MSE values to PSNR in dB, inf for a perfect match (as FFmpeg reports)."""
+    mse = np.asarray(mse, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return 10 * np.log10(max_value ** 2 / mse)
+
+
+def confident_match(psnrs, stop_psnr=None, stop_margin=None, min_results=_MIN_MARGIN_RESULTS):
+    """
+    Early stop rule of a sync search, given the PSNR values computed so far.
+
+    True when the best value reaches `stop_psnr` (inf, an identical match,
+    reaches any threshold), or when at least `min_results` values are known and the
+    best one beats the runner-up by `stop_margin` dB or more. None values
+    (offsets that could not be scored) are ignored, as are disabled (None) rules.
+    """
+    values = sorted((p for p in psnrs if p is not None), reverse=True)
+    if not values:
+        return False
+    if stop_psnr is not None and values[0] >= stop_psnr:
+        return True
+    if stop_margin is not None and len(values) >= max(2, min_results):
+        return values[0] - values[1] >= stop_margin
+    return False
+
+
+def default_stride(n):
+    """Coarse stride for coarse_to_fine(): the power of two below sqrt(n), capped at 8."""
+    if n < 4:
+        return 1
+    return min(2 ** int(math.log2(math.sqrt(n))), _MAX_DEFAULT_STRIDE)
+
+
+def coarse_to_fine(n, evaluate, stride=None, keep=3):
+    """
+    Hierarchical search for the best scoring index in range(n).
+
+    Every `stride`-th index (and the last one) is scored first. The stride is then halved at
+    each level and only the neighbourhood of the `keep` best indices found
+    so far is scored, down to single-index precision, which costs about
+    n / stride + 3 * keep * log2(stride) scores instead of n.
+
+    Args:
+        n:        number of candidates
+        evaluate: callable taking a list of indices and returning a dict
+                  {index: score}; higher is better. Each call receives a
+                  whole level at once so it can be evaluated in parallel.
+        stride:   coarse stride, default_stride(n) if None
+        keep:     number of candidates refined at each level
+
+    Returns:
+        dict {index: score} of every index that was evaluated
+    """
+    if stride is None:
+        stride = default_stride(n)
+    stride = max(1, int(stride))
+    scores = {}
+
+    def run(indices):
+        pending = sorted({i for i in indices if 0 <= i < n and i not in scores})
+        if pending:
+            scores.update(evaluate(pending))
+
+    run(list(range(0, n, stride)) + [n - 1])
+    while stride > 1:
+        next_stride = max(1, stride // 2)
+        best = sorted(scores, key=lambda i: (-scores[i], i))[:keep]
+        run(i for c in best
+            for i in range(c - stride + next_stride, c + stride, next_stride))
+        stride = next_stride
+    return scores
+
+
+def xcorr_lag(template, signal):
+    """
+    Locate `template` inside `signal` by FFT normalized cross-correlation.
+
+    Both are 1-D sample arrays. Every lag k in range(len(signal) - len(template) + 1)
+    is scored with the Pearson correlation between `template` and
+    signal[k:k + len(template)], so loud passages of `signal` are not favoured
+    over the true match.
+
+    Returns:
+        (lag, score) — best lag in samples and its correlation in [-1, 1]
+    """
+    template = np.asarray(template, dtype=np.float64)
+    signal = np.asarray(signal, dtype=np.float64)
+    n, m = len(template), len(signal)
+    if n == 0 or m < n:
+        raise ValueError(
+            f"Cannot correlate a template of {n} samples with a signal of {m} samples")
+
+    template = template - template.mean()
+    size = 1 << (n + m - 1).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(signal, size) * np.conj(np.fft.rfft(template, size)),
+                        size)[:m - n + 1]
+
+    # Energy of each signal window around its own mean
+    cum = np.concatenate(([0.0], np.cumsum(signal)))
+    cum_sq = np.concatenate(([0.0], np.cumsum(signal ** 2)))
+    win_sum = cum[n:] - cum[:-n]
+    win_var = np.maximum(cum_sq[n:] - cum_sq[:-n] - win_sum ** 2 / n, 0.0)
+    denom = np.sqrt(win_var * np.dot(template, template))
+
+    score = np.zeros_like(corr)
+    np.divide(corr, denom, out=score, where=denom > 1e-12 * max(1.0, denom.max()))
+    lag = int(np.argmax(score))
+    return lag, float(score[lag])
+
+
+def frame_signatures(frames):
+    """
+    Per-frame signatures for fingerprint matching: every row of `frames`
+    (typically a tiny gray thumbnail) is brought to zero mean and unit
+    variance, so brightness/contrast changes introduced by the encoding
+    chain do not affect the match. Flat frames map to all zeros.
+
+    Returns:
+        float64 array of the same shape as `frames`
+    """
+    sig = np.asarray(frames, dtype=np.float64)
+    sig = sig - sig.mean(axis=1, keepdims=True)
+    std = sig.std(axis=1, keepdims=True)
+    return np.divide(sig, std, out=np.zeros_like(sig), where=std > 1e-6)
+
+
+def timecode_to_seconds(timecode, fps):
+    """
+    Convert a SMPTE timecode 'HH:MM:SS:FF' to seconds at the actual frame rate `fps`.
+
+    A ';', '.' or ',' before the frame field marks drop-frame timecode
+    (29.97/59.94 fps), where frame numbers 0 and 1 (0-3 at 59.94) are
+    skipped every minute except every tenth minute.
+
+    Raises:
+        ValueError: if `timecode` is not a valid timecode at `fps`
+    """
+    match = _TIMECODE_RE.match(str(timecode).strip())
+    if not match or fps <= 0:
+        raise ValueError(f"Invalid timecode {timecode!r} at {fps} fps")
+    hh, mm, ss, sep, ff = match.groups()
+    hh, mm, ss, ff = int(hh), int(mm), int(ss), int(ff)
+    nominal = int(round(fps))
+    if mm > 59 or ss > 59 or ff >= nominal:
+        raise ValueError(f"Invalid timecode {timecode!r} at {fps} fps")
+
+    frames = ((hh * 60 + mm) * 60 + ss) * nominal + ff
+    if sep != ':':
+        drop = int(round(nominal / 15))
+        minutes = hh * 60 + mm
+        frames -= drop * (minutes - minutes // 10)
+    return frames / fps
+
+
+def fold_offset(delta, period):
+    """Bring a time difference back into [-period / 2, period / 2), undoing a counter wrap."""
+    return (delta + period / 2) % period - period / 2
+
+
+def group_anchors(offsets, tolerance):
+    """
+    Split a sequence of anchor offsets into runs of the same offset.
+
+    Consecutive anchors stay in the same run while their offset is within
+    `tolerance` of the first offset of the run.
+
+    Returns:
+        list of (first, last) index pairs, inclusive, covering every anchor in order
+    """
+    runs = []
+    for i, offset in enumerate(offsets):
+        if runs and abs(offset - offsets[runs[-1][0]]) <= tolerance:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(run) for run in runs]
+
+
+def bisect_boundary(lo, hi, classify, resolution):
+    """
+    Locate where the offset changes between two anchor times by bisection.
+
+    `classify(t)` tells which side the offset measured at time t belongs to:
+    0 for the offset at `lo`, 1 for the offset at `hi`, None for neither
+    (e.g. a gradual drift), which stops the search.
+
+    Returns:
+        the boundary time, within `resolution` seconds when the search runs to the end
+    """
+    while hi - lo > resolution:
+        mid = (lo + hi) / 2
+        side = classify(mid)
+        if side == 0:
+            lo = mid
+        elif side == 1:
+            hi = mid
+        else:
+            break
+    return (lo + hi) / 2
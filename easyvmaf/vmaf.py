@@ -22,16 +22,66 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from .ffmpeg import FFprobe
-from .ffmpeg import FFmpegQos
+from .ffmpeg import FFmpegQos, LogPipe
+from .ffmpeg import sample_intervals, idet_sample, idet_sample_async
+from .logs import GZIP_EXT, RunningStats, compress_log, iter_frames, save_npz
+from .result import VmafFrame, VmafResult, load_model_scores, model_scores
+from .sync import (read_y4m, sliding_mse, sliding_mse_bytes, mse_to_psnr, coarse_to_fine, xcorr_lag, frame_signatures,
+                   timecode_to_seconds, fold_offset, confident_match, group_anchors, bisect_boundary,
+                   PTS_WRAP_SECONDS, TIMECODE_WRAP_SECONDS)
+from fractions import Fraction
+import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 import logging
 import math
 import os
+import re
+import subprocess
+import threading
+import time
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# fps filter of inputFFmpeg.setFpsFilter(), and deinterlacers outputting a frame per field
+_FPS_FILTER_RE = re.compile(r'\]fps=fps=([0-9.]+)\[')
+_FIELD_DEINT_FILTERS = ('yadif=1:', 'separatefields')
+
+# Seconds of video per ffmpeg run of vmaf.iterVmaf()
+STREAM_CHUNK = 30
+
+# Available syncOffset() engines
+SYNC_METHODS = ('psnr', 'vectorized', 'hierarchical', 'audio', 'fingerprint', 'timestamp')
+
+# Seconds of main compared against each candidate position of the ref window
+SYNC_COMPARE_DURATION = 0.5
+
+# Seconds of main audio located in the ref window by the 'audio' sync method
+SYNC_AUDIO_DURATION = 3
+# Sample rate (Hz) the 'audio' sync method downmixes both inputs to
+SYNC_AUDIO_RATE = 8000
+
+# Seconds of main fingerprints matched against the ref window by the 'fingerprint' sync method
+SYNC_FINGERPRINT_DURATION = 5
+# Height of the gray thumbnails the 'fingerprint' sync method uses as frame signatures
+SYNC_FINGERPRINT_HEIGHT = 18
+
+# Seconds to which syncAnchors() locates the point where the offset changes
+SYNC_ANCHOR_RESOLUTION = 1
+# Height of the luma proxy syncAnchors() measures on when no proxy is given
+SYNC_ANCHOR_PROXY = 240
+# Upper bound, in bytes, of the frames and working sets of the anchors measured at once
+SYNC_ANCHOR_MEMORY = 1024 * 1024 * 1024
+
+# Intervals, spread across each input, sampled to decide whether it is interlaced
+INTERLACE_SAMPLES = 5
+# Seconds of each of those intervals
+INTERLACE_SAMPLE_LENGTH = 1
+
 
 @dataclass
 class FeatureConfig:
@@ -61,28 +111,86 @@ class UnsupportedFramerateError(ValueError):
     pass
 
 
+class _SyncAbort:
+    '''
+    Shared state of one per-offset sync search, letting an early stop kill
+    the ffmpeg psnr runs still in flight. Workers register their FFmpegQos
+    before running it and pass `event` to FFmpegQos.getPsnr(), which kills
+    a process started after abort(); once abort() is called no new run can
+    start.
+    '''
+
+    def __init__(self):
+        self.event = threading.Event()
+        self._lock = threading.Lock()
+        self._active = set()
+
+    def register(self, qos):
+        """Track `qos`, or return False if the search was already aborted."""
+        with self._lock:
+            if self.event.is_set():
+                return False
+            self._active.add(qos)
+            return True
+
+    def unregister(self, qos):
+        with self._lock:
+            self._active.discard(qos)
+
+    def abort(self):
+        with self._lock:
+            self.event.set()
+            for qos in self._active:
+                qos.kill()
+
+
 class video():
     """
     Video class to parse information of video streams obtained
     by _FFmpeg.FFprobe
     """
 
-    def __init__(self, videoSrc, loglevel="info"):
+    def __init__(self, videoSrc, loglevel="info", probe_cache=None, idet=False):
+        self._initAttributes(videoSrc, loglevel, probe_cache, idet)
+        # Streams and format come from a single ffprobe run
+        self.getInfo()
+        # duration is computed eagerly since vmaf.__init__ accesses it immediately
+        self.duration = self.getDuration()
+        # The interlace decision costs another probe run: it is only made when
+        # first needed (see interlaced), never with vmaf(manual_fps=...)
+
+    @classmethod
+    async def probeAsync(cls, videoSrc, loglevel="info", probe_cache=None, idet=False,
+                         interlace=True):
+        """
+        asyncio counterpart of video(videoSrc, ...): the same probes, with
+        ffprobe/ffmpeg awaited instead of blocking a thread. Cancelling the
+        awaiting task kills the probe in flight. The interlace decision is
+        made up front unless interlace is False, so that reading `interlaced`
+        later never blocks the event loop.
+        """
+        self = cls.__new__(cls)
+        self._initAttributes(videoSrc, loglevel, probe_cache, idet)
+        await self.getInfoAsync()
+        self.duration = self.getDuration()
+        if interlace:
+            await self.detectInterlaceAsync()
+        return self
+
+    def _initAttributes(self, videoSrc, loglevel, probe_cache, idet):
         self.videoSrc = videoSrc
         self.loglevel = loglevel
+        self.probe_cache = probe_cache
+        self.idet = idet
         self.streamInfo = None
         self.framesInfo = None
         self.packetsInfo = None
         self._formatInfo_cached = None
         self._interlaced_cached = None
+        self._interlaceConfidence_cached = None
         self.interlacedFrames = None
         self.totalFrames = None
         self.bytesFramesTotal = None
-        # Eager: streamInfo is needed immediately by all consumers
-        self.getStreamInfo()
-        # duration is computed eagerly since vmaf.__init__ accesses it immediately
-        self.duration = self.getDuration()
-        # formatInfo and interlaced are lazy — fetched on first access via properties
 
     @property
     def formatInfo(self):
@@ -97,31 +205,102 @@ class video():
     @property
     def interlaced(self):
         if self._interlaced_cached is None:
-            framesInfo = FFprobe(self.videoSrc, self.loglevel).getFramesInfo()
-            self._updateFramesSummaryFromFrames(framesInfo)
+            self.detectInterlace()
         return self._interlaced_cached
 
     @interlaced.setter
     def interlaced(self, value):
         self._interlaced_cached = value
 
+    @property
+    def interlaceConfidence(self):
+        self.interlaced
+        return self._interlaceConfidence_cached
+
+    @interlaceConfidence.setter
+    def interlaceConfidence(self, value):
+        self._interlaceConfidence_cached = value
+
+    def _setInterlaceDecision(self, interlaced, progressive):
+        """
+        Majority decision out of the interlaced and progressive frame counts.
+        The confidence goes from 0 (as many of each, or no frame at all) to
+        1 (every frame agrees).
+        """
+        total = interlaced + progressive
+        self.interlaced = total > 0 and interlaced * 2 > total
+        self.interlaceConfidence = abs(interlaced - progressive) / total if total else 0.0
+
     def _updateFramesSummaryFromFrames(self, framesInfo):
         """Compute interlace summary from a frames list. Called lazily."""
         interlacedFrames_count = 0
         bytesFramesTotal = 0
         for frame in framesInfo:
             interlacedFrames_count += int(frame['interlaced_frame'])
-            bytesFramesTotal += int(frame['pkt_size'])
+            bytesFramesTotal += int(frame.get('pkt_size', 0))
         self.interlacedFrames = interlacedFrames_count
         self.totalFrames = len(framesInfo)
         self.bytesFramesTotal = bytesFramesTotal
-        self.interlaced = bool(round(self.interlacedFrames / self.totalFrames))
+        self._setInterlaceDecision(self.interlacedFrames, self.totalFrames - self.interlacedFrames)
 
     def _updateFramesSummary(self):
         if self.framesInfo is None:
             return
         self._updateFramesSummaryFromFrames(self.framesInfo)
 
+    def detectInterlace(self):
+        """
+        Decide whether the video is interlaced from INTERLACE_SAMPLES short
+        intervals spread across it, read in a single run: by the interlaced_frame
+        flag of ffprobe, or with idet=True by the idet filter of ffmpeg, which
+        looks at the pictures themselves and catches content flagged wrongly.
+        Results go through the probe cache as the rest of the metadata.
+
+        Returns:
+            (interlaced, interlaceConfidence)
+        """
+        intervals = self._interlaceIntervals()
+        if self.idet:
+            self._updateIdetSummary(idet_sample(self.videoSrc, intervals, cache=self.probe_cache))
+        else:
+            probe = FFprobe(self.videoSrc, self.loglevel)
+            self.framesInfo = probe.getInterlaceSample(intervals, self._startTime(),
+                                                       cache=self.probe_cache)
+            self._updateFramesSummary()
+        return self._interlaceResult()
+
+    async def detectInterlaceAsync(self):
+        """asyncio counterpart of detectInterlace()."""
+        intervals = self._interlaceIntervals()
+        if self.idet:
+            self._updateIdetSummary(
+                await idet_sample_async(self.videoSrc, intervals, cache=self.probe_cache))
+        else:
+            probe = FFprobe(self.videoSrc, self.loglevel)
+            self.framesInfo = await probe.getInterlaceSampleAsync(intervals, self._startTime(),
+                                                                  cache=self.probe_cache)
+            self._updateFramesSummary()
+        return self._interlaceResult()
+
+    def _interlaceIntervals(self):
+        return sample_intervals(self.duration, INTERLACE_SAMPLES, INTERLACE_SAMPLE_LENGTH)
+
+    def _startTime(self):
+        try:
+            return float(self.formatInfo.get('start_time', 0))
+        except ValueError:
+            return 0
+
+    def _updateIdetSummary(self, counts):
+        self.interlacedFrames = counts['tff'] + counts['bff']
+        self.totalFrames = self.interlacedFrames + counts['progressive'] + counts['undetermined']
+        self._setInterlaceDecision(self.interlacedFrames, counts['progressive'])
+
+    def _interlaceResult(self):
+        logger.info("[easyVmaf] %s: interlaced=%s (confidence %.2f over %s sampled frames)",
+                    self.videoSrc, self.interlaced, self.interlaceConfidence, self.totalFrames)
+        return self.interlaced, self.interlaceConfidence
+
     def getDuration(self):
         _EPSILON = 0.001  # 1ms guard against float imprecision
         try:
@@ -136,6 +315,41 @@ class video():
                 duration = float(self.formatInfo['duration'])
         return math.floor(duration * 1000) / 1000  # floor to nearest millisecond
 
+    def getTimecode(self):
+        """Start timecode from the stream or container tags (e.g. MOV tmcd, MXF), or None."""
+        for info in (self.streamInfo, self.formatInfo):
+            timecode = (info or {}).get('tags', {}).get('timecode')
+            if timecode:
+                return timecode
+        return None
+
+    def getStartPts(self):
+        """(start_pts, time_base) of the video stream as exact integers/Fraction, or None."""
+        try:
+            return int(self.streamInfo['start_pts']), Fraction(self.streamInfo['time_base'])
+        except (KeyError, ValueError, ZeroDivisionError):
+            return None
+
+    def getInfo(self):
+        """Populate streamInfo and formatInfo with one ffprobe run."""
+        probe = self._logProbe()
+        probe.getInfo(frames=False, cache=self.probe_cache)
+        self.streamInfo = probe.streamInfo
+        self.formatInfo = probe.formatInfo
+
+    async def getInfoAsync(self):
+        """asyncio counterpart of getInfo()."""
+        probe = self._logProbe()
+        await probe.getInfoAsync(frames=False, cache=self.probe_cache)
+        self.streamInfo = probe.streamInfo
+        self.formatInfo = probe.formatInfo
+
+    def _logProbe(self):
+        logger.info("\n\n=======================================")
+        logger.info("[easyVmaf] Probing... %s", self.videoSrc)
+        logger.info("=======================================")
+        return FFprobe(self.videoSrc, self.loglevel)
+
     def getStreamInfo(self):
         logger.info("\n\n=======================================")
         logger.info("[easyVmaf] Getting stream info... %s", self.videoSrc)
@@ -174,12 +388,28 @@ class vmaf():
         - Deinterlace automatically the MAIN and REF videos if needed
         - To SYNC (in time) the MAIN and REF videos using psnr computation
         - Frame rate conversion (if needed)
+
+    mainSrc and refSrc are paths, or video objects already probed (e.g. one
+    reference shared by a batch of distorted files), which are used as is.
+
+    With log_pipe, the libvmaf log is read through a pipe (see
+    easyvmaf.ffmpeg.LogPipe) instead of being written next to MAIN: the
+    results hold the per-frame scores, and no log_path.
+
+    output_fmt 'npz' has libvmaf write a json log to a pipe, converted on the
+    fly into <main>_vmaf.npz (see easyvmaf.logs.save_npz()): no text log is
+    written. With compress_log, the libvmaf log is gzip-compressed as it is
+    written, into <main>_vmaf.<output_fmt>.gz (see easyvmaf.logs.compress_log()).
     """
 
-    def __init__(self, mainSrc, refSrc, output_fmt, model="HD", phone=False, loglevel="info", subsample=1, threads=0, print_progress=False, end_sync=False,  manual_fps=0, cambi_heatmap=False, gpu_mode=False):
+    def __init__(self, mainSrc, refSrc, output_fmt, model="HD", phone=False, loglevel="info", subsample=1, threads=0, print_progress=False, end_sync=False,  manual_fps=0, cambi_heatmap=False, gpu_mode=False, probe_cache=None, idet=False, log_pipe=False, compress_log=False):
         self.loglevel = loglevel
-        self.main = video(mainSrc, self.loglevel)
-        self.ref = video(refSrc, self.loglevel)
+        # Seconds spent in each stage: 'probe', 'sync', 'anchors', 'vmaf'
+        self.timings = {}
+        t0 = time.perf_counter()
+        self.main = mainSrc if isinstance(mainSrc, video) else video(mainSrc, self.loglevel, probe_cache, idet)
+        self.ref = refSrc if isinstance(refSrc, video) else video(refSrc, self.loglevel, probe_cache, idet)
+        self.timings['probe'] = time.perf_counter() - t0
         self.model = model
         self.phone = phone
         self.subsample = subsample
@@ -189,6 +419,9 @@ class vmaf():
             gpu_mode=gpu_mode)
         self.target_resolution = None
         self.offset = 0
+        self.syncMethod = None
+        self.anchors = None
+        self.segments = None
         self.manual_fps = manual_fps
         self._initResolutions()
         self.output_fmt = output_fmt
@@ -196,9 +429,29 @@ class vmaf():
         self.print_progress = print_progress
         self.end_sync = end_sync
         self.cambi_heatmap = cambi_heatmap
+        self.log_pipe = log_pipe
+        self.compress_log = compress_log
         self._filters_applied = False
 
 
+    @classmethod
+    async def createAsync(cls, mainSrc, refSrc, output_fmt, loglevel="info", probe_cache=None, idet=False, **kwargs):
+        """
+        asyncio counterpart of vmaf(mainSrc, refSrc, output_fmt, ...): main and
+        ref are probed concurrently (see video.probeAsync()), then the instance
+        is built from them without any further probe.
+        """
+        async def probe(src):
+            if isinstance(src, video):
+                return src
+            # manual_fps replaces deinterlacing: no interlace decision to make
+            return await video.probeAsync(src, loglevel, probe_cache, idet,
+                                          interlace=not kwargs.get('manual_fps'))
+
+        main, ref = await asyncio.gather(probe(mainSrc), probe(refSrc))
+        return cls(main, ref, output_fmt, loglevel=loglevel, probe_cache=probe_cache, idet=idet,
+                   **kwargs)
+
     def _initResolutions(self):
         """
         initialization of resolutions for each vmaf model
@@ -352,40 +605,435 @@ class vmaf():
         self.ffmpegQos.main.setFpsFilter(self.manual_fps)
         self.ffmpegQos.ref.setFpsFilter(self.manual_fps)
 
-    def _computePsnrAtOffset(self, offset, reverse):
+    def _proxyResolution(self, proxy):
+        """Proxy [width, height] for a proxy height, keeping the model aspect ratio."""
+        height = 2 * max(1, int(round(proxy / 2)))
+        width = 2 * max(1, int(round(height * self.target_resolution[0]
+                                     / self.target_resolution[1] / 2)))
+        return [width, height]
+
+    def _buildSyncQos(self, reverse, refStart, refDuration, proxy=None,
+                      mainDuration=SYNC_COMPARE_DURATION, mainStart=0):
         """
-        Compute PSNR between ref and main at a given time offset.
-        Creates an independent FFmpegQos instance — safe to call concurrently.
+        Build an independent FFmpegQos instance for sync computation.
 
-        Args:
-            offset:  time in seconds to trim the ref (or main if reverse) stream
-            reverse: if True, main and ref roles are swapped
+        The ref stream (main if reverse) is seeked to [refStart, refStart + refDuration]
+        and the main stream (ref if reverse) to [mainStart, mainStart + mainDuration],
+        both on the input side, then the same scale and deinterlace/fps filters as the final VMAF run are applied.
 
-        Returns:
-            (offset, psnr_value) tuple
+        With a proxy height, both streams are instead deinterlaced with plain field
+        extraction and downscaled to a small gray (luma only) proxy with a fast scaler.
         """
         # Always use CPU for PSNR sync computation regardless of self.gpu_mode
+        fast_deint = proxy is not None
         if not reverse:
             qos = FFmpegQos(self.main.videoSrc, self.ref.videoSrc, self.loglevel,
-                            gpu_mode=False)
+                            gpu_mode=False, fast_deint=fast_deint)
         else:
             qos = FFmpegQos(self.ref.videoSrc, self.main.videoSrc, self.loglevel,
-                            gpu_mode=False)
+                            gpu_mode=False, fast_deint=fast_deint)
             qos.invertedSrc = True
 
-        qos.ref.setTrimFilter(offset, 0.5)
-        qos.main.setTrimFilter(0, 0.5)
-        self._applyScaleFilters(qos)
+        qos.ref.setSeek(refStart, refDuration)
+        qos.main.setSeek(mainStart, mainDuration)
+        if proxy is None:
+            self._applyScaleFilters(qos)
         if self.manual_fps == 0:
             self._applyDeinterlaceFilters(qos)
         else:
             qos.main.setFpsFilter(self.manual_fps)
             qos.ref.setFpsFilter(self.manual_fps)
+        if proxy is not None:
+            # Downscale after deinterlacing so fields are not blended together
+            width, height = self._proxyResolution(proxy)
+            for stream in (qos.main, qos.ref):
+                stream.setScaleFilter(width, height, algo='fast_bilinear')
+                stream.setFormatFilter('gray')
+        return qos
+
+    def _computePsnrAtOffset(self, offset, reverse, proxy=None, abort=None):
+        """
+        Compute PSNR between ref and main at a given time offset.
+        Creates an independent FFmpegQos instance — safe to call concurrently.
 
-        psnr_value = qos.getPsnr()
-        return (offset, psnr_value)
+        Args:
+            offset:  time in seconds to seek the ref (or main if reverse) stream to
+            reverse: if True, main and ref roles are swapped
+            proxy:   proxy height for a luma-only, downscaled comparison (None = model resolution)
+            abort:   optional _SyncAbort of the search this run belongs to
+
+        Returns:
+            (offset, psnr_value) tuple, or None if the run was aborted
+        """
+        qos = self._buildSyncQos(reverse, offset, SYNC_COMPARE_DURATION, proxy)
+        if abort is None:
+            return (offset, qos.getPsnr())
+        if not abort.register(qos):
+            return None
+        try:
+            return (offset, qos.getPsnr(abort=abort.event))
+        except subprocess.CalledProcessError:
+            if abort.event.is_set():
+                return None
+            raise
+        finally:
+            abort.unregister(qos)
+
+    def _syncPerOffset(self, offsets, reverse, proxy=None, stop_psnr=None, stop_margin=None):
+        """
+        'psnr' sync method: one ffmpeg psnr run per candidate offset,
+        spread over a thread pool.
+
+        With stop_psnr and/or stop_margin set, the search ends as soon as the
+        results so far hold a confident match (see easyvmaf.sync.confident_match):
+        pending offsets are cancelled and running ffmpeg processes are killed.
+        """
+        max_workers = self.threads if self.threads > 0 else os.cpu_count()
+        early_stop = stop_psnr is not None or stop_margin is not None
+        abort = _SyncAbort() if early_stop else None
 
-    def syncOffset(self, syncWindow=3, start=0, reverse=False):
+        # Results arrive in completion order (not offset order) — logged as they finish
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._computePsnrAtOffset, offset, reverse, proxy, abort): offset
+                for offset in offsets
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                results.append(result)
+                logger.info("%-20s %s", *result)
+                if early_stop and len(results) < len(offsets) and \
+                        confident_match([psnr for _, psnr in results], stop_psnr, stop_margin):
+                    # Future.cancel() rather than shutdown(cancel_futures=True): Python 3.8
+                    for pending in futures:
+                        pending.cancel()
+                    abort.abort()
+                    logger.info("Early stop: %s of %s offsets evaluated, %s skipped",
+                                len(results), len(offsets), len(offsets) - len(results))
+                    break
+        return results
+
+    def _syncHierarchical(self, offsets, reverse, stride=None, proxy=None, stop_psnr=None,
+                          stop_margin=None):
+        """
+        'hierarchical' sync method: coarse-to-fine search over the candidate
+        offsets (see easyvmaf.sync.coarse_to_fine). Each level is scored with
+        the per-offset psnr workers, so only a fraction of the window is run.
+        Early stop criteria, if any, apply within each level.
+        """
+        index = {offset: i for i, offset in enumerate(offsets)}
+
+        def evaluate(indices):
+            results = self._syncPerOffset([offsets[i] for i in indices], reverse, proxy,
+                                          stop_psnr, stop_margin)
+            return {index[offset]: psnr for offset, psnr in results}
+
+        scores = coarse_to_fine(len(offsets), evaluate, stride)
+        logger.info("Hierarchical search: %s of %s offsets evaluated",
+                    len(scores), len(offsets))
+        return [(offsets[i], psnr) for i, psnr in scores.items()]
+
+    def _syncVectorized(self, offsets, reverse, frameDuration, proxy=None, rawCache=None):
+        """
+        'vectorized' sync method: the ref window and the first main frames are
+        decoded once, piped as raw frames into NumPy and every candidate offset
+        is scored in a single pass (see easyvmaf.sync.sliding_mse).
+
+        The whole ref window is held in memory as 8-bit yuv420p frames at the
+        model resolution, i.e. ~3 MB per frame for HD, or as gray frames at
+        the proxy resolution (~0.4 MB per frame at 480p).
+        """
+        windowDuration = len(offsets) * frameDuration + SYNC_COMPARE_DURATION
+        qos = self._buildSyncQos(reverse, offsets[0], windowDuration, proxy)
+        main_y4m, ref_y4m = qos.getRawFrames(pix_fmt='yuv420p' if proxy is None else 'gray',
+                                             cache=rawCache)
+        mainFrames, _, _, _ = read_y4m(main_y4m)
+        refFrames, _, _, fps = read_y4m(ref_y4m)
+        if len(mainFrames) == 0 or len(refFrames) == 0:
+            raise ValueError("Sync window is empty: no frames decoded for main or ref")
+
+        psnr = mse_to_psnr(sliding_mse(mainFrames, refFrames))
+
+        # Candidate offsets are spaced by the ref frame duration, the decoded
+        # window runs at the (possibly deinterlaced / fps converted) output rate
+        rate = float(fps) if fps else 1 / frameDuration
+        results = []
+        for i, offset in enumerate(offsets):
+            k = int(round(i * frameDuration * rate))
+            if k >= len(psnr):
+                break
+            results.append((offset, float(psnr[k])))
+            logger.info("%-20s %s", offset, psnr[k])
+        return results
+
+    def _syncAudio(self, offsets, reverse, frameDuration, confirm=False, proxy=None, rawCache=None):
+        """
+        'audio' sync method: SYNC_AUDIO_DURATION seconds of main audio are located
+        in the ref window by FFT cross-correlation of low-rate mono PCM
+        (see easyvmaf.sync.xcorr_lag). No video is decoded unless `confirm` is
+        set, in which case the winning offset is checked with a single video
+        PSNR computation; otherwise the PSNR returned is None.
+
+        Both inputs must carry audio, with audio and video in sync in each file.
+        """
+        for src in (self.main.videoSrc, self.ref.videoSrc):
+            if FFprobe(src, self.loglevel).getAudioStreamInfo() is None:
+                raise ValueError(f"Audio sync requested but {src} has no audio stream")
+
+        if not reverse:
+            qos = FFmpegQos(self.main.videoSrc, self.ref.videoSrc, self.loglevel)
+        else:
+            qos = FFmpegQos(self.ref.videoSrc, self.main.videoSrc, self.loglevel)
+        qos.ref.setSeek(offsets[0], len(offsets) * frameDuration + SYNC_AUDIO_DURATION)
+        qos.main.setSeek(0, SYNC_AUDIO_DURATION)
+        main_pcm, ref_pcm = qos.getAudioSamples(SYNC_AUDIO_RATE, cache=rawCache)
+
+        lag, score = xcorr_lag(np.frombuffer(main_pcm, dtype='<f4'),
+                               np.frombuffer(ref_pcm, dtype='<f4'))
+        # Snap the lag to the closest candidate offset (ref frame grid)
+        i = min(int(round(lag / SYNC_AUDIO_RATE / frameDuration)), len(offsets) - 1)
+        offset = offsets[i]
+        logger.info("Audio cross-correlation: lag %.4fs, correlation %.3f",
+                    lag / SYNC_AUDIO_RATE, score)
+        if score < 0.5:
+            logger.warning("Weak audio correlation (%.3f): the sync offset may be wrong", score)
+
+        psnr_value = None
+        if confirm:
+            offset, psnr_value = self._computePsnrAtOffset(offset, reverse, proxy)
+        logger.info("%-20s %s", offset, psnr_value)
+        return [(offset, psnr_value)]
+
+    def _syncFingerprint(self, offsets, reverse, frameDuration, confirm=False, proxy=None,
+                         rawCache=None):
+        """
+        'fingerprint' sync method for long windows: every frame of the ref window
+        and of the first SYNC_FINGERPRINT_DURATION seconds of main is reduced to a
+        tiny normalized gray thumbnail in one decode per input, and the main
+        sequence is slid over the ref sequence in a single vectorized pass
+        (see easyvmaf.sync.frame_signatures). The window can span minutes.
+
+        As for 'audio', the PSNR returned is None unless `confirm` is set.
+        """
+        windowDuration = len(offsets) * frameDuration + SYNC_FINGERPRINT_DURATION
+        qos = self._buildSyncQos(reverse, offsets[0], windowDuration,
+                                 proxy=SYNC_FINGERPRINT_HEIGHT,
+                                 mainDuration=SYNC_FINGERPRINT_DURATION)
+        main_y4m, ref_y4m = qos.getRawFrames(pix_fmt='gray', cache=rawCache)
+        mainFrames, _, _, _ = read_y4m(main_y4m)
+        refFrames, _, _, fps = read_y4m(ref_y4m)
+        if len(mainFrames) == 0 or len(refFrames) == 0:
+            raise ValueError("Sync window is empty: no frames decoded for main or ref")
+
+        distance = sliding_mse(frame_signatures(mainFrames), frame_signatures(refFrames))
+        # Positions where main runs past the end of ref compare fewer frames
+        # and would win too easily — keep full overlaps whenever there are any
+        full = len(refFrames) - len(mainFrames) + 1
+        if full > 0:
+            distance[full:] = np.inf
+
+        rate = float(fps) if fps else 1 / frameDuration
+        best_i, best_k = None, None
+        for i in range(len(offsets)):
+            k = int(round(i * frameDuration * rate))
+            if k >= len(distance):
+                break
+            if best_k is None or distance[k] < distance[best_k]:
+                best_i, best_k = i, k
+        offset = offsets[best_i]
+        logger.info("Fingerprint match: %s frames against %s, distance %.4f",
+                    len(mainFrames), len(refFrames), distance[best_k])
+
+        psnr_value = None
+        if confirm:
+            offset, psnr_value = self._computePsnrAtOffset(offset, reverse, proxy)
+        logger.info("%-20s %s", offset, psnr_value)
+        return [(offset, psnr_value)]
+
+    def _syncTimestamp(self):
+        """
+        'timestamp' sync method: derive the offset from metadata only, with no decoding.
+
+        Two sources are used: the start timecodes of both inputs (stream or
+        container tags), and the first PTS of both video streams when both
+        inputs are MPEG-TS, whose timestamps share the encoder clock. Timecode
+        midnight wraps and 33-bit PTS wraps are undone.
+
+        Returns:
+            (offset, source) with the natural signed offset (> 0: REF is delayed,
+            < 0: MAIN is delayed) and source 'timecode' or 'pts', or
+            (None, reason) when the metadata is missing or inconsistent.
+        """
+        found = {}
+
+        main_tc, ref_tc = self.main.getTimecode(), self.ref.getTimecode()
+        if main_tc and ref_tc:
+            try:
+                delta = (timecode_to_seconds(main_tc, getFrameRate(self.main.streamInfo['r_frame_rate'])) -
+                         timecode_to_seconds(ref_tc, getFrameRate(self.ref.streamInfo['r_frame_rate'])))
+                found['timecode'] = float(fold_offset(delta, TIMECODE_WRAP_SECONDS))
+            except ValueError as e:
+                logger.warning("Ignoring timecodes: %s", e)
+            logger.info("Timecodes: distorted %s | reference %s", main_tc, ref_tc)
+
+        main_pts, ref_pts = self.main.getStartPts(), self.ref.getStartPts()
+        if ('mpegts' in self.main.formatInfo.get('format_name', '') and
+                'mpegts' in self.ref.formatInfo.get('format_name', '') and
+                main_pts and ref_pts):
+            delta = main_pts[0] * main_pts[1] - ref_pts[0] * ref_pts[1]
+            found['pts'] = float(fold_offset(delta, PTS_WRAP_SECONDS))
+            logger.info("Start PTS: distorted %s | reference %s", main_pts[0], ref_pts[0])
+
+        if not found:
+            return None, "no shared timecodes or MPEG-TS timestamps"
+
+        # Both sources must agree to the frame
+        frameDuration = 1 / getFrameRate(self.ref.streamInfo['r_frame_rate'])
+        if max(found.values()) - min(found.values()) > frameDuration:
+            return None, f"timecode and PTS offsets disagree ({found['timecode']} vs {found['pts']})"
+
+        source = 'timecode' if 'timecode' in found else 'pts'
+        offset = found[source]
+        if offset >= 0:
+            overlap = min(self.main.duration, self.ref.duration - offset)
+        else:
+            overlap = min(self.main.duration + offset, self.ref.duration)
+        if overlap <= 0:
+            return None, f"{source} offset {offset}s leaves no overlap between the inputs"
+        return offset, source
+
+    def _syncAt(self, mainStart, refStart, refDuration, proxy=None):
+        """
+        Vectorized sync of SYNC_COMPARE_DURATION seconds of main, from mainStart,
+        against the ref window [refStart, refStart + refDuration]: both are
+        decoded once and every position of the window is scored in NumPy.
+
+        Returns:
+            (offset, psnr) with the natural signed offset: main at mainStart
+            matches ref at mainStart + offset
+        """
+        qos = self._buildSyncQos(False, refStart, refDuration, proxy, mainStart=mainStart)
+        main_y4m, ref_y4m = qos.getRawFrames(pix_fmt='yuv420p' if proxy is None else 'gray')
+        mainFrames, _, _, _ = read_y4m(main_y4m)
+        refFrames, _, _, fps = read_y4m(ref_y4m)
+        if len(mainFrames) == 0 or len(refFrames) == 0:
+            raise ValueError(f"Sync window at {mainStart}s is empty: no frames decoded for main or ref")
+
+        psnr = mse_to_psnr(sliding_mse(mainFrames, refFrames))
+        # Only positions where the whole main excerpt fits in the window
+        full = len(refFrames) - len(mainFrames) + 1
+        if full > 0:
+            psnr = psnr[:full]
+        k = int(np.argmax(psnr))
+        rate = float(fps) if fps else getFrameRate(self.ref.streamInfo['r_frame_rate'])
+        return refStart + k / rate - mainStart, float(psnr[k])
+
+    def _anchorWorkers(self, syncWindow, proxy):
+        """Anchors of syncAnchors() whose proxy frames and sliding_mse() fit in SYNC_ANCHOR_MEMORY together."""
+        width, height = self._proxyResolution(proxy)
+        fps = getFrameRate(self.ref.streamInfo['r_frame_rate'])
+        mainFrames = math.ceil(SYNC_COMPARE_DURATION * fps)
+        refFrames = math.ceil((2 * syncWindow + SYNC_COMPARE_DURATION) * fps)
+        pixels = width * height
+        perAnchor = (mainFrames + refFrames) * pixels + sliding_mse_bytes(mainFrames, refFrames, pixels)
+        return max(1, SYNC_ANCHOR_MEMORY // perAnchor)
+
+    def syncAnchors(self, anchors=4, syncWindow=3, proxy=None):
+        """
+        Method to detect drift or discontinuities (frame drops, ad splices...) between MAIN and REF.
+
+        The offset found by syncOffset() (or set manually) is re-measured at `anchors` points
+        spread over the whole overlap of both videos, in parallel, each one searching
+        +/- syncWindow seconds around it (see _syncAt()). Consecutive anchors that agree
+        form one segment. Where two segments meet, the change point is then located to
+        SYNC_ANCHOR_RESOLUTION seconds by bisection.
+
+        Every anchor decodes its whole window, so anchors are measured on a luma proxy,
+        and only as many at once as fit in SYNC_ANCHOR_MEMORY bytes.
+
+            anchors --> number of anchor points, at least 2
+            syncWindow --> seconds searched on each side of the current offset at every anchor
+            proxy --> as in syncOffset(), SYNC_ANCHOR_PROXY lines when None
+
+        It returns the list of segments, also stored in self.segments, each a dict with the
+        MAIN 'start' time and 'duration' in seconds and the natural signed 'offset' to apply
+        (> 0: REF is delayed). The measured anchors are stored in self.anchors.
+        """
+        if anchors < 2:
+            raise ValueError(f"At least 2 anchors are needed, got {anchors}")
+        t_anchors = time.perf_counter()
+        if proxy is None:
+            proxy = SYNC_ANCHOR_PROXY
+
+        base = self.offset
+        lo = max(0.0, -base)
+        hi = min(self.main.duration, self.ref.duration - base) - SYNC_COMPARE_DURATION
+        if hi <= lo:
+            raise ValueError(f"Offset {base}s leaves no overlap to place sync anchors in")
+        times = [lo + i * (hi - lo) / (anchors - 1) for i in range(anchors)]
+
+        def measure(t):
+            refStart = max(0.0, t + base - syncWindow)
+            refDuration = t + base + syncWindow - refStart + SYNC_COMPARE_DURATION
+            return self._syncAt(t, refStart, refDuration, proxy)
+
+        max_workers = min(anchors, self.threads if self.threads > 0 else os.cpu_count(),
+                          self._anchorWorkers(syncWindow, proxy))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            measured = list(executor.map(measure, times))
+        self.anchors = [{'time': t, 'offset': offset, 'psnr': psnr}
+                        for t, (offset, psnr) in zip(times, measured)]
+
+        logger.info("=" * 39)
+        logger.info("%-12s %-20s %s", "anchor(s)", "offset(s)", "psnr[dB]")
+        for anchor in self.anchors:
+            logger.info("%-12.3f %-20s %s", anchor['time'], anchor['offset'], anchor['psnr'])
+        logger.info("=" * 39)
+
+        # Anchors half a frame apart still point to the same frame
+        tolerance = 0.5 / getFrameRate(self.ref.streamInfo['r_frame_rate'])
+        runs = group_anchors([a['offset'] for a in self.anchors], tolerance)
+
+        def locate(pair):
+            (_, lastA), (firstB, _) = pair
+            offsetA, offsetB = self.anchors[lastA]['offset'], self.anchors[firstB]['offset']
+
+            def classify(t):
+                offset, _ = measure(t)
+                if abs(offset - offsetA) <= tolerance:
+                    return 0
+                if abs(offset - offsetB) <= tolerance:
+                    return 1
+                return None
+            return bisect_boundary(times[lastA], times[firstB], classify, SYNC_ANCHOR_RESOLUTION)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(runs) - 1, max_workers))) as executor:
+            boundaries = list(executor.map(locate, zip(runs, runs[1:])))
+
+        self.segments = []
+        for i, (first, _) in enumerate(runs):
+            offset = self.anchors[first]['offset']
+            start = max(boundaries[i - 1] if i > 0 else 0.0, -offset, 0.0)
+            end = min(boundaries[i] if i < len(boundaries) else math.inf,
+                      self.main.duration, self.ref.duration - offset)
+            if end - start < SYNC_COMPARE_DURATION:
+                logger.warning("Dropping %.3fs segment at %.3fs: too short", max(end - start, 0), start)
+                continue
+            self.segments.append({'start': start, 'duration': end - start, 'offset': offset})
+
+        if len(self.segments) > 1:
+            logger.warning("Offset changes along the file: %s segments", len(self.segments))
+        for segment in self.segments:
+            logger.info("Segment: %.3fs + %.3fs @ offset %s",
+                        segment['start'], segment['duration'], segment['offset'])
+        self.timings['anchors'] = time.perf_counter() - t_anchors
+        return self.segments
+
+    def syncOffset(self, syncWindow=3, start=0, reverse=False, method='psnr', stride=None, proxy=None,
+                   confirm=False, cache=None, stop_psnr=None, stop_margin=None, rawCache=None):
         """
         Method to get the offset needed to sync REF and MAIN (if any).
             syncWindow -->  Window Size in seconds to try to sync REF and MAIN videos. i.e., if the video to sync
@@ -396,9 +1044,50 @@ class vmaf():
             reverse --> If this option is set to TRUE. It is considered that MAIN is delayed in comparition to REF: 'syncWindow' and 'start' variables will be
                         applied to MAIN.
                         By default, it is supposed that the REF video is delayed in comparition with the MAIN video.
+            method --> 'psnr' (default) runs one ffmpeg psnr computation per candidate offset.
+                        'vectorized' decodes the sync window once and scores all offsets in NumPy.
+                        'hierarchical' scores every `stride`-th offset first, then refines around the best ones.
+                        'audio' locates the first seconds of MAIN audio in the REF window by cross-correlation.
+                        'fingerprint' matches tiny per-frame thumbnails, for windows of several minutes.
+                        'timestamp' reads the offset from timecodes or MPEG-TS PTS without decoding, and falls
+                        back to 'psnr' when they are missing or inconsistent. Its offset is signed by itself,
+                        so `reverse` only applies to the fallback.
+            stride --> coarse stride in frames for the 'hierarchical' method (default: ~sqrt of the window frames, at most 8).
+            proxy --> if set, height in pixels of a luma-only proxy both streams are downscaled to before comparing
+                        (e.g. 480), instead of the VMAF model resolution. The PSNR returned is then the luma PSNR at
+                        the proxy resolution.
+            confirm --> 'audio', 'fingerprint' and 'timestamp' methods: check the winning offset with a single video PSNR computation.
+                        Without it the PSNR returned is None.
+            stop_psnr --> 'psnr' and 'hierarchical' methods: stop the search as soon as an offset reaches this PSNR
+                        (e.g. 50, inf always does). None (default) disables it.
+            stop_margin --> 'psnr' and 'hierarchical' methods: stop the search as soon as the best offset beats the
+                        runner-up by this many dB (after a few offsets are scored). None (default) disables it.
+            rawCache --> optional easyvmaf.ffmpeg.RawDecodeCache shared by several syncs against the same REF:
+                        'vectorized', 'fingerprint' and 'audio' methods then decode each REF window only once.
+            cache --> optional easyvmaf.cache.SyncCache. A pair already synced with the same content and
+                        parameters returns the stored offset and PSNR without any decoding.
 
         It returns the offset value to get REF and MAIN synced and the PSNR computed.
+        The method actually used is stored in self.syncMethod ('timecode' or 'pts' for metadata sync).
         """
+        if method not in SYNC_METHODS:
+            raise ValueError(
+                f"Unknown sync method {method!r}. Supported: {', '.join(SYNC_METHODS)}")
+        t_sync = time.perf_counter()
+
+        if method == 'timestamp':
+            offset, source = self._syncTimestamp()
+            if offset is not None:
+                psnr_value = None
+                if confirm:
+                    _, psnr_value = self._computePsnrAtOffset(abs(offset), offset < 0, proxy)
+                logger.info("Synced from %s: offset %ss | psnr %s", source, offset, psnr_value)
+                self.syncMethod = source
+                self.offset = offset
+                self.timings['sync'] = time.perf_counter() - t_sync
+                return [self.offset, psnr_value]
+            logger.warning("Timestamp sync unavailable (%s), falling back to psnr sync", source)
+            method = 'psnr'
 
         logger.info("=" * 39)
         logger.info("Syncing... Computing PSNR values...")
@@ -413,6 +1102,9 @@ class vmaf():
                     round(getFrameRate(self.ref.streamInfo['r_frame_rate']), 5),
                     self.ref.streamInfo['width'],
                     self.ref.streamInfo['height'])
+        logger.info("Method:    %s", method)
+        if proxy is not None:
+            logger.info("Proxy:     %sx%s gray", *self._proxyResolution(proxy))
         logger.info("=" * 39)
         logger.info("%-20s %s", "offset(s)", "psnr[dB]")
 
@@ -425,24 +1117,43 @@ class vmaf():
             (startFrame + i) * frameDuration
             for i in range(framesInSyncWindow)
         ]
-
-        max_workers = self.threads if self.threads > 0 else os.cpu_count()
-
-        # Results arrive in completion order (not offset order) — logged as they finish
-        results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self._computePsnrAtOffset, offset, reverse): offset
-                for offset in offsets
-            }
-            for future in as_completed(futures):
-                offset, psnr_value = future.result()
-                results.append((offset, psnr_value))
-                logger.info("%-20s %s", offset, psnr_value)
+        if not offsets:
+            raise ValueError(f"Sync window of {syncWindow}s holds no reference frame")
+
+        cacheKey = None
+        if cache is not None:
+            cacheKey = cache.key(self.main.videoSrc, self.ref.videoSrc,
+                                 syncWindow=syncWindow, start=start, reverse=reverse,
+                                 manual_fps=self.manual_fps, model=self.model, method=method,
+                                 stride=stride, proxy=proxy, confirm=confirm,
+                                 stop_psnr=stop_psnr, stop_margin=stop_margin)
+            cached = cache.get(cacheKey)
+        else:
+            cached = None
+
+        t0 = time.perf_counter()
+        if cached is not None:
+            results = [tuple(cached)]
+            logger.info("%-20s %s (cached)", *cached)
+        elif method == 'vectorized':
+            results = self._syncVectorized(offsets, reverse, frameDuration, proxy, rawCache)
+        elif method == 'hierarchical':
+            results = self._syncHierarchical(offsets, reverse, stride, proxy, stop_psnr, stop_margin)
+        elif method == 'audio':
+            results = self._syncAudio(offsets, reverse, frameDuration, confirm, proxy, rawCache)
+        elif method == 'fingerprint':
+            results = self._syncFingerprint(offsets, reverse, frameDuration, confirm, proxy,
+                                            rawCache)
+        else:
+            results = self._syncPerOffset(offsets, reverse, proxy, stop_psnr, stop_margin)
+        logger.info("Sync computed in %.2fs (%s offsets)",
+                    time.perf_counter() - t0, len(results))
 
         # Sort to guarantee deterministic best-offset selection
         results.sort(key=lambda x: x[0])
-        best_offset, best_psnr = max(results, key=lambda x: x[1])
+        best_offset, best_psnr = max(results, key=lambda x: -math.inf if x[1] is None else x[1])
+        if cacheKey is not None and cached is None:
+            cache.put(cacheKey, best_offset, best_psnr)
 
         # Restore invertedSrc state on shared ffmpegQos so that getVmaf() works correctly
         if reverse:
@@ -450,22 +1161,26 @@ class vmaf():
             self.ffmpegQos.main.videoSrc, self.ffmpegQos.ref.videoSrc = \
                 self.ffmpegQos.ref.videoSrc, self.ffmpegQos.main.videoSrc
 
+        self.syncMethod = method
         self.offset = -best_offset if reverse else best_offset
+        self.timings['sync'] = time.perf_counter() - t_sync
         return [self.offset, best_psnr]
 
     def setOffset(self, value=None):
         """
-        Apply trim filters to synchronize main and distorted streams.
+        Apply input seeks (-ss/-t) to synchronize main and distorted streams.
+
+        The seeks are input options, so the start-up cost no longer grows
+        with the offset: nothing before the keyframe preceding the offset is
+        decoded, scaled or deinterlaced (see inputFFmpeg.setSeek()).
 
         Precondition: _autoScale() and _autoDeinterlace() (or _forceFps())
         must have been applied to self.ffmpegQos before calling this method.
-        Trim filters are appended to the existing filter chain — they must
-        come last in the sequence.
 
-        If offset == 0, no filters are applied (streams are already in sync).
+        If offset == 0, nothing is applied (streams are already in sync).
 
-        If offset > 0: Ref delayed compared to Main. Trimfilter cuts Ref.
-        If offset < 0: Main delayed compared to Ref. Trimfilter cuts Main.
+        If offset > 0: Ref delayed compared to Main. The seek cuts Ref.
+        If offset < 0: Main delayed compared to Ref. The seek cuts Main.
         """
 
         if value != None:
@@ -475,14 +1190,14 @@ class vmaf():
         if self.offset > 0:
             offset = self.offset
             duration = min(self.main.duration, self.ref.duration-offset)
-            self.ffmpegQos.ref.setTrimFilter(offset, duration)
-            self.ffmpegQos.main.setTrimFilter(0, duration)
+            self.ffmpegQos.ref.setSeek(offset, duration)
+            self.ffmpegQos.main.setSeek(0, duration)
 
         elif self.offset < 0:
             offset = abs(self.offset)
             duration = min(self.main.duration - offset, self.ref.duration)
-            self.ffmpegQos.main.setTrimFilter(offset, duration)
-            self.ffmpegQos.ref.setTrimFilter(0, duration)
+            self.ffmpegQos.main.setSeek(offset, duration)
+            self.ffmpegQos.ref.setSeek(0, duration)
 
     def _build_feature_string(self) -> Optional[str]:
         """
@@ -512,16 +1227,25 @@ class vmaf():
 
         return '|'.join(f.to_string() for f in features)
 
-    def getVmaf(self, autoSync=False):
+    def getVmaf(self, autoSync=False, on_frame=None, chunk=STREAM_CHUNK):
         """
         Run VMAF computation between main (distorted) and ref (reference) streams.
 
+        It returns an easyvmaf.result.VmafResult: the log path, model, offset,
+        ffmpeg exit status and stage timings of the run, whose scores are
+        parsed from the log only when first accessed.
+
+        With on_frame, VMAF is computed chunk by chunk instead (see
+        iterVmaf()) and on_frame(VmafFrame) is called for every frame as
+        soon as its chunk is done. The result then holds the scores, and no
+        log_path.
+
         Filter application contract — always in this order:
             1. clearFilters()     — reset all filter chains on ffmpegQos
             2. _autoScale()       — scale both streams to model target resolution
             3. _autoDeinterlace() — normalize frame rate and deinterlace if needed
                OR _forceFps()     — if manual_fps is set
-            4. setOffset()        — apply trim filters for temporal sync
+            4. setOffset()        — apply input seeks for temporal sync
 
         Note: syncOffset() (when autoSync=True) is called between steps 3 and 4.
         After task-07, syncOffset() uses independent FFmpegQos instances per
@@ -531,6 +1255,159 @@ class vmaf():
         Calling _autoScale() or _autoDeinterlace() without a preceding
         clearFilters() will stack duplicate filters — always clear first.
         """
+        if on_frame is not None:
+            return self._streamVmaf(autoSync, on_frame, chunk)
+        self._prepareVmaf(autoSync)
+        t0 = time.perf_counter()
+        with self._logPipe(self._outputPath()) as pipe:
+            vmafProcess = self.ffmpegQos.getVmaf(log_path=pipe.path if pipe else None, model=self.model, subsample=self.subsample,
+                                                 output_fmt=self.output_fmt, threads=self.threads, print_progress=self.print_progress, end_sync=self.end_sync, features=self.features, cambi_heatmap=self.cambi_heatmap, gpu=self.gpu_mode)
+        self.timings['vmaf'] = time.perf_counter() - t0
+        return self._result(vmafProcess, pipe=pipe)
+
+    def iterVmaf(self, chunk=STREAM_CHUNK, autoSync=False):
+        """
+        Generator counterpart of getVmaf(): yields an easyvmaf.result.VmafFrame
+        per frame while the run goes on, with the running pooled stats of
+        every metric, so that a quality drop shows up minutes into a long
+        run rather than at its end.
+
+        libvmaf only writes its log once a run is over, so the compared
+        range is split into chunks of `chunk` seconds, each computed by its
+        own ffmpeg run (as getVmafSegments() does) with its log read through
+        a LogPipe: frames come chunk by chunk, and no log file is written.
+        Temporal features restart at every chunk, so scores may differ
+        slightly from a single run around chunk boundaries.
+
+        Raises:
+            subprocess.CalledProcessError: if the ffmpeg run of a chunk fails
+        """
+        self._prepareVmaf(autoSync)
+        t0 = time.perf_counter()
+        mainStart, refStart = max(0, -self.offset), max(0, self.offset)
+        duration = min(self.main.duration - mainStart, self.ref.duration - refStart)
+        fmt = self.output_fmt if self.output_fmt in ('xml', 'csv') else 'json'
+        stats = {}
+        frameNum = 0
+        starts = [i * chunk for i in range(math.ceil(duration / chunk))]
+        for i, start in enumerate(starts):
+            qos = self._segmentQos(mainStart + start, refStart + start, min(chunk, duration - start))
+            logger.info("Computing VMAF... chunk %s/%s: %.3fs + %.3fs", i + 1, len(starts), start,
+                        min(chunk, duration - start))
+            with LogPipe('.' + fmt, lambda f: list(iter_frames(f, fmt))) as pipe:
+                process = qos.getVmaf(log_path=pipe.path, model=self.model,
+                                      subsample=self.subsample, output_fmt=self.output_fmt,
+                                      threads=self.threads, end_sync=self.end_sync,
+                                      features=self.features, gpu=self.gpu_mode)
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, qos._cmd)
+            for _, metrics in pipe.value():
+                for name, value in metrics.items():
+                    stats.setdefault(name, RunningStats()).add(value)
+                yield VmafFrame(frameNum, i, metrics, stats)
+                frameNum += 1
+        self.timings['vmaf'] = time.perf_counter() - t0
+
+    def _streamVmaf(self, autoSync, on_frame, chunk):
+        """getVmaf() with on_frame: iterVmaf(), with its frames collected into a VmafResult"""
+        def frames():
+            for frame in self.iterVmaf(chunk, autoSync):
+                on_frame(frame)
+                yield frame.frameNum, frame.metrics
+
+        try:
+            scores, returncode = model_scores(frames(), self.model, 'VMAF stream'), 0
+        except subprocess.CalledProcessError as e:
+            scores, returncode = None, e.returncode
+        return VmafResult(None, self.output_fmt, self.model, offset=self.offset,
+                          returncode=returncode, timings=self.timings, scores=scores)
+
+    async def computeAsync(self):
+        """
+        asyncio counterpart of getVmaf(): the same filters and offset, with the
+        ffmpeg run awaited instead of blocking a thread, so one event loop can
+        drive many VMAF jobs. Cancelling the awaiting task kills ffmpeg.
+
+        The sync search is not part of it: run syncOffset() beforehand (e.g.
+        in an executor), or set offset. No progress is reported.
+
+        Returns:
+            easyvmaf.result.VmafResult, as getVmaf()
+
+        Raises:
+            subprocess.CalledProcessError: if ffmpeg fails
+        """
+        self._prepareVmaf()
+        t0 = time.perf_counter()
+        # Not a with block: leaving it would join the pipe reader on the event loop
+        pipe = self._logPipe(self._outputPath()).__enter__()
+        try:
+            done = await self.ffmpegQos.getVmafAsync(log_path=pipe.path if pipe else None,
+                                                     model=self.model, subsample=self.subsample,
+                                                     output_fmt=self.output_fmt, threads=self.threads,
+                                                     end_sync=self.end_sync, features=self.features,
+                                                     cambi_heatmap=self.cambi_heatmap, gpu=self.gpu_mode)
+        finally:
+            if pipe is not None:
+                await pipe.closeAsync()
+        self.timings['vmaf'] = time.perf_counter() - t0
+        return self._result(done, pipe=pipe)
+
+    def _outputPath(self, suffix=''):
+        """
+        Output of a VMAF run written from its LogPipe: <main>_vmaf<suffix>.npz,
+        or <main>_vmaf<suffix>.<output_fmt>.gz with compress_log.
+        """
+        base = f'{os.path.splitext(self.main.videoSrc)[0]}_vmaf{suffix}'
+        if self.output_fmt == 'npz':
+            return base + '.npz'
+        fmt = self.output_fmt if self.output_fmt in ('xml', 'csv') else 'json'
+        return f'{base}.{fmt}{GZIP_EXT}'
+
+    def _logPipe(self, outputPath=None):
+        """
+        LogPipe of a VMAF run: with log_pipe, loading its scores; with the npz
+        output_fmt, converting its json log into outputPath; with
+        compress_log, compressing its log into outputPath. A no-op context
+        otherwise.
+        """
+        fmt = self.output_fmt if self.output_fmt in ('xml', 'csv') else 'json'
+        if self.log_pipe:
+            return LogPipe('.' + fmt, lambda f: load_model_scores(f, fmt, self.model))
+        if self.output_fmt == 'npz':
+            return LogPipe('.json', lambda f: save_npz(outputPath, f, 'json'))
+        if self.compress_log:
+            return LogPipe('.' + fmt, lambda f: compress_log(outputPath, f))
+        return nullcontext()
+
+    def _result(self, process, qos=None, offset=None, pipe=None, start=None):
+        """
+        VmafResult of the last VMAF run of qos (self.ffmpegQos by default), whose log went
+        through pipe, if any. start is where the run starts in MAIN, its seek by default.
+        """
+        qos = qos or self.ffmpegQos
+        offset = self.offset if offset is None else offset
+        returncode = getattr(process, 'returncode', None)
+        if returncode is None:
+            # FfmpegProgress keeps its Popen in .process
+            returncode = getattr(getattr(process, 'process', None), 'returncode', None)
+        log_path, scores = qos.vmafpath, None
+        if pipe is not None:
+            log_path = None
+            if returncode == 0 and self.log_pipe:
+                scores = pipe.value()
+            elif returncode == 0:
+                # npz or compressed output: the pipe returns the path it wrote
+                log_path = pipe.value()
+        return VmafResult(log_path, self.output_fmt, self.model,
+                          offset=offset, returncode=returncode, timings=self.timings,
+                          cambi_heatmap_path=(qos.vmaf_cambi_heatmap_path
+                                              if self.cambi_heatmap else None),
+                          process=process, scores=scores, fps=self.frameRate(qos),
+                          start=max(0, -offset) if start is None else start)
+
+    def _prepareVmaf(self, autoSync=False):
+        """Filters, offset and features of getVmaf(), in the order documented there."""
         self.ffmpegQos.clearFilters()
         self.ffmpegQos.main.clearFilters()
         self.ffmpegQos.ref.clearFilters()
@@ -576,10 +1453,76 @@ class vmaf():
         logger.info("output_fmt: %s", self.output_fmt)
         logger.info("=" * 39)
 
+    def frameRate(self, qos=None):
+        """
+        Frame rate of the frames VMAF scores, i.e. of MAIN after the fps and
+        deinterlace filters of qos (self.ffmpegQos by default, as set up by
+        getVmaf()): libvmaf pairs the frames on the timeline of MAIN.
+        """
+        qos = qos or self.ffmpegQos
+        rate = getFrameRate(self.main.streamInfo['r_frame_rate'])
+        for f in qos.main.filtersList:
+            match = _FPS_FILTER_RE.search(f)
+            if match:
+                rate = float(match.group(1))
+            elif any(deint in f for deint in _FIELD_DEINT_FILTERS):
+                rate *= 2
+        return rate
+
+    def _segmentQos(self, mainStart, refStart, duration):
+        """independent FFmpegQos with the filters of getVmaf(), seeked to mainStart/refStart for duration"""
+        qos = FFmpegQos(self.main.videoSrc, self.ref.videoSrc, self.loglevel,
+                        gpu_mode=self.gpu_mode)
+        self._applyScaleFilters(qos)
+        if self.manual_fps == 0:
+            self._applyDeinterlaceFilters(qos)
+        else:
+            qos.main.setFpsFilter(self.manual_fps)
+            qos.ref.setFpsFilter(self.manual_fps)
+        qos.main.setSeek(mainStart, duration)
+        qos.ref.setSeek(refStart, duration)
+        return qos
+
+    def getVmafSegments(self):
+        """
+        Run VMAF once per segment found by syncAnchors(), each with its own offset.
 
-        vmafProcess = self.ffmpegQos.getVmaf(model=self.model, subsample=self.subsample,
-                                             output_fmt=self.output_fmt, threads=self.threads, print_progress=self.print_progress, end_sync=self.end_sync, features=self.features, cambi_heatmap=self.cambi_heatmap, gpu=self.gpu_mode)
-        return vmafProcess
+        Every segment is computed by an independent FFmpegQos with the same scale and
+        deinterlace/fps filters as getVmaf(), seeked to the segment on both inputs, and
+        writes its own log next to MAIN: <main>_vmaf_seg<i>.<output_fmt> (none with log_pipe).
+
+        The log path of each segment is also stored in its 'output_file'. It returns one
+        easyvmaf.result.VmafResult per segment, each with the offset of its segment.
+        """
+        if not self.segments:
+            raise ValueError("No segments to compute: run syncAnchors() first")
+
+        self.features = self._build_feature_string()
+        t0 = time.perf_counter()
+        results = []
+        base = os.path.splitext(self.main.videoSrc)[0]
+        ext = self.output_fmt if self.output_fmt in ('xml', 'csv') else 'json'
+        for i, segment in enumerate(self.segments):
+            qos = self._segmentQos(segment['start'], segment['start'] + segment['offset'],
+                                   segment['duration'])
+
+            logger.info("=" * 39)
+            logger.info("Computing VMAF... segment %s/%s: %.3fs + %.3fs @ offset %s",
+                        i + 1, len(self.segments), segment['start'], segment['duration'],
+                        segment['offset'])
+            logger.info("=" * 39)
+            with self._logPipe(self._outputPath(f'_seg{i}')) as pipe:
+                process = qos.getVmaf(log_path=pipe.path if pipe else f'{base}_vmaf_seg{i}.{ext}',
+                                      model=self.model,
+                                      subsample=self.subsample, output_fmt=self.output_fmt,
+                                      threads=self.threads, print_progress=self.print_progress,
+                                      end_sync=self.end_sync, features=self.features,
+                                      cambi_heatmap=self.cambi_heatmap, gpu=self.gpu_mode)
+            result = self._result(process, qos, segment['offset'], pipe, segment['start'])
+            segment['output_file'] = result.log_path
+            results.append(result)
+        self.timings['vmaf'] = time.perf_counter() - t0
+        return results
 
 
 def getFrameRate(r_frame_rate):
@@ -0,0 +1,304 @@
+"""
+MIT License
+
+Copyright (c) 2020 Gabriel Davila - https://github.com/gdavila
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from .result import model_names
+
+logger = logging.getLogger(__name__)
+
+# Columns of a run besides its id, in the order of ResultStore.query() rows
+_COLUMNS = ('created', 'distorted', 'reference', 'model', 'vmaf', 'offset', 'psnr',
+            'sync_method', 'output_file', 'scores', 'pooled', 'sync', 'segments', 'params',
+            'timings')
+# Columns holding JSON
+_JSON_COLUMNS = ('scores', 'pooled', 'sync', 'segments', 'params', 'timings')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    distorted TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vmaf REAL,
+    offset REAL,
+    psnr REAL,
+    sync_method TEXT,
+    output_file TEXT,
+    scores TEXT,
+    pooled TEXT,
+    sync TEXT,
+    segments TEXT,
+    params TEXT,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_reference ON runs (reference, created);
+CREATE INDEX IF NOT EXISTS runs_distorted ON runs (distorted, model, created);
+CREATE INDEX IF NOT EXISTS runs_model ON runs (model, created);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+'''
+
+
+def default_store_path():
+    """$EASYVMAF_RESULTS_DB, else $XDG_DATA_HOME/easyvmaf/results.sqlite, else ~/.local/share/easyvmaf/results.sqlite."""
+    path = os.environ.get('EASYVMAF_RESULTS_DB')
+    if not path:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        path = os.path.join(base, 'easyvmaf', 'results.sqlite')
+    return path
+
+
+def _timestamp(value):
+    """Unix time of a number, or of an ISO date ('2024-05-01', '2024-05-01T12:00')."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ResultStore:
+    '''
+    SQLite warehouse of the results of easyVmaf runs: one row per run with
+    its inputs, parameters, scores, pooled stats, sync data and timings,
+    indexed on reference, distorted, model and date, so that questions such
+    as "latest score per rendition" are answered by the database without
+    loading the history.
+
+    Like the caches (see easyvmaf.cache), every operation opens its own
+    short-lived connection, with a busy timeout and in WAL mode, so runs in
+    parallel processes can record into the same store.
+
+    Inputs:
+        - path: SQLite file, default_store_path() when None
+    Outputs:
+        - add(): record a run
+        - query() / latest(): runs as dicts, newest first
+    '''
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._db() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        """Short-lived connection: committed and closed on exit."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(self, result, params=None, timings=None, created=None):
+        """
+        Record a run.
+
+        Args:
+            result:  result dict of the run, as built by the CLI (see
+                     easyvmaf.cli._build_result())
+            params:  dict of the parameters of the run (sync window, subsample, ...)
+            timings: dict of stage -> seconds (see vmaf.timings)
+            created: unix time of the run, now when None
+
+        Returns:
+            id of the run
+        """
+        sync = dict(result.get('sync') or {})
+        block = dict(result.get('vmaf') or {})
+        model = block.pop('model', None) or (params or {}).get('model') or 'HD'
+        pooled = block.pop('pooled', None)
+        output_file = block.pop('output_file', None)
+        block.pop('cambi_heatmap_path', None)
+        block.pop('frame_index', None)
+        scores = block or None
+        row = {
+            'created': time.time() if created is None else created,
+            'distorted': os.path.abspath(result['distorted']),
+            'reference': os.path.abspath(result['reference']),
+            'model': model,
+            'vmaf': (scores or {}).get(model_names(model)[0]),
+            'offset': sync.pop('offset', None),
+            'psnr': sync.pop('psnr', None),
+            'sync_method': sync.pop('method', None),
+            'output_file': output_file,
+            'scores': scores,
+            'pooled': pooled,
+            'sync': sync or None,
+            'segments': result.get('segments'),
+            'params': params,
+            'timings': timings,
+        }
+        for column in _JSON_COLUMNS:
+            if row[column] is not None:
+                row[column] = json.dumps(row[column])
+        marks = ', '.join('?' * len(row))
+        with self._db() as db:
+            cursor = db.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({marks})",
+                                tuple(row.values()))
+        logger.debug("Recorded run %s of %s in %s", cursor.lastrowid, row['distorted'], self.path)
+        return cursor.lastrowid
+
+    @staticmethod
+    def _where(reference=None, distorted=None, model=None, since=None, until=None):
+        """WHERE clause and parameters of the filters of query(); paths may be glob patterns"""
+        clauses, args = [], []
+        for column, value in (('reference', reference), ('distorted', distorted)):
+            if value is None:
+                continue
+            if any(c in value for c in '*?['):
+                clauses.append(f'{column} GLOB ?')
+                args.append(value if value.startswith(('*', os.sep)) else os.path.abspath(value))
+            else:
+                clauses.append(f'{column} = ?')
+                args.append(os.path.abspath(value))
+        if model is not None:
+            clauses.append('model = ?')
+            args.append(model)
+        if since is not None:
+            clauses.append('created >= ?')
+            args.append(_timestamp(since))
+        if until is not None:
+            clauses.append('created < ?')
+            args.append(_timestamp(until))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    @staticmethod
+    def _row(row):
+        run = dict(zip(('id',) + _COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            if run[column] is not None:
+                run[column] = json.loads(run[column])
+        return run
+
+    def query(self, reference=None, distorted=None, model=None, since=None, until=None,
+              limit=None):
+        """
+        Runs matching every given filter, newest first. reference and
+        distorted are paths or glob patterns ('*/ep01_*.mp4'), since and
+        until unix times or ISO dates.
+
+        Returns:
+            list of run dicts: id, the _COLUMNS, and vmaf, the mean of the
+            first score of the model (vmaf_hd or vmaf_4k)
+        """
+        where, args = self._where(reference, distorted, model, since, until)
+        sql = f"SELECT id, {', '.join(_COLUMNS)} FROM runs{where} ORDER BY created DESC, id DESC"
+        if limit:
+            sql += ' LIMIT ?'
+            args.append(limit)
+        with self._db() as db:
+            return [self._row(row) for row in db.execute(sql, args)]
+
+    def latest(self, reference=None, distorted=None, model=None, since=None, until=None):
+        """
+        The latest run of every rendition (distorted file and model) among
+        the runs matching the filters of query(), the last recorded one when
+        several share its date. The database picks them from the
+        (distorted, model, created) index.
+        """
+        sql, args = self._latestQuery(reference, distorted, model, since, until)
+        with self._db() as db:
+            return [self._row(row) for row in db.execute(sql, args)]
+
+    def _latestQuery(self, reference=None, distorted=None, model=None, since=None, until=None):
+        """SQL and parameters of latest(): one row per rendition, ranked within the filtered runs"""
+        where, args = self._where(reference, distorted, model, since, until)
+        columns = ', '.join(_COLUMNS)
+        sql = (f"SELECT id, {columns} FROM "
+               f"(SELECT id, {columns}, ROW_NUMBER() OVER "
+               f"(PARTITION BY distorted, model ORDER BY created DESC, id DESC) AS rank "
+               f"FROM runs{where}) "
+               f"WHERE rank = 1 ORDER BY distorted, model")
+        return sql, args
+
+    def __len__(self):
+        with self._db() as db:
+            return db.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+
+def _print_runs(runs, use_json=False):
+    if use_json:
+        for run in runs:
+            print(json.dumps(run))
+        return
+    print(f"{'date':<19}  {'model':<5} {'vmaf':>9} {'offset':>9} {'psnr':>9}  distorted")
+    for run in runs:
+        date = datetime.fromtimestamp(run['created']).strftime('%Y-%m-%d %H:%M:%S')
+        vmaf = '-' if run['vmaf'] is None else f"{run['vmaf']:.4f}"
+        offset = '-' if run['offset'] is None else f"{run['offset']:.4f}"
+        psnr = '-' if run['psnr'] is None else f"{run['psnr']:.3f}"
+        print(f"{date:<19}  {run['model']:<5} {vmaf:>9} {offset:>9} {psnr:>9}  {run['distorted']}")
+
+
+def main(argv=None):
+    """easyvmaf-results: query the results store of easyvmaf -store."""
+    parser = argparse.ArgumentParser(
+        prog='easyvmaf-results',
+        description="Query the results recorded by easyvmaf -store. Paths may be glob patterns, dates are ISO dates (2024-05-01).")
+    parser.add_argument('command', nargs='?', default='latest', choices=['latest', 'list'],
+                        help="latest: the latest run of every rendition (distorted file and model). list: every run, newest first. (Default: latest).")
+    parser.add_argument('-db', dest='db', type=str, default=None,
+                        help="Results store. (Default: $EASYVMAF_RESULTS_DB, else ~/.local/share/easyvmaf/results.sqlite).")
+    parser.add_argument('-r', dest='reference', type=str, default=None, help='Reference video (path or pattern)')
+    parser.add_argument('-d', dest='distorted', type=str, default=None, help='Distorted video (path or pattern)')
+    parser.add_argument('-model', dest='model', type=str, default=None, help='VMAF model: HD or 4K')
+    parser.add_argument('-since', dest='since', type=str, default=None, help='Runs from this date on')
+    parser.add_argument('-until', dest='until', type=str, default=None, help='Runs before this date')
+    parser.add_argument('-limit', dest='limit', type=int, default=None, help='Runs listed by list at most')
+    parser.add_argument('-json', action='store_true', default=False,
+                        help='One JSON object per run (NDJSON), with its pooled stats, sync data, parameters and timings. (Default: false).')
+    args = parser.parse_args(argv)
+
+    path = args.db or default_store_path()
+    if not os.path.isfile(path):
+        print(f"[easyVmaf] ERROR: no results store at {path}", file=sys.stderr)
+        return 1
+    store = ResultStore(path)
+    filters = dict(reference=args.reference, distorted=args.distorted, model=args.model,
+                   since=args.since, until=args.until)
+    try:
+        if args.command == 'list':
+            runs = store.query(limit=args.limit, **filters)
+        else:
+            runs = store.latest(**filters)
+    except ValueError as e:
+        print(f"[easyVmaf] ERROR: {e}", file=sys.stderr)
+        return 1
+    _print_runs(runs, args.json)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Tests for the asyncio API — run_async, async probes and vmaf.computeAsync."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from easyvmaf import ffmpeg as ffmpeg_mod
+from easyvmaf.ffmpeg import FFprobe, run_async
+from easyvmaf.vmaf import vmaf, video
+
+PROBE = {
+    'streams': [{'index': 0, 'codec_type': 'video', 'width': 1920, 'height': 1080,
+                 'r_frame_rate': '25/1', 'start_time': '0.000000', 'duration': '10.000000'}],
+    'format': {'format_name': 'mpegts', 'start_time': '0.000000', 'duration': '10.000000'},
+    'frames': [{'interlaced_frame': 0, 'pkt_size': '1000'}],
+}
+
+
+class TestRunAsync:
+    """run_async mirrors subprocess.run and kills the process on cancellation."""
+
+    def test_output(self):
+        done = asyncio.run(run_async([sys.executable, '-c', 'print("ok")']))
+        assert (done.returncode, done.stdout.strip()) == (0, b'ok')
+
+    def test_failure_raises(self):
+        with pytest.raises(subprocess.CalledProcessError) as e:
+            asyncio.run(run_async([sys.executable, '-c', 'import sys; sys.exit(3)']))
+        assert e.value.returncode == 3
+
+    def test_no_check(self):
+        cmd = [sys.executable, '-c', 'import sys; sys.exit(3)']
+        assert asyncio.run(run_async(cmd, check=False)).returncode == 3
+
+    def test_cancel_kills_the_process(self, monkeypatch):
+        processes = []
+        create = asyncio.create_subprocess_exec
+
+        async def spy(*args, **kwargs):
+            processes.append(await create(*args, **kwargs))
+            return processes[-1]
+
+        monkeypatch.setattr(ffmpeg_mod.asyncio, 'create_subprocess_exec', spy)
+
+        async def cancelled():
+            task = asyncio.ensure_future(
+                run_async([sys.executable, '-c', 'import time; time.sleep(30)']))
+            while not processes:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        t0 = time.monotonic()
+        asyncio.run(cancelled())
+        assert time.monotonic() - t0 < 10
+        assert processes[0].returncode is not None, "the process must be reaped"
+
+    def test_concurrent_runs_share_one_loop(self):
+        async def many():
+            cmd = [sys.executable, '-c', 'import time; time.sleep(0.5)']
+            return await asyncio.gather(*(run_async(cmd) for _ in range(8)))
+
+        t0 = time.monotonic()
+        assert all(done.returncode == 0 for done in asyncio.run(many()))
+        assert time.monotonic() - t0 < 8 * 0.5
+
+
+@pytest.fixture
+def async_runs(monkeypatch):
+    """Record every async ffprobe/ffmpeg cmd; ffprobe answers with PROBE."""
+    cmds = []
+
+    async def run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True):
+        cmds.append(cmd)
+        await asyncio.sleep(0)
+        return subprocess.CompletedProcess(cmd, 0, json.dumps(PROBE).encode(), b'')
+
+    monkeypatch.setattr(ffmpeg_mod, 'run_async', run)
+    return cmds
+
+
+@pytest.fixture
+def sync_runs(monkeypatch):
+    cmds = []
+
+    def run(self):
+        cmds.append(self._cmd)
+        return json.loads(json.dumps(PROBE))
+
+    monkeypatch.setattr(FFprobe, '_run', run)
+    return cmds
+
+
+def test_probe_async_matches_the_blocking_probe(async_runs, sync_runs):
+    blocking = video('in.ts')
+    blocking.interlaced
+    probed = asyncio.run(video.probeAsync('in.ts'))
+    assert async_runs == sync_runs
+    for name in ('streamInfo', 'formatInfo', 'duration', 'interlaced', 'interlaceConfidence',
+                 'totalFrames'):
+        assert getattr(probed, name) == getattr(blocking, name)
+
+
+def test_create_and_compute_async(async_runs, sync_runs):
+    async def job():
+        myVmaf = await vmaf.createAsync('main.ts', 'ref.ts', 'json', threads=2)
+        myVmaf.offset = 1.5
+        return myVmaf, await myVmaf.computeAsync()
+
+    myVmaf, done = asyncio.run(job())
+    assert (myVmaf.main.videoSrc, myVmaf.ref.videoSrc) == ('main.ts', 'ref.ts')
+    assert len(async_runs) == 5, "two probes per input, then ffmpeg"
+    assert not sync_runs
+    cmd = async_runs[-1]
+    assert done.process.args is cmd
+    assert (done.log_path, done.model, done.offset, done.ok) == ('main_vmaf.json', 'HD', 1.5, True)
+    assert {'probe', 'vmaf'} <= set(done.timings)
+    assert any('libvmaf=' in arg for arg in cmd[1:])
+    # The offset seeks the ref, as with getVmaf()
+    assert cmd[cmd.index('-ss') + 1] == '1.5'
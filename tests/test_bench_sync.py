@@ -0,0 +1,64 @@
+"""Smoke test of benchmarks/bench_sync.py — the command lines it runs, without ffmpeg."""
+
+import argparse
+import importlib.util
+import os
+
+import pytest
+
+from easyvmaf import ffmpeg as ffmpeg_mod
+from easyvmaf.ffmpeg import FFprobe
+
+BENCH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'bench_sync.py')
+
+PROBE = {
+    'streams': [{'index': 0, 'codec_type': 'video', 'width': 1920, 'height': 1080,
+                 'r_frame_rate': '25/1', 'start_time': '0.000000', 'duration': '10.000000'}],
+    'format': {'format_name': 'mp4', 'start_time': '0.000000', 'duration': '10.000000'},
+    'frames': [{'interlaced_frame': 0, 'pkt_size': '1000'}],
+}
+
+
+@pytest.fixture
+def bench_sync():
+    spec = importlib.util.spec_from_file_location('bench_sync', BENCH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def psnr_cmds(monkeypatch):
+    """Fake ffprobe, and a psnr ffmpeg run that logs its average at the info level only."""
+    cmds = []
+
+    class FakePopen:
+        def __init__(self, cmd, **kwargs):
+            cmds.append(cmd)
+            self.returncode = 0
+            self.loglevel = cmd[cmd.index('-loglevel') + 1]
+
+        def communicate(self):
+            if self.loglevel in ('quiet', 'panic', 'fatal', 'error', 'warning'):
+                return b'', None
+            return b'[Parsed_psnr_0 @ 0x1] PSNR y:40.0 average:40.000000 min:38.0 max:42.0\n', None
+
+        def kill(self):
+            pass
+
+    monkeypatch.setattr(FFprobe, '_run', lambda self: {k: (list(v) if isinstance(v, list) else dict(v))
+                                                      for k, v in PROBE.items()})
+    monkeypatch.setattr(ffmpeg_mod.subprocess, 'Popen', FakePopen)
+    return cmds
+
+
+def test_psnr_run_keeps_ffmpeg_at_info(bench_sync, psnr_cmds):
+    args = argparse.Namespace(d='main.mp4', r='ref.mp4', model='HD', threads=1, sw=0.2, ss=0,
+                              reverse=False)
+    offset, psnr, elapsed = bench_sync.run('psnr', args)
+    assert psnr == 40.0 and elapsed >= 0
+    assert psnr_cmds
+    for cmd in psnr_cmds:
+        assert cmd[cmd.index('-loglevel') + 1] == 'info'
+        assert 'main.mp4' in cmd and 'ref.mp4' in cmd
+        assert 'psnr' in cmd[cmd.index('-lavfi') + 1]
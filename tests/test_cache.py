@@ -0,0 +1,171 @@
+"""Tests for easyvmaf.cache — persistent on-disk caches."""
+
+import math
+import os
+
+import pytest
+
+from easyvmaf import cache as cache_mod
+from easyvmaf.cache import ProbeCache, SyncCache, default_cache_dir, file_fingerprint
+
+
+@pytest.fixture
+def media(tmp_path):
+    """Two small fake media files."""
+    main = tmp_path / 'main.mp4'
+    ref = tmp_path / 'ref.mp4'
+    main.write_bytes(b'main' * 1000)
+    ref.write_bytes(b'ref' * 1000)
+    return str(main), str(ref)
+
+
+@pytest.fixture
+def sync_cache(tmp_path):
+    return SyncCache(str(tmp_path / 'cache'))
+
+
+class TestFileFingerprint:
+    """file_fingerprint identifies content, not paths."""
+
+    def test_copy_keeps_fingerprint(self, tmp_path):
+        a, b = tmp_path / 'a.ts', tmp_path / 'b.ts'
+        a.write_bytes(b'x' * 5000)
+        b.write_bytes(b'x' * 5000)
+        assert file_fingerprint(str(a)) == file_fingerprint(str(b))
+
+    @pytest.mark.parametrize(
+        "other",
+        [b'y' + b'x' * 4999, b'x' * 4999 + b'y', b'x' * 5001],
+        ids=["head", "tail", "size"],
+    )
+    def test_change_alters_fingerprint(self, tmp_path, other):
+        a, b = tmp_path / 'a.ts', tmp_path / 'b.ts'
+        a.write_bytes(b'x' * 5000)
+        b.write_bytes(other)
+        assert file_fingerprint(str(a)) != file_fingerprint(str(b))
+
+    def test_large_file_tail_is_sampled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_mod, '_FINGERPRINT_SAMPLE', 16)
+        a, b = tmp_path / 'a.ts', tmp_path / 'b.ts'
+        a.write_bytes(b'x' * 100)
+        b.write_bytes(b'x' * 99 + b'y')
+        assert file_fingerprint(str(a)) != file_fingerprint(str(b))
+
+
+def test_default_cache_dir(monkeypatch):
+    monkeypatch.setenv('EASYVMAF_CACHE_DIR', '/tmp/evc')
+    assert default_cache_dir() == '/tmp/evc'
+    monkeypatch.delenv('EASYVMAF_CACHE_DIR')
+    monkeypatch.setenv('XDG_CACHE_HOME', '/tmp/xdg')
+    assert default_cache_dir() == '/tmp/xdg/easyvmaf'
+
+
+class TestSyncCache:
+    """SyncCache stores syncOffset() results across runs."""
+
+    def test_miss_then_hit(self, sync_cache, media):
+        key = SyncCache.key(*media, syncWindow=3, method='psnr')
+        assert sync_cache.get(key) is None
+        sync_cache.put(key, 1.001, 42.5)
+        assert tuple(sync_cache.get(key)) == (1.001, 42.5)
+
+    def test_survives_reopening(self, tmp_path, media):
+        key = SyncCache.key(*media, syncWindow=3)
+        SyncCache(str(tmp_path / 'c')).put(key, 2.0, 30.0)
+        assert tuple(SyncCache(str(tmp_path / 'c')).get(key)) == (2.0, 30.0)
+
+    @pytest.mark.parametrize("psnr", [None, math.inf], ids=["none", "inf"])
+    def test_special_psnr_round_trips(self, sync_cache, media, psnr):
+        key = SyncCache.key(*media)
+        sync_cache.put(key, 0.5, psnr)
+        assert sync_cache.get(key)[1] == psnr
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {'syncWindow': 4, 'method': 'psnr'},
+            {'syncWindow': 3, 'method': 'vectorized'},
+            {'syncWindow': 3, 'method': 'psnr', 'reverse': True},
+        ],
+        ids=["window", "method", "reverse"],
+    )
+    def test_params_are_part_of_the_key(self, media, params):
+        assert SyncCache.key(*media, syncWindow=3, method='psnr') != SyncCache.key(*media, **params)
+
+    def test_key_ignores_param_order(self, media):
+        assert SyncCache.key(*media, a=1, b=2) == SyncCache.key(*media, b=2, a=1)
+
+    def test_swapped_inputs_differ(self, media):
+        assert SyncCache.key(*media) != SyncCache.key(*reversed(media))
+
+    def test_expired_entries_are_ignored_and_evicted(self, tmp_path, media, monkeypatch):
+        cache = SyncCache(str(tmp_path / 'c'), max_age=10)
+        key = SyncCache.key(*media)
+        monkeypatch.setattr(cache_mod.time, 'time', lambda: 1000.0)
+        cache.put(key, 1.0, 40.0)
+        monkeypatch.setattr(cache_mod.time, 'time', lambda: 1011.0)
+        assert cache.get(key) is None
+        cache.evict()
+        assert len(cache) == 0
+
+    def test_size_eviction_drops_oldest(self, tmp_path, monkeypatch):
+        cache = SyncCache(str(tmp_path / 'c'), max_entries=2)
+        now = [1000.0]
+        monkeypatch.setattr(cache_mod.time, 'time', lambda: now[0])
+        for key in ('a', 'b', 'c'):
+            now[0] += 1
+            cache.put(key, 0.0, 0.0)
+        assert len(cache) == 2
+        assert cache.get('a') is None
+        assert cache.get('c') is not None
+
+    def test_clear(self, sync_cache):
+        sync_cache.put('k', 0.0, None)
+        sync_cache.clear()
+        assert len(sync_cache) == 0
+
+
+class TestProbeCache:
+    """ProbeCache stores ffprobe results keyed by file identity."""
+
+    def test_round_trip(self, tmp_path, media):
+        cache = ProbeCache(str(tmp_path / 'c'))
+        info = {'streams': [{'width': 1920}], 'format': {'duration': '10.0'}, 'frames': []}
+        key = cache.key(media[0], cmd=['-show_streams'])
+        assert cache.get(key) is None
+        cache.put(key, info)
+        assert cache.get(key) == info
+
+    def test_rewrite_changes_key(self, tmp_path, media):
+        cache = ProbeCache(str(tmp_path / 'c'))
+        before = cache.key(media[0])
+        with open(media[0], 'ab') as f:
+            f.write(b'more')
+        assert cache.key(media[0]) != before
+
+    def test_touch_changes_key(self, tmp_path, media):
+        cache = ProbeCache(str(tmp_path / 'c'))
+        before = cache.key(media[0])
+        st = os.stat(media[0])
+        os.utime(media[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        assert cache.key(media[0]) != before
+
+    def test_params_are_part_of_the_key(self, tmp_path, media):
+        cache = ProbeCache(str(tmp_path / 'c'))
+        assert cache.key(media[0], cmd=['a']) != cache.key(media[0], cmd=['b'])
+
+    def test_fingerprint_option(self, tmp_path, media, monkeypatch):
+        plain = ProbeCache(str(tmp_path / 'c'))
+        content = ProbeCache(str(tmp_path / 'c'), fingerprint=True)
+        assert plain.key(media[0]) != content.key(media[0])
+        # Same path, size, mtime and inode, but different content
+        fingerprints = iter(['before', 'after'])
+        monkeypatch.setattr(cache_mod, 'file_fingerprint', lambda path: next(fingerprints))
+        assert content.key(media[0]) != content.key(media[0])
+
+    def test_shares_the_database_with_the_sync_cache(self, tmp_path, media):
+        probe = ProbeCache(str(tmp_path / 'c'))
+        sync = SyncCache(str(tmp_path / 'c'))
+        probe.put(probe.key(media[0]), {'format': {}})
+        sync.put('k', 0.0, None)
+        assert (len(probe), len(sync)) == (1, 1)
@@ -0,0 +1,190 @@
+"""Tests for the CLI result helpers — the JSON result, batch sync and probing."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from easyvmaf import cli
+from easyvmaf.cli import _build_result
+
+
+class TestBuildResult:
+    """_build_result shapes the -json output."""
+
+    def test_sync_only(self):
+        result = _build_result('d.mp4', 'r.mp4', 0.70070001, 48.8637791, 'HD', sync_method='psnr')
+        assert result == {
+            'distorted': 'd.mp4',
+            'reference': 'r.mp4',
+            'sync': {'offset': 0.7007, 'psnr': 48.863779, 'method': 'psnr'},
+        }
+
+    def test_anchors_and_segments(self):
+        result = _build_result(
+            'd.mp4', 'r.mp4', 0.5, None, 'HD', vmaf_scores={'vmaf_hd': 90.0},
+            anchors=[{'time': 0.0, 'offset': 0.5, 'psnr': None}],
+            segments=[{'start': 0.0, 'duration': 10.1234567, 'offset': 0.5, 'frames': 253,
+                       'vmaf': {'vmaf_hd': 90.1234567}, 'output_file': 'd_vmaf_seg0.json'}])
+        assert result['sync']['anchors'] == [{'time': 0.0, 'offset': 0.5, 'psnr': None}]
+        assert result['segments'] == [{'start': 0.0, 'duration': 10.123457, 'offset': 0.5,
+                                       'frames': 253, 'vmaf': {'vmaf_hd': 90.123457},
+                                       'output_file': 'd_vmaf_seg0.json'}]
+        assert result['vmaf'] == {'model': 'HD', 'vmaf_hd': 90.0}
+
+    def test_pooled(self):
+        pooled = {'vmaf_hd': {'mean': 90.12345678, 'harmonic_mean': 89.9, 'min': 70.0,
+                              'p1': 71.0, 'p5': 75.0, 'p10': 80.0, 'std': float('nan')}}
+        result = _build_result('d.mp4', 'r.mp4', 0.0, None, 'HD',
+                               vmaf_scores={'vmaf_hd': 90.12345678}, pooled=pooled)
+        assert result['vmaf']['pooled'] == {
+            'vmaf_hd': {'mean': 90.123457, 'harmonic_mean': 89.9, 'min': 70.0,
+                        'p1': 71.0, 'p5': 75.0, 'p10': 80.0, 'std': None}}
+        json.dumps(result, allow_nan=False)
+
+
+class TestBatchSync:
+    """_batch_sync syncs every rendition against one shared reference window."""
+
+    @pytest.fixture
+    def fake_sync(self, monkeypatch):
+        calls = []
+
+        def sync(main, reference, vmaf_args, sync_args, anchors=0):
+            calls.append(sync_args)
+            if main == 'broken.mp4':
+                raise ValueError("no frames")
+            myVmaf = SimpleNamespace(syncMethod=sync_args['method'], anchors=None, segments=None)
+            return myVmaf, 0.04 * len(main), 45.0
+
+        monkeypatch.setattr(cli, '_sync_rendition', sync)
+        return calls
+
+    def test_one_json_line_per_rendition(self, fake_sync, capsys):
+        files = [f'{h}p.mp4' for h in (360, 720, 1080)]
+        code = cli._batch_sync(files, 'ref.mp4', {'model': 'HD', 'threads': 2},
+                               {'method': 'psnr', 'syncWindow': 3}, use_json=True)
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert code == 0
+        assert sorted(line['distorted'] for line in lines) == sorted(files)
+        assert {line['sync']['method'] for line in lines} == {'vectorized'}
+        # every rendition gets the same decode cache
+        assert len({id(args['rawCache']) for args in fake_sync}) == 1
+
+    def test_early_stop_keeps_the_method(self, fake_sync, capsys, caplog):
+        files = ['a.mp4', 'b.mp4']
+        code = cli._batch_sync(files, 'ref.mp4', {'model': 'HD'},
+                               {'method': 'hierarchical', 'syncWindow': 3, 'stop_psnr': 50,
+                                'stop_margin': None}, use_json=True)
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert code == 0
+        assert {line['sync']['method'] for line in lines} == {'hierarchical'}
+        assert all(args['stop_psnr'] == 50 and 'rawCache' not in args for args in fake_sync)
+        assert 'sync_stop' in caplog.text
+
+    def test_method_switch_is_logged(self, fake_sync, capsys, caplog):
+        cli._batch_sync(['a.mp4', 'b.mp4'], 'ref.mp4', {'model': 'HD'},
+                        {'method': 'psnr', 'syncWindow': 3})
+        assert 'vectorized method instead of psnr' in caplog.text
+
+    def test_jobs_bound_the_renditions_in_flight(self, monkeypatch, capsys):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def sync(main, reference, vmaf_args, sync_args, anchors=0):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return SimpleNamespace(syncMethod='vectorized', anchors=None, segments=None), 0.0, 40.0
+
+        monkeypatch.setattr(cli, '_sync_rendition', sync)
+        files = [f'{i}.mp4' for i in range(8)]
+        code = cli._batch_sync(files, 'ref.mp4', {'model': 'HD', 'threads': 16},
+                               {'method': 'vectorized', 'syncWindow': 3})
+        assert code == 0 and 1 < peak[0] <= cli.BATCH_SYNC_JOBS
+
+    def test_single_file_keeps_method_and_format(self, fake_sync, capsys):
+        code = cli._batch_sync(['a.mp4'], 'ref.mp4', {'model': 'HD'},
+                               {'method': 'psnr', 'syncWindow': 3})
+        assert code == 0
+        assert capsys.readouterr().out == "offset: 0.2 | psnr: 45.0\n"
+        assert 'rawCache' not in fake_sync[0]
+
+    def test_failure_does_not_stop_the_batch(self, fake_sync, capsys):
+        code = cli._batch_sync(['a.mp4', 'broken.mp4'], 'ref.mp4', {'model': 'HD'},
+                               {'method': 'audio', 'syncWindow': 3}, use_json=True)
+        out, err = capsys.readouterr()
+        assert code == 1
+        assert [json.loads(line)['distorted'] for line in out.splitlines()] == ['a.mp4']
+        assert 'broken.mp4' in err
+        assert fake_sync[0]['method'] == 'audio'
+
+
+class TestProbeInputs:
+    """_probe_inputs probes the reference once and the distorted files concurrently."""
+
+    @pytest.fixture
+    def probed(self, monkeypatch):
+        calls = []
+
+        def fake_video(src, loglevel='info', probe_cache=None, idet=False):
+            calls.append(src)
+            if src == 'corrupt.mp4':
+                raise ValueError("invalid data")
+            return SimpleNamespace(videoSrc=src)
+
+        monkeypatch.setattr(cli, 'video', fake_video)
+        return calls
+
+    def test_reference_probed_once(self, probed):
+        files = [f'{i}.mp4' for i in range(20)]
+        ref, mains = cli._probe_inputs(files, 'ref.mp4', threads=4)
+        assert ref.videoSrc == 'ref.mp4'
+        assert [m.videoSrc for m in mains] == files
+        assert probed.count('ref.mp4') == 1
+        assert len(probed) == 21
+
+    def test_unprobeable_file_is_left_out(self, probed, capsys):
+        _, mains = cli._probe_inputs(['a.mp4', 'corrupt.mp4'], 'ref.mp4')
+        assert [m.videoSrc for m in mains] == ['a.mp4']
+        assert 'corrupt.mp4' in capsys.readouterr().err
+
+    def test_batch_sync_reports_paths_of_probed_videos(self, probed, monkeypatch, capsys):
+        seen = []
+
+        def sync(main, reference, vmaf_args, sync_args, anchors=0):
+            seen.append(reference)
+            return SimpleNamespace(syncMethod='vectorized', anchors=None, segments=None), 0.0, 40.0
+
+        monkeypatch.setattr(cli, '_sync_rendition', sync)
+        ref, mains = cli._probe_inputs(['a.mp4', 'b.mp4'], 'ref.mp4')
+        cli._batch_sync(mains, ref, {'model': 'HD'}, {'method': 'vectorized'}, use_json=True)
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {(line['distorted'], line['reference']) for line in lines} == \
+            {('a.mp4', 'ref.mp4'), ('b.mp4', 'ref.mp4')}
+        assert all(r is ref for r in seen), "the probed reference must be shared, not re-probed"
+
+
+def test_batch_sync_records_runs_in_the_store(monkeypatch, tmp_path, capsys):
+    from easyvmaf.warehouse import ResultStore
+
+    def sync(main, reference, vmaf_args, sync_args, anchors=0):
+        myVmaf = SimpleNamespace(syncMethod='psnr', anchors=None, segments=None,
+                                 timings={'probe': 0.1, 'sync': 2.0})
+        return myVmaf, 0.5, 45.0
+
+    monkeypatch.setattr(cli, '_sync_rendition', sync)
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    cache = object()
+    code = cli._batch_sync(['a.mp4'], 'ref.mp4', {'model': '4K'},
+                           {'method': 'psnr', 'syncWindow': 3, 'cache': cache}, store=store)
+    assert code == 0
+    assert capsys.readouterr().out == "offset: 0.5 | psnr: 45.0\n"
+    [row] = store.query()
+    assert (row['model'], row['offset'], row['psnr'], row['timings']['sync']) == ('4K', 0.5, 45.0, 2.0)
+    assert row['params'] == {'model': '4K', 'method': 'psnr', 'syncWindow': 3, 'anchors': 0}
@@ -0,0 +1,134 @@
+"""Tests for easyvmaf.frameindex — memory-mapped frame/time range queries of libvmaf logs."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from easyvmaf import frameindex
+from easyvmaf.frameindex import (FrameIndex, FrameIndexError, build_index, index_path,
+                                 open_index)
+from easyvmaf.logs import LogFormatError, load_scores, pool_scores
+from easyvmaf.result import VmafResult
+
+SAMPLES = os.path.join(os.path.dirname(__file__), '..', 'video_samples')
+XML_SAMPLE = os.path.join(SAMPLES, 'BBB_sampleA_distorted_vmaf.xml')
+
+
+def _json_log(path, frames, step=1):
+    path.write_text(json.dumps({'frames': [{'frameNum': i * step, 'metrics': m}
+                                           for i, m in enumerate(frames)]}))
+    return str(path)
+
+
+@pytest.fixture
+def sample_index(tmp_path):
+    return build_index(XML_SAMPLE, str(tmp_path / 'sample.frames'), fps=24, start=10)
+
+
+class TestBuild:
+    """build_index() converts a log into fixed-width rows and a frameNum table."""
+
+    def test_matches_the_log(self, sample_index):
+        scores = load_scores(XML_SAMPLE)
+        assert len(sample_index) == 240
+        assert sample_index.names == list(scores)
+        assert isinstance(sample_index.frameNums, np.memmap)
+        for name, values in sample_index.frameRange().items():
+            assert np.array_equal(values, scores[name])
+
+    def test_small_batches(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(frameindex, '_BATCH_ROWS', 7)
+        index = build_index(XML_SAMPLE, str(tmp_path / 'sample.frames'), names=['vmaf_hd'])
+        assert index.names == ['vmaf_hd']
+        assert np.array_equal(index.frameRange()['vmaf_hd'], load_scores(XML_SAMPLE)['vmaf_hd'])
+
+    def test_data_is_aligned(self, sample_index):
+        assert sample_index._matrix.offset % 64 == 0
+
+    def test_empty_log(self, tmp_path):
+        index = build_index(_json_log(tmp_path / 'log.json', []))
+        assert len(index) == 0 and index.names == []
+        assert index.path == index_path(str(tmp_path / 'log.json'))
+
+    def test_missing_metric(self, tmp_path):
+        path = _json_log(tmp_path / 'log.json', [{'a': 1.0}, {'b': 2.0}])
+        with pytest.raises(LogFormatError, match='frame 1'):
+            build_index(path)
+        assert os.listdir(tmp_path) == ['log.json']
+
+    def test_not_an_index(self, tmp_path):
+        path = tmp_path / 'log.frames'
+        path.write_bytes(b'garbage')
+        with pytest.raises(FrameIndexError):
+            FrameIndex(str(path))
+
+
+class TestQueries:
+    """Frame and time ranges only read the rows they select."""
+
+    def test_frame_range(self, sample_index):
+        scores = load_scores(XML_SAMPLE)
+        window = sample_index.frameRange(100, 110, names=['vmaf_hd'])
+        assert list(window) == ['vmaf_hd']
+        assert np.array_equal(window['vmaf_hd'], scores['vmaf_hd'][100:110])
+
+    @pytest.mark.parametrize(
+        "start, end",
+        [(11, 12), ('00:00:11', '0:12'), (11.0, '00:00:12.000')],
+        ids=["seconds", "strings", "mixed"],
+    )
+    def test_time_range(self, sample_index, start, end):
+        window = sample_index.timeRange(start, end)
+        assert np.array_equal(window['vmaf_hd'], load_scores(XML_SAMPLE)['vmaf_hd'][24:48])
+
+    def test_pooling_a_window(self, sample_index):
+        scores = load_scores(XML_SAMPLE, names=['vmaf_hd'])
+        expected = pool_scores({'vmaf_hd': scores['vmaf_hd'][24:48]})
+        assert sample_index.poolTime(11, 12, names=['vmaf_hd']) == expected
+        assert sample_index.pool(24, 48, names=['vmaf_hd']) == expected
+
+    def test_subsampled_frames(self, tmp_path):
+        index = build_index(_json_log(tmp_path / 'log.json', [{'a': float(i)} for i in range(5)], step=2))
+        assert index.frameNums.tolist() == [0, 2, 4, 6, 8]
+        assert index.frameRange(1, 5)['a'].tolist() == [1.0, 2.0]
+        assert index.frameRange(9)['a'].tolist() == []
+
+    def test_time_needs_fps(self, tmp_path):
+        index = build_index(_json_log(tmp_path / 'log.json', [{'a': 1.0}]))
+        with pytest.raises(FrameIndexError, match='frame rate'):
+            index.timeRange(0, 1)
+
+    def test_unknown_metric(self, sample_index):
+        with pytest.raises(FrameIndexError, match='vmaf_4k'):
+            sample_index.frameRange(names=['vmaf_4k'])
+
+
+class TestOpenIndex:
+    """open_index() reuses the sidecar while it is newer than the log."""
+
+    def test_reuse_and_rebuild(self, tmp_path, monkeypatch):
+        log = _json_log(tmp_path / 'log.json', [{'a': 1.0}])
+        builds = []
+        build = frameindex.build_index
+        monkeypatch.setattr(frameindex, 'build_index', lambda *a, **k: builds.append(a) or build(*a, **k))
+        open_index(log, fps=25)
+        assert open_index(log).fps == 25
+        assert len(builds) == 1
+        _json_log(tmp_path / 'log.json', [{'a': 1.0}, {'a': 2.0}])
+        os.utime(log, (os.path.getmtime(index_path(log)) + 10,) * 2)
+        assert len(open_index(log)) == 2 and len(builds) == 2
+
+    def test_corrupt_sidecar_is_rebuilt(self, tmp_path):
+        log = _json_log(tmp_path / 'log.json', [{'a': 1.0}])
+        with open(index_path(log), 'wb') as f:
+            f.write(b'garbage')
+        assert len(open_index(log)) == 1
+
+    def test_vmaf_result(self, tmp_path):
+        log = _json_log(tmp_path / 'log.json', [{'vmaf_hd': 90.0}])
+        index = VmafResult(log, 'json', 'HD', fps=50.0, start=2.0).frameIndex()
+        assert (index.path, index.fps, index.start) == (index_path(log), 50.0, 2.0)
+        with pytest.raises(LogFormatError):
+            VmafResult(None).frameIndex()
@@ -0,0 +1,60 @@
+"""Tests for input-side seeking — inputFFmpeg.setSeek and FFmpegQos._commitInputs."""
+
+from easyvmaf.ffmpeg import FFmpegQos
+
+
+def _qos():
+    return FFmpegQos('main.mp4', 'ref.mp4')
+
+
+def test_no_seek_by_default():
+    assert _qos()._commitInputs() == [
+        '-i', 'main.mp4', '-i', 'ref.mp4', '-map', '0:v', '-map', '1:v']
+
+
+def test_seek_is_emitted_before_its_own_input():
+    qos = _qos()
+    qos.ref.setSeek(25.025, 10)
+    qos.main.setSeek(0, 10)
+    assert qos._commitInputs() == [
+        '-t', '10', '-i', 'main.mp4',
+        '-ss', '25.025', '-t', '10', '-i', 'ref.mp4',
+        '-map', '0:v', '-map', '1:v']
+
+
+def test_seek_does_not_touch_the_filter_chain():
+    qos = _qos()
+    qos.ref.setSeek(3, 0.5)
+    assert qos.ref.filtersList == []
+    assert qos.ref.lastOutputID == '1:v'
+
+
+def test_seek_without_duration():
+    qos = _qos()
+    qos.main.setSeek(1.5)
+    assert qos.main.extraOptions == ['-ss', '1.5']
+
+
+def test_setseek_replaces_previous_seek():
+    qos = _qos()
+    qos.main.setSeek(1, 2)
+    qos.main.setSeek(3, 4)
+    assert qos.main.extraOptions == ['-ss', '3', '-t', '4']
+
+
+def test_clear_filters_resets_seek():
+    qos = _qos()
+    qos.main.setSeek(1, 2)
+    qos.main.clearFilters()
+    assert qos.main.extraOptions == []
+
+
+def test_raw_decode_cmd_carries_the_seek():
+    qos = _qos()
+    qos.ref.setSeek(2, 3.5)
+    qos.ref.setScaleFilter(480, 270)
+    cmd = qos._commitRawInput(qos.ref, 'gray')
+    i = cmd.index('-i')
+    assert cmd[i - 4:i + 2] == ['-ss', '2', '-t', '3.5', '-i', 'ref.mp4']
+    # single-input cmd: the ref chain must read from input 0
+    assert cmd[cmd.index('-filter_complex') + 1].startswith('[0:v]scale=480:270')
@@ -0,0 +1,179 @@
+"""Tests for easyvmaf.ffmpeg.LogPipe — libvmaf logs read through a FIFO instead of a file."""
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from easyvmaf.ffmpeg import LogPipe
+from easyvmaf.logs import LogFormatError
+from easyvmaf.result import load_model_scores
+from easyvmaf.vmaf import vmaf
+
+LOG = json.dumps({'version': '3.0.0',
+                  'frames': [{'frameNum': i, 'metrics': {'vmaf_4k': 80.0 + i, 'psnr_y': 40.0}}
+                             for i in range(3)]})
+
+
+def _write(path, text):
+    """Write the log as ffmpeg does: open, write, close, from another thread."""
+    def run():
+        with open(path, 'w') as f:
+            f.write(text)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _reader(f):
+    return load_model_scores(f, 'json', '4K')
+
+
+@pytest.mark.parametrize("fifo", [True, False], ids=["fifo", "file-fallback"])
+def test_scores_are_read_from_the_pipe(monkeypatch, fifo):
+    if fifo and not hasattr(os, 'mkfifo'):
+        pytest.skip("os.mkfifo not available")
+    if not fifo:
+        monkeypatch.delattr(os, 'mkfifo', raising=False)
+    with LogPipe('.json', _reader) as pipe:
+        assert pipe.fifo == fifo
+        _write(pipe.path, LOG).join()
+    scores = pipe.value()
+    assert scores['vmaf_4k'].tolist() == [80.0, 81.0, 82.0]
+    assert not os.path.exists(os.path.dirname(pipe.path))
+
+
+def test_nothing_written():
+    """ffmpeg failed before writing the log: leaving the pipe does not block."""
+    with LogPipe('.json', _reader) as pipe:
+        pass
+    with pytest.raises(LogFormatError):
+        pipe.value()
+    assert not os.path.exists(os.path.dirname(pipe.path))
+
+
+def test_default_reader_returns_the_bytes():
+    with LogPipe('.xml') as pipe:
+        _write(pipe.path, '<VMAF />').join()
+    assert pipe.value() == b'<VMAF />'
+
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="os.mkfifo not available")
+class TestCloseAsync:
+    """LogPipe.closeAsync() waits for a slow reader without blocking the event loop."""
+
+    @staticmethod
+    def _slowReader(f):
+        data = f.read()
+        time.sleep(0.3)
+        return data
+
+    def test_loop_keeps_running(self):
+        async def job():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            pipe = LogPipe('.json', self._slowReader).__enter__()
+            await asyncio.get_running_loop().run_in_executor(None, lambda: _write(pipe.path, LOG).join())
+            ticker = asyncio.ensure_future(tick())
+            await pipe.closeAsync()
+            ticker.cancel()
+            return pipe, ticks
+
+        pipe, ticks = asyncio.run(job())
+        assert ticks >= 10
+        assert pipe.value() == LOG.encode()
+        assert not os.path.exists(os.path.dirname(pipe.path))
+
+    def test_cancel_still_closes(self):
+        async def job():
+            pipe = LogPipe('.json', self._slowReader).__enter__()
+            await asyncio.get_running_loop().run_in_executor(None, lambda: _write(pipe.path, LOG).join())
+            task = asyncio.ensure_future(pipe.closeAsync())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return pipe
+
+        pipe = asyncio.run(job())
+        pipe._thread.join(5)
+        for _ in range(100):
+            if not os.path.exists(os.path.dirname(pipe.path)):
+                break
+            time.sleep(0.01)
+        assert not os.path.exists(os.path.dirname(pipe.path))
+        assert pipe.value() == LOG.encode()
+
+
+class TestVmafResult:
+    """vmaf._result() of a run whose log went through a LogPipe."""
+
+    def _vmaf(self):
+        obj = vmaf.__new__(vmaf)
+        obj.ffmpegQos = SimpleNamespace(vmafpath='/tmp/easyvmaf-x/vmaf.json',
+                                        vmaf_cambi_heatmap_path=None,
+                                        main=SimpleNamespace(filtersList=[]))
+        obj.main = SimpleNamespace(streamInfo={'r_frame_rate': '25/1'})
+        obj.output_fmt, obj.model, obj.offset, obj.cambi_heatmap = 'json', '4K', 0, False
+        obj.timings = {}
+        obj.log_pipe, obj.compress_log = True, False
+        return obj
+
+    def test_scores_without_log_path(self):
+        obj = self._vmaf()
+        with obj._logPipe() as pipe:
+            _write(pipe.path, LOG).join()
+        result = obj._result(SimpleNamespace(returncode=0), pipe=pipe)
+        assert result.log_path is None
+        assert result.frames == 3
+        assert result.means == {'vmaf_4k': 81.0}
+
+    def test_failed_run(self):
+        obj = self._vmaf()
+        with obj._logPipe() as pipe:
+            pass
+        result = obj._result(SimpleNamespace(returncode=1), pipe=pipe)
+        assert not result.ok and result.log_path is None
+        with pytest.raises(LogFormatError, match='exit status 1'):
+            result.means
+
+    def test_npz_output(self, tmp_path):
+        obj = self._vmaf()
+        obj.log_pipe, obj.output_fmt = False, 'npz'
+        npzPath = str(tmp_path / 'd_vmaf.npz')
+        with obj._logPipe(npzPath) as pipe:
+            assert pipe.path.endswith('.json')
+            _write(pipe.path, LOG).join()
+        result = obj._result(SimpleNamespace(returncode=0), pipe=pipe)
+        assert (result.log_path, result.output_fmt) == (npzPath, 'npz')
+        assert result.scores['vmaf_4k'].tolist() == [80.0, 81.0, 82.0]
+        assert os.listdir(tmp_path) == ['d_vmaf.npz']
+
+    def test_compressed_output(self, tmp_path):
+        obj = self._vmaf()
+        obj.log_pipe, obj.compress_log = False, True
+        path = str(tmp_path / 'd_vmaf.json.gz')
+        with obj._logPipe(path) as pipe:
+            _write(pipe.path, LOG).join()
+        result = obj._result(SimpleNamespace(returncode=0), pipe=pipe)
+        assert (result.log_path, result.output_fmt) == (path, 'json')
+        with gzip.open(path, 'rt') as f:
+            assert f.read() == LOG
+        assert result.means == {'vmaf_4k': 81.0}
+
+    def test_no_pipe_by_default(self):
+        obj = self._vmaf()
+        obj.log_pipe = False
+        with obj._logPipe() as pipe:
+            assert pipe is None
@@ -0,0 +1,316 @@
+"""Tests for easyvmaf.logs — streaming libvmaf log readers and running statistics."""
+
+import json
+import math
+import os
+import statistics
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from easyvmaf import logs
+from easyvmaf.logs import (NPZ_FRAME_KEY, LogFormatError, RunningStats, compress_log, iter_csv_frames,
+                           iter_frames, iter_json_frames, iter_xml_frames, load_npz, load_scores,
+                           log_format, pool_log, pool_scores, save_npz)
+
+SAMPLES = os.path.join(os.path.dirname(__file__), '..', 'video_samples')
+XML_SAMPLE = os.path.join(SAMPLES, 'BBB_sampleA_distorted_vmaf.xml')
+
+VALUES = [92.5, 0.0, 100.0, 87.25, 45.0, 99.9]
+
+
+def _json_log(path, frames):
+    path.write_text(json.dumps({
+        'version': '3.0.0',
+        'fps': 3.5,
+        'frames': [{'frameNum': i, 'metrics': m} for i, m in enumerate(frames)],
+        'pooled_metrics': {'vmaf_hd': {'min': 0.0}},
+        'aggregate_metrics': {},
+    }, indent=4))
+    return str(path)
+
+
+class TestRunningStats:
+    """RunningStats matches the statistics of the full list, in constant memory."""
+
+    def test_against_statistics(self):
+        stats = RunningStats(VALUES)
+        assert stats.count == len(VALUES)
+        assert stats.mean == pytest.approx(statistics.mean(VALUES))
+        assert stats.std == pytest.approx(statistics.pstdev(VALUES))
+        assert (stats.min, stats.max) == (0.0, 100.0)
+
+    def test_harmonic_mean_is_libvmaf_one(self):
+        expected = len(VALUES) / sum(1 / (v + 1) for v in VALUES) - 1
+        assert RunningStats(VALUES).harmonic_mean == pytest.approx(expected)
+
+    @pytest.mark.parametrize("split", [0, 1, 3, 6], ids=["empty-left", "one", "half", "empty-right"])
+    def test_merge_equals_sequential(self, split):
+        merged = RunningStats(VALUES[:split]).merge(RunningStats(VALUES[split:]))
+        sequential = RunningStats(VALUES)
+        assert merged.to_dict() == pytest.approx(sequential.to_dict())
+
+    def test_empty(self):
+        stats = RunningStats()
+        assert stats.count == 0
+        assert math.isnan(stats.std) and math.isnan(stats.harmonic_mean)
+
+    def test_large_offset_is_stable(self):
+        values = [1e9 + v for v in VALUES]
+        assert RunningStats(values).std == pytest.approx(statistics.pstdev(VALUES), rel=1e-6)
+
+
+class TestJsonFrames:
+    """iter_json_frames decodes one frame at a time, whatever the chunking."""
+
+    @pytest.mark.parametrize("chunk", [1, 7, 64 * 1024], ids=["byte", "small", "default"])
+    def test_frames_across_chunks(self, tmp_path, monkeypatch, chunk):
+        monkeypatch.setattr(logs, '_JSON_CHUNK', chunk)
+        frames = [{'vmaf_hd': v, 'psnr_y': 40.0 + i} for i, v in enumerate(VALUES)]
+        path = _json_log(tmp_path / 'log.json', frames)
+        assert list(iter_json_frames(path)) == list(enumerate(frames))
+
+    def test_empty_frames(self, tmp_path):
+        assert list(iter_json_frames(_json_log(tmp_path / 'log.json', []))) == []
+
+    def test_compact_json(self, tmp_path):
+        path = tmp_path / 'log.json'
+        path.write_text('{"frames":[{"frameNum":0,"metrics":{"vmaf":1.5}},'
+                        '{"frameNum":2,"metrics":{"vmaf":2.5}}]}')
+        assert list(iter_json_frames(str(path))) == [(0, {'vmaf': 1.5}), (2, {'vmaf': 2.5})]
+
+    @pytest.mark.parametrize(
+        "content",
+        ['{"version": "3.0.0", "fps": 3.5}', '{"frames": [{"frameNum": 0, "metrics": {"vm'],
+        ids=["no-frames", "truncated"],
+    )
+    def test_invalid_logs(self, tmp_path, content):
+        path = tmp_path / 'log.json'
+        path.write_text(content)
+        with pytest.raises(LogFormatError):
+            list(iter_json_frames(str(path)))
+
+
+def test_xml_frames_match_the_tree():
+    root = ET.parse(XML_SAMPLE).getroot()
+    expected = [(int(f.attrib['frameNum']),
+                 {k: float(v) for k, v in f.attrib.items() if k != 'frameNum'})
+                for f in root.findall('frames/frame')]
+    assert list(iter_xml_frames(XML_SAMPLE)) == expected
+    assert len(expected) == 240
+
+
+def test_xml_invalid_log(tmp_path):
+    path = tmp_path / 'log.xml'
+    path.write_text('<VMAF><frames><frame frameNum="0" vmaf="1"')
+    with pytest.raises(LogFormatError):
+        list(iter_xml_frames(str(path)))
+
+
+def test_csv_frames(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text('Frame,psnr_y,vmaf_hd,\n0,40.5,92.5,\n1,41.0,,\n')
+    assert list(iter_csv_frames(str(path))) == [
+        (0, {'psnr_y': 40.5, 'vmaf_hd': 92.5}),
+        (1, {'psnr_y': 41.0}),
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["json", "xml", "csv"])
+def test_open_binary_files(tmp_path, fmt):
+    """Readers also take an open binary file, e.g. the read end of a FIFO."""
+    path = tmp_path / f'log.{fmt}'
+    if fmt == 'json':
+        _json_log(path, [{'vmaf': 1.5}, {'vmaf': 2.5}])
+    elif fmt == 'xml':
+        path.write_text('<VMAF><frames><frame frameNum="0" vmaf="1.5" />'
+                        '<frame frameNum="1" vmaf="2.5" /></frames></VMAF>')
+    else:
+        path.write_text('Frame,vmaf\n0,1.5\n1,2.5\n')
+    with open(path, 'rb') as f:
+        assert list(iter_frames(f, fmt)) == [(0, {'vmaf': 1.5}), (1, {'vmaf': 2.5})]
+        assert not f.closed
+    with open(path, 'rb') as f:
+        assert log_format(f) == fmt
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [('a.json', 'json'), ('a.XML', 'xml'), ('a.csv', 'csv'), ('a.npz', 'npz'), ('a.csv.gz', 'csv'),
+     ('a.log', 'json')],
+)
+def test_log_format(name, expected):
+    assert log_format(name) == expected
+
+
+class TestPoolLog:
+    """pool_log pools a whole log in one pass."""
+
+    def test_sample_means(self):
+        root = ET.parse(XML_SAMPLE).getroot()
+        expected = statistics.mean(float(f.attrib['vmaf_hd']) for f in root.findall('frames/frame'))
+        stats = pool_log(XML_SAMPLE, names=['vmaf_hd'])
+        assert list(stats) == ['vmaf_hd']
+        assert stats['vmaf_hd'].mean == pytest.approx(expected)
+
+    def test_every_metric_by_default(self, tmp_path):
+        path = _json_log(tmp_path / 'log.json', [{'a': 1.0, 'b': 2.0}, {'a': 3.0, 'b': 4.0}])
+        stats = pool_log(path)
+        assert {name: s.mean for name, s in stats.items()} == {'a': 2.0, 'b': 3.0}
+
+    def test_missing_metric(self, tmp_path):
+        path = _json_log(tmp_path / 'log.json', [{'a': 1.0}])
+        with pytest.raises(LogFormatError, match='vmaf_hd'):
+            pool_log(path, names=['vmaf_hd'])
+
+    def test_iter_frames_dispatches_on_fmt(self, tmp_path):
+        path = tmp_path / 'log.txt'
+        path.write_text('Frame,vmaf\n0,1.0\n')
+        assert list(iter_frames(str(path), 'csv')) == [(0, {'vmaf': 1.0})]
+
+
+class TestLoadScores:
+    """load_scores fills one contiguous float64 array per metric."""
+
+    def test_columns(self, tmp_path):
+        path = _json_log(tmp_path / 'log.json', [{'a': v, 'b': -v} for v in VALUES])
+        scores = load_scores(path)
+        assert list(scores) == ['a', 'b']
+        assert scores['a'].dtype == np.float64 and scores['a'].flags['C_CONTIGUOUS']
+        assert scores['b'].tolist() == [-v for v in VALUES]
+
+    def test_absent_names_are_left_out(self):
+        scores = load_scores(XML_SAMPLE, names=['vmaf_hd', 'vmaf_4k'])
+        assert list(scores) == ['vmaf_hd']
+        assert len(scores['vmaf_hd']) == 240
+
+    def test_metric_missing_later(self, tmp_path):
+        path = _json_log(tmp_path / 'log.json', [{'a': 1.0}, {'b': 2.0}])
+        with pytest.raises(LogFormatError, match='frame 1'):
+            load_scores(path)
+
+    def test_empty_log(self, tmp_path):
+        assert load_scores(_json_log(tmp_path / 'log.json', [])) == {}
+
+
+class TestGzip:
+    """Compressed logs are read like plain ones, whatever their extension."""
+
+    @pytest.mark.parametrize("name", ["log.xml.gz", "log.xml"], ids=["gz-ext", "sniffed"])
+    def test_xml_sample(self, tmp_path, name):
+        path = compress_log(str(tmp_path / name), XML_SAMPLE)
+        with open(path, 'rb') as f:
+            assert f.read(2) == b'\x1f\x8b'
+        assert log_format(path) == 'xml'
+        assert list(iter_frames(path)) == list(iter_xml_frames(XML_SAMPLE))
+
+    @pytest.mark.parametrize("fmt", ["json", "csv"])
+    def test_text_readers(self, tmp_path, fmt):
+        if fmt == 'json':
+            log = _json_log(tmp_path / 'log.json', [{'a': 1.5}, {'a': 2.5}])
+        else:
+            log = tmp_path / 'log.csv'
+            log.write_text('Frame,a\n0,1.5\n1,2.5\n')
+        path = compress_log(str(tmp_path / f'log.{fmt}.gz'), str(log))
+        assert load_scores(path)['a'].tolist() == [1.5, 2.5]
+        assert pool_log(path)['a'].mean == 2.0
+
+    def test_from_an_open_file(self, tmp_path):
+        path = str(tmp_path / 'log.xml.gz')
+        with open(XML_SAMPLE, 'rb') as f:
+            compress_log(path, f)
+        assert len(load_scores(path)['vmaf_hd']) == 240
+
+    def test_truncated(self, tmp_path):
+        path = compress_log(str(tmp_path / 'log.xml.gz'), XML_SAMPLE)
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        with pytest.raises(LogFormatError, match='compressed'):
+            list(iter_frames(path))
+
+    def test_empty_log_is_not_written(self, tmp_path):
+        empty = tmp_path / 'empty.json'
+        empty.write_text('')
+        with pytest.raises(LogFormatError, match='Empty'):
+            compress_log(str(tmp_path / 'log.json.gz'), str(empty))
+        assert os.listdir(tmp_path) == ['empty.json']
+
+
+class TestNpz:
+    """npz outputs: converted in one pass, mapped back without reading."""
+
+    def test_round_trip(self, tmp_path):
+        path = save_npz(str(tmp_path / 'log.npz'), XML_SAMPLE)
+        expected = load_scores(XML_SAMPLE)
+        scores = load_npz(path)
+        assert list(scores) == list(expected)
+        assert all(isinstance(column, np.memmap) for column in scores.values())
+        for name, values in expected.items():
+            assert np.array_equal(scores[name], values)
+        assert load_npz(path, [NPZ_FRAME_KEY])[NPZ_FRAME_KEY].tolist() == list(range(240))
+
+    def test_readers_dispatch_on_npz(self, tmp_path):
+        path = save_npz(str(tmp_path / 'log.npz'),
+                        _json_log(tmp_path / 'log.json', [{'a': 1.0}, {'a': 2.0}]))
+        assert list(iter_frames(path)) == [(0, {'a': 1.0}), (1, {'a': 2.0})]
+        assert load_scores(path, names=['b', 'a'])['a'].tolist() == [1.0, 2.0]
+        assert pool_log(path)['a'].mean == 1.5
+
+    def test_subsampled_frame_numbers(self, tmp_path):
+        log = tmp_path / 'log.json'
+        log.write_text('{"frames": [{"frameNum": 0, "metrics": {"a": 1.0}},'
+                       ' {"frameNum": 5, "metrics": {"a": 2.0}}]}')
+        path = save_npz(str(tmp_path / 'log.npz'), str(log))
+        assert [n for n, _ in iter_frames(path)] == [0, 5]
+
+    def test_empty_log(self, tmp_path):
+        path = save_npz(str(tmp_path / 'log.npz'), _json_log(tmp_path / 'log.json', []))
+        assert load_npz(path) == {}
+        assert len(load_npz(path, [NPZ_FRAME_KEY])[NPZ_FRAME_KEY]) == 0
+
+    def test_compressed_npz_is_read(self, tmp_path):
+        path = str(tmp_path / 'log.npz')
+        np.savez_compressed(path, a=np.arange(3.0))
+        assert load_npz(path)['a'].tolist() == [0.0, 1.0, 2.0]
+
+    def test_invalid_npz(self, tmp_path):
+        path = tmp_path / 'log.npz'
+        path.write_bytes(b'not a zip')
+        with pytest.raises(LogFormatError):
+            load_npz(str(path))
+
+    def test_failed_conversion_leaves_nothing(self, tmp_path):
+        log = tmp_path / 'log.json'
+        log.write_text('{"frames": [{"frameNum": 0, "metrics": {"a": 1.0}}, {"frameNum": 1, "metr')
+        with pytest.raises(LogFormatError):
+            save_npz(str(tmp_path / 'log.npz'), str(log))
+        assert os.listdir(tmp_path) == ['log.json']
+
+
+class TestPoolScores:
+    """pool_scores pools every column at once."""
+
+    def test_matches_running_stats_and_numpy(self):
+        other = [v / 2 for v in VALUES]
+        pooled = pool_scores({'a': np.array(VALUES), 'b': other})
+        for name, values in (('a', VALUES), ('b', other)):
+            running = RunningStats(values)
+            assert pooled[name]['mean'] == pytest.approx(running.mean)
+            assert pooled[name]['harmonic_mean'] == pytest.approx(running.harmonic_mean)
+            assert pooled[name]['min'] == running.min
+            assert pooled[name]['std'] == pytest.approx(running.std)
+            for p in (1, 5, 10):
+                assert pooled[name][f'p{p}'] == pytest.approx(np.percentile(values, p))
+
+    def test_keys_and_types(self):
+        pooled = pool_scores({'a': np.arange(100.0)})
+        assert list(pooled['a']) == ['mean', 'harmonic_mean', 'min', 'p1', 'p5', 'p10', 'std']
+        assert all(type(v) is float for v in pooled['a'].values())
+        assert pooled['a']['p10'] == pytest.approx(9.9)
+
+    def test_empty(self):
+        assert pool_scores({}) == {}
+        assert all(math.isnan(v) for v in pool_scores({'a': []})['a'].values())
@@ -0,0 +1,184 @@
+"""Tests for the consolidated probe — FFprobe.getInfo, interlace sampling and video population."""
+
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from easyvmaf import ffmpeg as ffmpeg_mod
+from easyvmaf.cache import ProbeCache
+from easyvmaf.ffmpeg import FFprobe, idet_sample, parse_idet, sample_intervals
+from easyvmaf.vmaf import vmaf, video
+
+PROBE = {
+    'streams': [{'index': 0, 'codec_type': 'video', 'width': 1920, 'height': 1080,
+                 'r_frame_rate': '25/1', 'start_time': '1.400000', 'duration': '11.400000'}],
+    'format': {'format_name': 'mpegts', 'start_time': '1.400000', 'duration': '10.000000'},
+    'frames': [{'interlaced_frame': 1, 'pkt_size': '1000'},
+               {'interlaced_frame': 1, 'pkt_size': '2000'},
+               {'interlaced_frame': 0, 'pkt_size': '500'}],
+}
+
+
+@pytest.fixture
+def ffprobe_runs(monkeypatch):
+    """Record every ffprobe cmd instead of running it."""
+    cmds = []
+
+    def run(self):
+        cmds.append(self._cmd)
+        return {k: (list(v) if isinstance(v, list) else dict(v)) for k, v in PROBE.items()}
+
+    monkeypatch.setattr(FFprobe, '_run', run)
+    return cmds
+
+
+def test_get_info_is_a_single_run(ffprobe_runs):
+    probe = FFprobe('in.ts')
+    probe.getInfo()
+    assert len(ffprobe_runs) == 1
+    cmd = ffprobe_runs[0]
+    assert {'-show_streams', '-show_format', '-show_frames'} <= set(cmd)
+    assert probe.streamInfo['width'] == 1920
+    assert probe.formatInfo['format_name'] == 'mpegts'
+    assert len(probe.framesInfo) == 3
+
+
+def test_get_info_without_frames(ffprobe_runs):
+    probe = FFprobe('in.ts')
+    probe.getInfo(frames=False)
+    assert '-show_frames' not in ffprobe_runs[0]
+    assert probe.framesInfo is None
+
+
+def test_video_is_populated_from_probe_and_interlace_sample(ffprobe_runs):
+    v = video('in.ts')
+    assert v.duration == 10.0
+    assert v.formatInfo['format_name'] == 'mpegts'
+    assert v.interlaced is True
+    assert v.interlaceConfidence == pytest.approx(1 / 3)
+    assert (v.interlacedFrames, v.totalFrames, v.bytesFramesTotal) == (2, 3, 3500)
+    assert len(ffprobe_runs) == 2, "format and interlace must not spawn more ffprobe runs"
+    info, sample = ffprobe_runs
+    assert '-show_frames' not in info
+    # Five 1s intervals centered in fifths of the file, shifted by its start_time
+    assert sample[sample.index('-read_intervals') + 1] == ','.join(
+        f'{t + 1.4:.3f}%+1.000' for t in (0.5, 2.5, 4.5, 6.5, 8.5))
+
+
+def test_probe_cache_skips_ffprobe(ffprobe_runs, tmp_path):
+    src = tmp_path / 'in.ts'
+    src.write_bytes(b'\x47' * 188)
+    cache = ProbeCache(str(tmp_path / 'cache'))
+    first = video(str(src), probe_cache=cache)
+    first.interlaced
+    second = video(str(src), probe_cache=cache)
+    assert second.streamInfo == first.streamInfo
+    assert second.interlaced is True
+    assert second.interlaceConfidence == first.interlaceConfidence
+    assert len(ffprobe_runs) == 2
+
+
+def test_vmaf_reuses_probed_videos(ffprobe_runs):
+    ref = video('ref.ts')
+    mains = [video(f'{i}.ts') for i in range(3)]
+    runs = len(ffprobe_runs)
+    pairs = [vmaf(main, ref, 'json') for main in mains]
+    assert len(ffprobe_runs) == runs, "pre-built videos must not be probed again"
+    assert all(pair.ref is ref for pair in pairs)
+    assert pairs[0].ffmpegQos.main.videoSrc == '0.ts'
+
+
+def test_interlace_detection_is_lazy(ffprobe_runs):
+    v = video('in.ts')
+    assert len(ffprobe_runs) == 1
+    assert v.interlaceConfidence == pytest.approx(1 / 3)
+    assert v.interlaced is True
+    assert len(ffprobe_runs) == 2
+
+
+def test_manual_fps_skips_interlace_detection(ffprobe_runs):
+    myVmaf = vmaf('main.ts', 'ref.ts', 'json', manual_fps=25)
+    qos = myVmaf._buildSyncQos(False, 0, 1)
+    assert any('fps=fps=25' in f for f in qos.main.filtersList)
+    assert len(ffprobe_runs) == 2, "one probe per input, no interlace sample"
+    vmaf('main.ts', 'ref.ts', 'json')._buildSyncQos(False, 0, 1)
+    assert len(ffprobe_runs) == 6
+
+
+class TestInterlaceSampling:
+    """Interlace detection samples short intervals spread across the file."""
+
+    def test_intervals_spread_across_the_file(self):
+        assert sample_intervals(100, samples=4, length=2) == [
+            (11.5, 2), (36.5, 2), (61.5, 2), (86.5, 2)]
+
+    @pytest.mark.parametrize("duration", [0.4, 3, 5], ids=["tiny", "short", "exact"])
+    def test_short_video_is_sampled_whole(self, duration):
+        assert sample_intervals(duration, samples=5, length=1) == [(0.0, max(duration, 1))]
+
+    @pytest.mark.parametrize(
+        "interlaced, progressive, expected",
+        [
+            (10, 0, (True, 1.0)),
+            (0, 10, (False, 1.0)),
+            (9, 1, (True, 0.8)),
+            (2, 8, (False, 0.6)),
+            (5, 5, (False, 0.0)),
+            (0, 0, (False, 0.0)),
+        ],
+        ids=["interlaced", "progressive", "mostly-interlaced", "slate", "tie", "empty"],
+    )
+    def test_decision_and_confidence(self, interlaced, progressive, expected):
+        v = video.__new__(video)
+        v._setInterlaceDecision(interlaced, progressive)
+        assert (v.interlaced, v.interlaceConfidence) == (expected[0], pytest.approx(expected[1]))
+
+
+IDET_STDERR = """\
+[Parsed_idet_1 @ 0x55d0] Repeated Fields: Neither:   118 Top:     1 Bottom:     1
+[Parsed_idet_1 @ 0x55d0] Single frame detection: TFF:    40 BFF:     0 Progressive:    70 Undetermined:    10
+[Parsed_idet_1 @ 0x55d0] Multi frame detection: TFF:    45 BFF:     0 Progressive:    73 Undetermined:     2
+"""
+
+
+def test_parse_idet_reads_the_multi_frame_summary():
+    assert parse_idet(IDET_STDERR) == {'tff': 45, 'bff': 0, 'progressive': 73, 'undetermined': 2}
+    assert parse_idet(IDET_STDERR * 2)['progressive'] == 146
+    assert parse_idet('') == {'tff': 0, 'bff': 0, 'progressive': 0, 'undetermined': 0}
+
+
+@pytest.fixture
+def ffmpeg_runs(monkeypatch):
+    """Record every ffmpeg cmd instead of running it; idet reports IDET_STDERR."""
+    cmds = []
+
+    def run(cmd, **kwargs):
+        cmds.append(cmd)
+        return SimpleNamespace(stderr=IDET_STDERR, returncode=0)
+
+    monkeypatch.setattr(ffmpeg_mod.subprocess, 'run', run)
+    return cmds
+
+
+def test_idet_sample_is_a_single_run(ffmpeg_runs):
+    intervals = sample_intervals(100, samples=3, length=1)
+    assert idet_sample('in.ts', intervals)['tff'] == 45
+    assert len(ffmpeg_runs) == 1
+    cmd = ffmpeg_runs[0]
+    assert cmd.count('-i') == 3
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-ss'] == ['16.167', '49.500', '82.833']
+    assert cmd[cmd.index('-filter_complex') + 1] == '[0:v:0][1:v:0][2:v:0]concat=n=3:v=1:a=0,idet'
+
+
+def test_video_with_idet(ffprobe_runs, ffmpeg_runs, tmp_path):
+    src = tmp_path / 'in.ts'
+    src.write_bytes(b'\x47' * 188)
+    cache = ProbeCache(str(tmp_path / 'cache'))
+    v = video(str(src), probe_cache=cache, idet=True)
+    assert v.interlaced is False
+    assert v.interlaceConfidence == pytest.approx(28 / 118)
+    assert (v.interlacedFrames, v.totalFrames) == (45, 120)
+    assert len(ffprobe_runs) == 1, "idet replaces the frames sample of ffprobe"
+    video(str(src), probe_cache=cache, idet=True)
+    assert (len(ffprobe_runs), len(ffmpeg_runs)) == (1, 1)
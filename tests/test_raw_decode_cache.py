@@ -0,0 +1,59 @@
+"""Tests for RawDecodeCache — one decode shared by identical ffmpeg commands."""
+
+import threading
+import time
+
+import pytest
+
+from easyvmaf.ffmpeg import FFmpegQos, RawDecodeCache
+
+
+def test_identical_commands_run_once_even_concurrently():
+    cache = RawDecodeCache()
+    calls = []
+
+    def runner(cmd):
+        calls.append(cmd)
+        time.sleep(0.05)
+        return b'frames'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.run(['ffmpeg', '-i', 'ref'], runner)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b'frames'] * 8
+    assert len(calls) == 1
+
+
+def test_different_commands_run_separately():
+    cache = RawDecodeCache()
+    assert cache.run(['a'], lambda cmd: cmd[0]) == 'a'
+    assert cache.run(['b'], lambda cmd: cmd[0]) == 'b'
+    assert len(cache) == 2
+
+
+def test_failure_is_shared():
+    cache = RawDecodeCache()
+
+    def runner(cmd):
+        raise OSError("decode failed")
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            cache.run(['x'], runner)
+
+
+def test_renditions_share_the_ref_window_command():
+    """Only the ref side is shared: its command does not depend on the distorted file."""
+    cmds = []
+    for main in ('720p.mp4', '1080p.mp4'):
+        qos = FFmpegQos(main, 'ref.mp4')
+        qos.ref.setSeek(0, 3.5)
+        qos.ref.setScaleFilter(1920, 1080)
+        qos.main.setSeek(0, 0.5)
+        cmds.append((qos._commitRawInput(qos.main, 'yuv420p'), qos._commitRawInput(qos.ref, 'yuv420p')))
+    assert cmds[0][1] == cmds[1][1]
+    assert cmds[0][0] != cmds[1][0]
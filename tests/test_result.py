@@ -0,0 +1,134 @@
+"""Tests for easyvmaf.result — VmafResult and its lazy log parsing."""
+
+import csv
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from easyvmaf import result as result_mod
+from easyvmaf.logs import LogFormatError, load_scores, save_npz
+from easyvmaf.result import VmafResult, model_names
+from easyvmaf.vmaf import vmaf
+
+SAMPLES = os.path.join(os.path.dirname(__file__), '..', 'video_samples')
+XML_SAMPLE = os.path.join(SAMPLES, 'BBB_sampleA_distorted_vmaf.xml')
+
+HD_NAMES = ['vmaf_hd', 'vmaf_hd_neg', 'vmaf_hd_phone']
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the log parses of VmafResult, by kind."""
+    counts = {'load': 0, 'stream': 0}
+
+    def counted(kind, func):
+        def wrapper(*args, **kwargs):
+            counts[kind] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(result_mod, 'load_model_scores', counted('load', result_mod.load_model_scores))
+    monkeypatch.setattr(result_mod, 'pool_log', counted('stream', result_mod.pool_log))
+    return counts
+
+
+def test_model_names():
+    assert model_names('HD') == HD_NAMES
+    assert model_names('4K') == ['vmaf_4k']
+
+
+def test_xml_sample():
+    result = VmafResult(XML_SAMPLE, 'xml', 'HD')
+    assert list(result.scores) == HD_NAMES + ['psnr_y', 'psnr_cb', 'psnr_cr', 'cambi']
+    assert result.frames == 240
+    assert result.scores['vmaf_hd'][0] == pytest.approx(92.623535)
+    assert result.pooled['vmaf_hd']['mean'] == pytest.approx(result.means['vmaf_hd'])
+
+
+@pytest.mark.parametrize("output_fmt", ["json", "csv"])
+def test_json_and_csv(tmp_path, output_fmt):
+    frames = [{'vmaf_4k': 80.0 + i, 'psnr_y': 40.0} for i in range(3)]
+    path = tmp_path / f'log.{output_fmt}'
+    if output_fmt == 'json':
+        path.write_text(json.dumps({'frames': [{'frameNum': i, 'metrics': f}
+                                               for i, f in enumerate(frames)]}))
+    else:
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['vmaf_4k', 'psnr_y'])
+            writer.writeheader()
+            writer.writerows(frames)
+    result = VmafResult(str(path), output_fmt, '4K')
+    assert list(result.scores) == ['vmaf_4k', 'psnr_y']
+    assert result.scores['vmaf_4k'].tolist() == [80.0, 81.0, 82.0]
+
+
+def test_log_without_model_scores(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text('Frame,psnr_y\n0,40.0\n')
+    result = VmafResult(str(path), 'csv', '4K')
+    with pytest.raises(LogFormatError, match='vmaf_4k'):
+        result.scores
+    with pytest.raises(LogFormatError, match='vmaf_4k'):
+        result.means
+
+
+class TestLazyParsing:
+    """The log is parsed on first access only, and only once."""
+
+    def test_nothing_is_parsed_up_front(self, parses):
+        result = VmafResult('missing.json', 'json', 'HD', offset=0.5, returncode=0)
+        assert (result.log_path, result.offset, result.ok) == ('missing.json', 0.5, True)
+        assert parses == {'load': 0, 'stream': 0}
+
+    def test_scores_are_parsed_once(self, parses):
+        result = VmafResult(XML_SAMPLE, 'xml', 'HD')
+        result.scores, result.pooled, result.frames, result.means
+        assert parses == {'load': 1, 'stream': 0}
+
+    def test_means_alone_never_load_the_frames(self, parses):
+        result = VmafResult(XML_SAMPLE, 'xml', 'HD')
+        result.means, result.means
+        assert parses == {'load': 0, 'stream': 1}
+        assert result.means['vmaf_hd'] == pytest.approx(
+            float(VmafResult(XML_SAMPLE, 'xml', 'HD').scores['vmaf_hd'].mean()))
+
+    def test_npz_is_mapped_not_streamed(self, parses, tmp_path):
+        path = save_npz(str(tmp_path / 'd_vmaf.npz'), XML_SAMPLE)
+        result = VmafResult(path, 'npz', 'HD')
+        assert result.means['vmaf_hd'] == pytest.approx(
+            float(load_scores(XML_SAMPLE, names=['vmaf_hd'])['vmaf_hd'].mean()))
+        assert parses == {'load': 1, 'stream': 0}
+        assert list(result.scores) == HD_NAMES + ['psnr_y', 'psnr_cb', 'psnr_cr', 'cambi']
+
+    def test_parse_time_is_recorded(self):
+        result = VmafResult(XML_SAMPLE, 'xml', 'HD', timings={'vmaf': 12.0})
+        result.pooled
+        assert result.timings['vmaf'] == 12.0
+        assert {'parse', 'pool'} <= set(result.timings)
+
+
+@pytest.mark.parametrize(
+    "process, returncode",
+    [
+        (SimpleNamespace(returncode=0), 0),
+        (SimpleNamespace(returncode=1), 1),
+        (SimpleNamespace(process=SimpleNamespace(returncode=0)), 0),
+    ],
+    ids=["popen", "failed", "ffmpeg-progress"],
+)
+def test_vmaf_result_of_a_run(process, returncode):
+    obj = vmaf.__new__(vmaf)
+    obj.ffmpegQos = SimpleNamespace(vmafpath='d_vmaf.xml', vmaf_cambi_heatmap_path='d_cambi_heatmap',
+                                    main=SimpleNamespace(filtersList=['[0:v]yadif=1:-1:0[main1]']))
+    obj.main = SimpleNamespace(streamInfo={'r_frame_rate': '25/1'})
+    obj.output_fmt, obj.model, obj.offset, obj.cambi_heatmap = 'xml', '4K', -1.5, False
+    obj.timings = {'probe': 1.0}
+    result = obj._result(process)
+    assert (result.log_path, result.output_fmt, result.model, result.offset) == (
+        'd_vmaf.xml', 'xml', '4K', -1.5)
+    assert result.returncode == returncode and result.ok == (returncode == 0)
+    assert result.cambi_heatmap_path is None
+    assert (result.fps, result.start) == (50.0, 1.5)
+    assert result.timings == {'probe': 1.0} and result.timings is not obj.timings
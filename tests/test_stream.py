@@ -0,0 +1,102 @@
+"""Tests for vmaf.iterVmaf() / getVmaf(on_frame=...) — per-frame scores streamed chunk by chunk."""
+
+import json
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from easyvmaf.logs import LogFormatError
+from easyvmaf.result import VmafFrame
+from easyvmaf.vmaf import vmaf
+
+
+class FakeQos:
+    """Stands for the FFmpegQos of a chunk: writes a libvmaf log of 2 frames per second."""
+
+    def __init__(self, mainStart, refStart, duration, returncode=0):
+        self.seek = (mainStart, refStart, duration)
+        self.returncode = returncode
+        self._cmd = ['ffmpeg']
+
+    def getVmaf(self, log_path, **kwargs):
+        frames = [{'frameNum': i, 'metrics': {'vmaf_4k': self.seek[0] * 10 + i, 'psnr_y': 40.0}}
+                  for i in range(round(self.seek[2] * 2))]
+        with open(log_path, 'w') as f:
+            if self.returncode == 0:
+                json.dump({'frames': frames}, f)
+        return SimpleNamespace(returncode=self.returncode)
+
+
+def _vmaf(monkeypatch, offset=0, main_duration=5.0, ref_duration=10.0, returncode=0):
+    obj = vmaf.__new__(vmaf)
+    obj.main = SimpleNamespace(duration=main_duration)
+    obj.ref = SimpleNamespace(duration=ref_duration)
+    obj.offset, obj.output_fmt, obj.model = offset, 'json', '4K'
+    obj.subsample, obj.threads, obj.end_sync, obj.features, obj.gpu_mode = 1, 0, False, None, False
+    obj.timings = {}
+    obj.qos = []
+
+    def segmentQos(mainStart, refStart, duration):
+        obj.qos.append(FakeQos(mainStart, refStart, duration, returncode))
+        return obj.qos[-1]
+
+    monkeypatch.setattr(obj, '_prepareVmaf', lambda autoSync=False: None, raising=False)
+    monkeypatch.setattr(obj, '_segmentQos', segmentQos, raising=False)
+    return obj
+
+
+class TestIterVmaf:
+    """iterVmaf() yields every frame of every chunk, with running stats."""
+
+    def test_chunks_and_frames(self, monkeypatch):
+        obj = _vmaf(monkeypatch)
+        frames = list(obj.iterVmaf(chunk=2))
+        assert [qos.seek for qos in obj.qos] == [(0, 0, 2), (2, 2, 2), (4, 4, 1.0)]
+        assert [f.frameNum for f in frames] == list(range(10))
+        assert [f.chunk for f in frames] == [0] * 4 + [1] * 4 + [2] * 2
+        assert frames[4].metrics == {'vmaf_4k': 20.0, 'psnr_y': 40.0}
+        assert 'vmaf' in obj.timings
+
+    def test_running_stats(self, monkeypatch):
+        obj = _vmaf(monkeypatch)
+        seen = []
+        for frame in obj.iterVmaf(chunk=2):
+            seen.append(frame.metrics['vmaf_4k'])
+            assert frame.stats['vmaf_4k'].count == len(seen)
+            assert frame.stats['vmaf_4k'].mean == pytest.approx(sum(seen) / len(seen))
+
+    @pytest.mark.parametrize(
+        "offset, seeks",
+        [(1.5, [(0, 1.5, 3), (3, 4.5, 2.0)]), (-1.5, [(1.5, 0, 3), (4.5, 3, 0.5)])],
+        ids=["ref-delayed", "main-delayed"],
+    )
+    def test_offset(self, monkeypatch, offset, seeks):
+        obj = _vmaf(monkeypatch, offset=offset)
+        list(obj.iterVmaf(chunk=3))
+        assert [qos.seek for qos in obj.qos] == seeks
+
+    def test_failed_chunk(self, monkeypatch):
+        obj = _vmaf(monkeypatch, returncode=1)
+        with pytest.raises(subprocess.CalledProcessError):
+            list(obj.iterVmaf(chunk=2))
+
+
+class TestGetVmafOnFrame:
+    """getVmaf(on_frame=...) streams the frames and returns them as a VmafResult."""
+
+    def test_callback_and_result(self, monkeypatch):
+        obj = _vmaf(monkeypatch)
+        frames = []
+        result = obj.getVmaf(on_frame=frames.append, chunk=2)
+        assert len(frames) == 10 and all(isinstance(f, VmafFrame) for f in frames)
+        assert result.ok and result.log_path is None
+        assert result.scores['vmaf_4k'].tolist() == [f.metrics['vmaf_4k'] for f in frames]
+        assert result.means['vmaf_4k'] == pytest.approx(frames[-1].stats['vmaf_4k'].mean)
+
+    def test_failed_run(self, monkeypatch):
+        obj = _vmaf(monkeypatch, returncode=1)
+        result = obj.getVmaf(on_frame=lambda frame: None, chunk=2)
+        assert not result.ok
+        with pytest.raises(LogFormatError):
+            result.scores
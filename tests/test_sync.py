@@ -0,0 +1,494 @@
+"""Tests for easyvmaf.sync — single-decode sync engines."""
+
+import math
+import subprocess
+import threading
+import time
+from fractions import Fraction
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from easyvmaf.sync import (
+    PTS_WRAP_SECONDS, bisect_boundary, coarse_to_fine, confident_match, default_stride,
+    fold_offset, frame_signatures, group_anchors, mse_to_psnr, read_y4m, sliding_mse,
+    timecode_to_seconds, xcorr_lag,
+)
+from easyvmaf import ffmpeg as ffmpeg_mod
+from easyvmaf.ffmpeg import FFmpegQos
+from easyvmaf.vmaf import SYNC_ANCHOR_PROXY, _SyncAbort, vmaf
+
+
+def _y4m(frames, width, height, header_extra=b' F30000:1001 Ip A1:1 C420jpeg'):
+    """Serialize (n, frame_bytes) uint8 frames the way ffmpeg's yuv4mpegpipe muxer does."""
+    out = b'YUV4MPEG2 W%d H%d' % (width, height) + header_extra + b'\n'
+    for frame in frames:
+        out += b'FRAME\n' + frame.tobytes()
+    return out
+
+
+def _brute_force_mse(main, ref):
+    """Reference implementation: one explicit comparison per candidate."""
+    out = []
+    for k in range(len(ref)):
+        n = min(len(main), len(ref) - k)
+        diff = main[:n].astype(np.int64) - ref[k:k + n].astype(np.int64)
+        out.append((diff ** 2).mean())
+    return np.array(out)
+
+
+class TestReadY4m:
+    """read_y4m parses ffmpeg's yuv4mpegpipe output into a frame matrix."""
+
+    def test_yuv420_round_trip(self):
+        rng = np.random.default_rng(0)
+        frames = rng.integers(0, 256, size=(4, 6 * 4 * 3 // 2), dtype=np.uint8)
+        parsed, width, height, fps = read_y4m(_y4m(frames, 6, 4))
+        assert (width, height) == (6, 4)
+        assert fps == pytest.approx(30000 / 1001)
+        np.testing.assert_array_equal(parsed, frames)
+
+    def test_odd_dimensions_round_chroma_up(self):
+        frames = np.zeros((2, 5 * 3 + 2 * 3 * 2), dtype=np.uint8)
+        parsed, _, _, _ = read_y4m(_y4m(frames, 5, 3))
+        assert parsed.shape == frames.shape
+
+    def test_mono(self):
+        frames = np.arange(2 * 8, dtype=np.uint8).reshape(2, 8)
+        parsed, _, _, _ = read_y4m(_y4m(frames, 4, 2, b' F25:1 Cmono'))
+        np.testing.assert_array_equal(parsed, frames)
+
+    def test_empty_stream(self):
+        parsed, _, _, _ = read_y4m(b'YUV4MPEG2 W4 H2 F25:1 Cmono\n')
+        assert parsed.shape == (0, 8)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b'not a y4m stream',
+            b'YUV4MPEG2 W4 H2 F25:1 Cmono\nFRAME\n\x00\x00',
+            b'YUV4MPEG2 W4 H2 F25:1 Cmono\nFRAMX\n' + bytes(8),
+            b'YUV4MPEG2 W4 H2 F25:1 C420p10\nFRAME\n' + bytes(24),
+        ],
+        ids=["no-magic", "truncated", "bad-frame-tag", "high-bit-depth"],
+    )
+    def test_rejects_malformed(self, data):
+        with pytest.raises(ValueError):
+            read_y4m(data)
+
+
+class TestSlidingMse:
+    """sliding_mse scores every candidate offset in one pass."""
+
+    @pytest.mark.parametrize("chunk_bytes", [64, 1 << 20], ids=["chunked", "single-chunk"])
+    def test_matches_brute_force(self, chunk_bytes):
+        rng = np.random.default_rng(1)
+        ref = rng.integers(0, 256, size=(12, 48), dtype=np.uint8)
+        main = rng.integers(0, 256, size=(4, 48), dtype=np.uint8)
+        np.testing.assert_allclose(
+            sliding_mse(main, ref, chunk_bytes=chunk_bytes),
+            _brute_force_mse(main, ref),
+        )
+
+    def test_exact_match_is_zero(self):
+        """A perfect match must give MSE 0 (PSNR inf), as ffmpeg's psnr filter does."""
+        rng = np.random.default_rng(2)
+        ref = rng.integers(0, 256, size=(20, 300), dtype=np.uint8)
+        main = ref[7:11].copy()
+        mse = sliding_mse(main, ref)
+        assert mse[7] == 0.0
+        assert int(np.argmin(mse)) == 7
+        assert np.isinf(mse_to_psnr(mse)[7])
+
+    def test_main_longer_than_ref(self):
+        rng = np.random.default_rng(3)
+        ref = rng.integers(0, 256, size=(3, 16), dtype=np.uint8)
+        main = rng.integers(0, 256, size=(5, 16), dtype=np.uint8)
+        np.testing.assert_allclose(sliding_mse(main, ref), _brute_force_mse(main, ref))
+
+    def test_frame_size_mismatch(self):
+        with pytest.raises(ValueError):
+            sliding_mse(np.zeros((2, 8)), np.zeros((4, 9)))
+
+
+def test_mse_to_psnr():
+    np.testing.assert_allclose(mse_to_psnr([255.0 ** 2, 255.0 ** 2 / 100]), [0.0, 20.0])
+
+
+class TestConfidentMatch:
+    """confident_match decides when a sync search may stop early."""
+
+    @pytest.mark.parametrize(
+        "psnrs, stop_psnr, stop_margin, expected",
+        [
+            ([30, 31], None, None, False),
+            ([30, 52], 50, None, True),
+            ([30, 49], 50, None, False),
+            ([30, math.inf], 50, None, True),
+            ([30, 31, 29, 45], None, 10, True),
+            ([30, 31, 45], None, 10, False),
+            ([30, 31, 29, 38], None, 10, False),
+            ([None, None, 30, math.inf], None, 10, False),
+            ([29, 30, 31, None, math.inf], None, 10, True),
+            ([], 50, 10, False),
+        ],
+        ids=["disabled", "threshold", "below-threshold", "inf", "margin", "margin-too-few",
+             "margin-too-small", "none-ignored", "margin-inf", "empty"],
+    )
+    def test_rules(self, psnrs, stop_psnr, stop_margin, expected):
+        assert confident_match(psnrs, stop_psnr, stop_margin) is expected
+
+
+class TestCoarseToFine:
+    """coarse_to_fine finds the exhaustive optimum with far fewer evaluations."""
+
+    @staticmethod
+    def _psnr_curve(n, match, seed=0):
+        """PSNR-like curve: sharp peak at `match` on top of a correlation basin and noise."""
+        rng = np.random.default_rng(seed)
+        distance = np.abs(np.arange(n) - match)
+        return 25 + 10 * np.exp(-distance / 6) + rng.normal(0, 0.3, n) + 15 * (distance == 0)
+
+    @pytest.mark.parametrize("n, match", [(180, 0), (180, 97), (180, 179), (1800, 1234)])
+    def test_matches_exhaustive(self, n, match):
+        curve = self._psnr_curve(n, match)
+        calls = []
+
+        def evaluate(indices):
+            calls.append(len(indices))
+            return {i: curve[i] for i in indices}
+
+        scores = coarse_to_fine(n, evaluate)
+        assert max(scores, key=scores.get) == int(np.argmax(curve))
+        assert len(scores) < n / 4
+        assert sum(calls) == len(scores), "no index may be evaluated twice"
+
+    def test_stride_one_is_exhaustive(self):
+        scores = coarse_to_fine(10, lambda idx: {i: -i for i in idx}, stride=1)
+        assert sorted(scores) == list(range(10))
+
+    @pytest.mark.parametrize("n, expected", [(1, 1), (3, 1), (16, 4), (180, 8), (1800, 8)])
+    def test_default_stride(self, n, expected):
+        assert default_stride(n) == expected
+
+
+class TestXcorrLag:
+    """xcorr_lag finds where an audio excerpt sits inside a longer window."""
+
+    @pytest.mark.parametrize("lag", [0, 1, 5003, 16000])
+    def test_finds_lag_despite_gain_and_noise(self, lag):
+        rng = np.random.default_rng(4)
+        signal = rng.normal(0, 1, 24000)
+        template = 0.3 * signal[lag:lag + 8000] + rng.normal(0, 0.05, 8000)
+        found, score = xcorr_lag(template, signal)
+        assert found == lag
+        assert score > 0.9
+
+    def test_not_fooled_by_loud_passage(self):
+        """Normalization must keep a loud unrelated section from winning."""
+        rng = np.random.default_rng(5)
+        signal = rng.normal(0, 1, 20000)
+        signal[12000:16000] *= 50
+        template = signal[3000:7000].copy()
+        assert xcorr_lag(template, signal)[0] == 3000
+
+    def test_silent_signal_scores_zero(self):
+        lag, score = xcorr_lag(np.ones(10), np.zeros(100))
+        assert score == 0.0
+
+    def test_template_longer_than_signal(self):
+        with pytest.raises(ValueError):
+            xcorr_lag(np.zeros(10), np.zeros(5))
+
+
+class TestFrameSignatures:
+    """frame_signatures make fingerprint matching robust to level changes."""
+
+    def test_invariant_to_brightness_and_contrast(self):
+        rng = np.random.default_rng(6)
+        frames = rng.integers(20, 200, size=(3, 576)).astype(np.float64)
+        np.testing.assert_allclose(frame_signatures(frames),
+                                   frame_signatures(0.8 * frames + 30))
+
+    def test_flat_frame_is_zero(self):
+        assert not frame_signatures(np.full((1, 16), 16, dtype=np.uint8)).any()
+
+    def test_long_window_match(self):
+        """A re-leveled, noisy excerpt is found in a ~5 minute window of 30 fps thumbnails."""
+        rng = np.random.default_rng(7)
+        # Smooth random "video": thumbnails drift slowly from frame to frame
+        steps = rng.normal(0, 4, size=(9000, 576))
+        ref = np.clip(128 + np.cumsum(steps, axis=0) % 200 - 100, 0, 255)
+        main = 0.9 * ref[4321:4321 + 150] + 10 + rng.normal(0, 2, size=(150, 576))
+        distance = sliding_mse(frame_signatures(main), frame_signatures(ref))
+        assert int(np.argmin(distance[:len(ref) - len(main) + 1])) == 4321
+
+
+class TestTimecode:
+    """timecode_to_seconds handles non-drop and drop-frame SMPTE timecodes."""
+
+    @pytest.mark.parametrize(
+        "timecode, fps, frames",
+        [
+            ("00:00:01:00", 25, 25),
+            ("01:00:00:00", 25, 90000),
+            ("00:00:10:12", 24000 / 1001, 252),
+            ("00:01:00;02", 30000 / 1001, 1800),
+            ("00:10:00;00", 30000 / 1001, 17982),
+            ("01:00:00;00", 30000 / 1001, 107892),
+            ("00:01:00;04", 60000 / 1001, 3600),
+        ],
+        ids=["25", "25-hour", "23.976-ndf", "29.97-df-minute", "29.97-df-tenth", "29.97-df-hour",
+             "59.94-df"],
+    )
+    def test_frame_number(self, timecode, fps, frames):
+        assert timecode_to_seconds(timecode, fps) == pytest.approx(frames / fps)
+
+    @pytest.mark.parametrize("timecode", ["", "10:00:00", "00:61:00:00", "00:00:00:25", "aa:bb:cc:dd"])
+    def test_rejects_invalid(self, timecode):
+        with pytest.raises(ValueError):
+            timecode_to_seconds(timecode, 25)
+
+
+@pytest.mark.parametrize(
+    "delta, expected",
+    [(1.5, 1.5), (-1.5, -1.5), (PTS_WRAP_SECONDS - 2, -2), (2 - PTS_WRAP_SECONDS, 2)],
+    ids=["positive", "negative", "main-wrapped", "ref-wrapped"],
+)
+def test_fold_offset(delta, expected):
+    assert fold_offset(delta, PTS_WRAP_SECONDS) == pytest.approx(expected)
+
+
+class TestTimestampSync:
+    """vmaf._syncTimestamp derives the offset from metadata only."""
+
+    @staticmethod
+    def _video(duration=60, timecode=None, start_pts=None, format_name='mov,mp4,m4a'):
+        stream = {'r_frame_rate': '25/1', 'time_base': '1/90000'}
+        if timecode:
+            stream['tags'] = {'timecode': timecode}
+        if start_pts is not None:
+            stream['start_pts'] = start_pts
+        return SimpleNamespace(
+            streamInfo=stream, formatInfo={'format_name': format_name}, duration=duration,
+            getTimecode=lambda: timecode,
+            getStartPts=lambda: None if start_pts is None else (start_pts, Fraction(1, 90000)))
+
+    @staticmethod
+    def _vmaf(main, ref):
+        obj = vmaf.__new__(vmaf)
+        obj.main, obj.ref = main, ref
+        return obj
+
+    def test_timecode(self):
+        sync = self._vmaf(self._video(timecode="10:00:02:05"), self._video(timecode="10:00:00:00"))
+        assert sync._syncTimestamp() == (pytest.approx(2.2), 'timecode')
+
+    def test_timecode_across_midnight(self):
+        sync = self._vmaf(self._video(timecode="00:00:01:00"), self._video(timecode="23:59:59:00"))
+        assert sync._syncTimestamp() == (pytest.approx(2.0), 'timecode')
+
+    def test_mpegts_pts_with_wrap(self):
+        sync = self._vmaf(self._video(start_pts=45000, format_name='mpegts'),
+                          self._video(start_pts=2 ** 33 - 90000, format_name='mpegts'))
+        assert sync._syncTimestamp() == (pytest.approx(1.5), 'pts')
+
+    def test_pts_ignored_outside_mpegts(self):
+        sync = self._vmaf(self._video(start_pts=0), self._video(start_pts=90000))
+        offset, _ = sync._syncTimestamp()
+        assert offset is None
+
+    def test_disagreeing_sources(self):
+        sync = self._vmaf(
+            self._video(timecode="00:00:02:00", start_pts=90000, format_name='mpegts'),
+            self._video(timecode="00:00:00:00", start_pts=0, format_name='mpegts'))
+        offset, reason = sync._syncTimestamp()
+        assert offset is None
+        assert 'disagree' in reason
+
+    def test_no_overlap(self):
+        sync = self._vmaf(self._video(duration=10, timecode="00:00:00:00"),
+                          self._video(duration=10, timecode="00:00:30:00"))
+        offset, reason = sync._syncTimestamp()
+        assert offset is None
+        assert 'overlap' in reason
+
+
+class TestEarlyStop:
+    """vmaf._syncPerOffset stops on a confident match and kills the runs in flight."""
+
+    class _FakeQos:
+        """Stands in for FFmpegQos: a psnr 'run' that blocks until killed, unless it is fast."""
+
+        def __init__(self, psnr, fast):
+            self.psnr, self.fast = psnr, fast
+            self.killed = threading.Event()
+
+        def getPsnr(self, abort=None):
+            if not self.fast and self.killed.wait(timeout=30):
+                raise subprocess.CalledProcessError(-9, 'ffmpeg')
+            return self.psnr
+
+        def kill(self):
+            self.killed.set()
+
+    def _vmaf(self, curve, fast):
+        obj = vmaf.__new__(vmaf)
+        obj.threads = 4
+        obj.built = []
+
+        def build(reverse, refStart, refDuration, proxy=None):
+            qos = self._FakeQos(curve[refStart], refStart in fast)
+            obj.built.append(qos)
+            return qos
+
+        obj._buildSyncQos = build
+        return obj
+
+    def test_stops_and_kills_workers(self):
+        offsets = list(range(40))
+        curve = {o: 30.0 for o in offsets}
+        curve[2] = math.inf
+        sync = self._vmaf(curve, fast={0, 1, 2})
+        results = sync._syncPerOffset(offsets, False, stop_psnr=50)
+        assert max(results, key=lambda r: r[1]) == (2, math.inf)
+        assert len(results) < len(offsets)
+        assert len(sync.built) < len(offsets), "pending offsets must be cancelled"
+        assert all(q.killed.is_set() for q in sync.built if not q.fast)
+
+    def test_abort_before_the_process_exists(self, monkeypatch):
+        """An abort() between register() and the Popen of getPsnr() still kills the run."""
+        class FakePopen:
+            def __init__(self, cmd, **kwargs):
+                self.returncode = None
+
+            def poll(self):
+                return self.returncode
+
+            def kill(self):
+                self.returncode = -9
+
+            def communicate(self):
+                if self.returncode is None:
+                    raise AssertionError("ffmpeg was left running after the abort")
+                return b'', None
+
+        monkeypatch.setattr(ffmpeg_mod.subprocess, 'Popen', FakePopen)
+        abort = _SyncAbort()
+        qos = FFmpegQos('main.mp4', 'ref.mp4')
+        assert abort.register(qos)
+        abort.abort()  # qos has no process yet: nothing to kill
+        with pytest.raises(subprocess.CalledProcessError):
+            qos.getPsnr(abort=abort.event)
+        assert not abort.register(FFmpegQos('main.mp4', 'ref.mp4'))
+
+    def test_no_criteria_runs_everything(self):
+        offsets = list(range(6))
+        sync = self._vmaf({o: 30.0 + o for o in offsets}, fast=set(offsets))
+        assert sorted(sync._syncPerOffset(offsets, False)) == [(o, 30.0 + o) for o in offsets]
+
+
+class TestAnchors:
+    """group_anchors and bisect_boundary split a file into constant-offset segments."""
+
+    @pytest.mark.parametrize(
+        "offsets, expected",
+        [
+            ([0.7, 0.7, 0.71, 0.7], [(0, 3)]),
+            ([0.7, 0.7, 30.7, 30.7], [(0, 1), (2, 3)]),
+            ([0.0, 0.04, 0.08, 0.12], [(0, 0), (1, 1), (2, 2), (3, 3)]),
+            ([], []),
+        ],
+        ids=["steady", "splice", "drift", "empty"],
+    )
+    def test_group_anchors(self, offsets, expected):
+        assert group_anchors(offsets, tolerance=0.02) == expected
+
+    def test_bisect_boundary(self):
+        probes = []
+
+        def classify(t):
+            probes.append(t)
+            return 0 if t < 1234.5 else 1
+
+        assert bisect_boundary(0, 3600, classify, resolution=1) == pytest.approx(1234.5, abs=0.5)
+        assert len(probes) == 12
+
+    def test_bisect_stops_on_unknown_offset(self):
+        assert bisect_boundary(0, 100, lambda t: None, resolution=1) == 50
+
+
+class TestSyncAnchors:
+    """vmaf.syncAnchors turns anchor measurements into VMAF segments."""
+
+    @staticmethod
+    def _vmaf(offset_at, base=0.5, duration=600):
+        obj = vmaf.__new__(vmaf)
+        stream = {'r_frame_rate': '25/1'}
+        obj.main = SimpleNamespace(duration=duration, streamInfo=stream)
+        obj.ref = SimpleNamespace(duration=duration + 20, streamInfo=stream)
+        obj.offset = base
+        obj.threads = 4
+        obj.timings = {}
+        obj.target_resolution = [1920, 1080]
+        obj.proxies = []
+
+        def sync_at(mainStart, refStart, refDuration, proxy=None):
+            obj.proxies.append(proxy)
+            return offset_at(mainStart), 50.0
+
+        obj._syncAt = sync_at
+        return obj
+
+    def test_constant_offset_is_one_segment(self):
+        sync = self._vmaf(lambda t: 0.5)
+        assert sync.syncAnchors(anchors=5) == [
+            {'start': 0.0, 'duration': pytest.approx(600), 'offset': 0.5}]
+        assert len(sync.anchors) == 5
+
+    def test_splice_is_split_at_the_change_point(self):
+        sync = self._vmaf(lambda t: 0.5 if t < 321.3 else 30.5)
+        first, second = sync.syncAnchors(anchors=4)
+        assert first['offset'] == 0.5 and second['offset'] == 30.5
+        assert first['start'] == 0.0
+        assert first['start'] + first['duration'] == pytest.approx(321.3, abs=1)
+        assert second['start'] == first['start'] + first['duration']
+        # ref ends at 620 s: the last segment stops where ref runs out
+        assert second['start'] + second['duration'] == pytest.approx(620 - 30.5)
+
+    def test_needs_two_anchors(self):
+        with pytest.raises(ValueError):
+            self._vmaf(lambda t: 0.5).syncAnchors(anchors=1)
+
+    def test_measured_on_a_proxy_by_default(self):
+        sync = self._vmaf(lambda t: 0.5)
+        sync.syncAnchors(anchors=3)
+        assert set(sync.proxies) == {SYNC_ANCHOR_PROXY}
+        sync = self._vmaf(lambda t: 0.5)
+        sync.syncAnchors(anchors=3, proxy=480)
+        assert set(sync.proxies) == {480}
+
+    @pytest.mark.parametrize(
+        "syncWindow, proxy, expected",
+        [(3, 240, 4), (10, 1080, 1), (600, 240, 1)],
+        ids=["small-window", "full-resolution", "long-window"],
+    )
+    def test_workers_bounded_by_memory(self, monkeypatch, syncWindow, proxy, expected):
+        sync = self._vmaf(lambda t: 0.5)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def sync_at(mainStart, refStart, refDuration, proxy=None):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return 0.5, 50.0
+
+        sync._syncAt = sync_at
+        sync.syncAnchors(anchors=8, syncWindow=syncWindow, proxy=proxy)
+        assert min(4, sync._anchorWorkers(syncWindow, proxy)) == expected
+        assert peak[0] <= expected
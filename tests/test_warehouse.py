@@ -0,0 +1,155 @@
+"""Tests for easyvmaf.warehouse — the SQLite results store and its query CLI."""
+
+import json
+import os
+
+import pytest
+
+from easyvmaf import warehouse
+from easyvmaf.cli import _build_result
+from easyvmaf.warehouse import ResultStore, default_store_path
+
+DAY = 24 * 3600
+
+
+def run(distorted, vmaf_hd, model='HD', offset=0.5, reference='ref.mp4'):
+    scores = {'vmaf_hd': vmaf_hd, 'vmaf_hd_neg': vmaf_hd - 1, 'vmaf_hd_phone': vmaf_hd + 1}
+    if model == '4K':
+        scores = {'vmaf_4k': vmaf_hd}
+    return _build_result(distorted, reference, offset, 48.5, model, vmaf_scores=scores,
+                         vmaf_output_file=f'{distorted}_vmaf.json', sync_method='psnr',
+                         pooled={name: {'mean': v, 'min': v - 10} for name, v in scores.items()})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'db' / 'results.sqlite'))
+
+
+def test_default_store_path(monkeypatch, tmp_path):
+    monkeypatch.delenv('EASYVMAF_RESULTS_DB', raising=False)
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    assert default_store_path() == os.path.join(str(tmp_path), 'easyvmaf', 'results.sqlite')
+    monkeypatch.setenv('EASYVMAF_RESULTS_DB', '/data/vmaf.sqlite')
+    assert default_store_path() == '/data/vmaf.sqlite'
+
+
+class TestAdd:
+    """add() flattens a _build_result dict into one run."""
+
+    def test_vmaf_run(self, store):
+        run_id = store.add(run('a.mp4', 90.0), params={'subsample': 1},
+                           timings={'vmaf': 12.5}, created=1000.0)
+        assert len(store) == 1
+        [row] = store.query()
+        assert row['id'] == run_id
+        assert (row['distorted'], row['reference']) == (os.path.abspath('a.mp4'),
+                                                         os.path.abspath('ref.mp4'))
+        assert (row['model'], row['vmaf'], row['offset'], row['psnr'], row['sync_method']) == (
+            'HD', 90.0, 0.5, 48.5, 'psnr')
+        assert row['scores'] == {'vmaf_hd': 90.0, 'vmaf_hd_neg': 89.0, 'vmaf_hd_phone': 91.0}
+        assert row['pooled']['vmaf_hd'] == {'mean': 90.0, 'min': 80.0}
+        assert row['output_file'] == 'a.mp4_vmaf.json'
+        assert (row['params'], row['timings'], row['created']) == (
+            {'subsample': 1}, {'vmaf': 12.5}, 1000.0)
+
+    def test_sync_only_run(self, store):
+        result = _build_result('a.mp4', 'ref.mp4', 0.7, 45.0, '4K', sync_method='vectorized',
+                               anchors=[{'time': 0.0, 'offset': 0.7, 'psnr': 45.0}])
+        store.add(result, params={'model': '4K'})
+        [row] = store.query()
+        assert (row['model'], row['vmaf'], row['scores'], row['pooled']) == ('4K', None, None, None)
+        assert row['sync'] == {'anchors': [{'time': 0.0, 'offset': 0.7, 'psnr': 45.0}]}
+
+    def test_4k_model_score(self, store):
+        store.add(run('a.mp4', 80.0, model='4K'))
+        assert store.query()[0]['vmaf'] == 80.0
+
+
+class TestQuery:
+    """query() filters on the indexed columns, newest first."""
+
+    @pytest.fixture
+    def history(self, store):
+        for day, (distorted, score, model) in enumerate([
+                ('ep01_360p.mp4', 70.0, 'HD'), ('ep01_720p.mp4', 85.0, 'HD'),
+                ('ep01_360p.mp4', 72.0, 'HD'), ('ep02_360p.mp4', 60.0, 'HD'),
+                ('ep01_720p.mp4', 84.0, '4K')]):
+            reference = 'ep02.mp4' if distorted.startswith('ep02') else 'ep01.mp4'
+            store.add(run(distorted, score, model, reference=reference), created=day * DAY)
+        return store
+
+    @pytest.mark.parametrize(
+        "filters, expected",
+        [
+            ({}, [84.0, 60.0, 72.0, 85.0, 70.0]),
+            ({'distorted': 'ep01_360p.mp4'}, [72.0, 70.0]),
+            ({'distorted': '*_360p.mp4'}, [60.0, 72.0, 70.0]),
+            ({'reference': 'ep02.mp4'}, [60.0]),
+            ({'model': '4K'}, [84.0]),
+            ({'since': 2 * DAY, 'until': 4 * DAY}, [60.0, 72.0]),
+            ({'limit': 2}, [84.0, 60.0]),
+        ],
+        ids=["all", "distorted", "glob", "reference", "model", "dates", "limit"],
+    )
+    def test_filters(self, history, filters, expected):
+        assert [row['vmaf'] for row in history.query(**filters)] == expected
+
+    def test_iso_dates(self, store):
+        store.add(run('a.mp4', 90.0), created=0.0)
+        assert store.query(since='1970-01-03') == []
+
+    def test_latest_per_rendition(self, history):
+        latest = history.latest()
+        assert [(os.path.basename(r['distorted']), r['model'], r['vmaf']) for r in latest] == [
+            ('ep01_360p.mp4', 'HD', 72.0), ('ep01_720p.mp4', '4K', 84.0),
+            ('ep01_720p.mp4', 'HD', 85.0), ('ep02_360p.mp4', 'HD', 60.0)]
+
+    def test_latest_with_filters(self, history):
+        assert [r['vmaf'] for r in history.latest(reference='ep01.mp4', model='HD')] == [72.0, 85.0]
+        assert [r['vmaf'] for r in history.latest(until=1 * DAY)] == [70.0]
+
+    def test_latest_uses_the_index(self, history):
+        sql, args = history._latestQuery()
+        with history._db() as db:
+            plan = [row[-1] for row in db.execute('EXPLAIN QUERY PLAN ' + sql, args)]
+        assert any('runs_distorted' in step for step in plan)
+
+    def test_latest_ignores_runs_outside_the_filters(self, store):
+        """A run of the same rendition and date against another reference is not picked."""
+        first = store.add(run('a.mp4', 90.0, reference='ref1.mp4'), created=100.0)
+        store.add(run('a.mp4', 80.0, reference='ref2.mp4'), created=100.0)
+        [latest] = store.latest(reference='ref1.mp4')
+        assert (latest['id'], latest['reference']) == (first, os.path.abspath('ref1.mp4'))
+
+    def test_latest_breaks_ties_by_recording_order(self, store):
+        store.add(run('a.mp4', 90.0), created=100.0)
+        last = store.add(run('a.mp4', 91.0), created=100.0)
+        assert [r['id'] for r in store.latest()] == [last]
+
+
+class TestMain:
+    """easyvmaf-results prints the latest runs, or every run with list."""
+
+    def test_latest_table(self, store, capsys):
+        store.add(run('a.mp4', 90.0), created=0.0)
+        store.add(run('a.mp4', 91.5), created=DAY)
+        assert warehouse.main(['-db', store.path]) == 0
+        out = capsys.readouterr().out.splitlines()
+        assert len(out) == 2 and '91.5000' in out[1] and os.path.abspath('a.mp4') in out[1]
+
+    def test_list_json(self, store, capsys):
+        store.add(run('a.mp4', 90.0), created=0.0)
+        store.add(run('b.mp4', 80.0), created=DAY)
+        assert warehouse.main(['list', '-db', store.path, '-d', '*a.mp4', '-json']) == 0
+        [line] = capsys.readouterr().out.splitlines()
+        assert json.loads(line)['pooled']['vmaf_hd']['mean'] == 90.0
+
+    def test_missing_store(self, tmp_path, capsys):
+        assert warehouse.main(['-db', str(tmp_path / 'none.sqlite')]) == 1
+        assert 'no results store' in capsys.readouterr().err
+        assert not (tmp_path / 'none.sqlite').exists()
+
+    def test_invalid_date(self, store, capsys):
+        assert warehouse.main(['-db', store.path, '-since', 'yesterday']) == 1
+        assert 'ERROR' in capsys.readouterr().err